@@ -0,0 +1,319 @@
+"""
+廣告報表解析模組
+
+蝦皮廣告 (PAS) 頁面的表格是由報表API的JSON回應渲染出來的。
+此模組從回應JSON中直接取出廣告列表 (ROAS、預算、七日平均花費、廣告ID)，
+讓 RoasCheckerGUI 不必再從 div.eds-table 的分割表格中逐行抓取文字：
+- parse_number: 解析 '1.2k'、'NT$1,234' 之類的顯示文字
+- parse_ads_report: 在任意結構的回應JSON中找出廣告列表並正規化
+- AdsReportCollector: 掛在 Playwright page.on("response") 上，保存最新一次的廣告列表
+"""
+
+import logging
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# 報表API網址需包含其中一個路徑，且包含其中一個關鍵字
+REPORT_URL_PATHS = ("/api/pas/", "/api/marketing/")
+REPORT_URL_KEYWORDS = ("report", "list", "campaign")
+
+# 各欄位可能使用的鍵名 (依優先順序)
+ID_KEYS = ("campaign_id", "ad_id", "adid", "advertisement_id", "item_id", "id")
+NAME_KEYS = ("ad_name", "campaign_name", "name", "title", "item_name", "product_name")
+ROAS_KEYS = ("roas", "broad_roas", "roi", "broad_roi", "direct_roi", "direct_roas")
+BUDGET_KEYS = ("daily_budget", "budget", "total_budget")
+AVG_SPEND_KEYS = ("average_spend", "avg_spend", "avg_daily_cost", "average_daily_cost",
+                  "seven_day_avg_cost", "avg_cost_7d")
+
+# 讀取表格前半部分 (可編輯預算的行) 的名稱、預算文字與預算警告圖標
+TABLE_ROWS_JS = """
+() => {
+    const rows = document.querySelectorAll('div.eds-table tbody tr');
+    const totalRows = rows.length / 2;  // 前半部分是可編輯預算的行
+    const result = [];
+    for (let i = 0; i < totalRows; i++) {
+        const nameElement = rows[i].querySelector('td:nth-child(2)');
+        const budgetCell = rows[i].querySelector('td:nth-child(4)');
+        const budgetElement = budgetCell ? budgetCell.querySelector('.ellipsis-content.single') : null;
+        result.push({
+            name: nameElement ? nameElement.textContent.trim() : '',
+            budget: budgetElement ? budgetElement.textContent.trim().split(' ')[0].replace('NT$', '') : '',
+            has_budget_warning: !!(budgetCell && budgetCell.querySelector('svg[data-name="Layer 1"]'))
+        });
+    }
+    return result;
+}
+"""
+
+
+# 報表回應不可用時的表格抓取 (與 RoasCheckerGUI 相同的前後半表格對應)
+SCRAPE_ROWS_JS = """
+() => {
+    const results = [];
+    const rows = document.querySelectorAll('div.eds-table tbody tr');
+    const totalRows = rows.length / 2;
+    for (let i = 0; i < totalRows; i++) {
+        const roasElement = rows[i + totalRows].querySelector('td:nth-child(3) .report-format-number');
+        const budgetCell = rows[i].querySelector('td:nth-child(4)');
+        const budgetElement = budgetCell ? budgetCell.querySelector('.ellipsis-content.single') : null;
+        const nameElement = rows[i].querySelector('td:nth-child(2)');
+        if (!roasElement) continue;
+        results.push({
+            roas: roasElement.textContent.trim(),
+            budget: budgetElement ? budgetElement.textContent.trim().split(' ')[0].replace('NT$', '') : '',
+            name: nameElement ? nameElement.textContent.trim() : '未知商品',
+            has_budget_warning: !!(budgetCell && budgetCell.querySelector('svg[data-name="Layer 1"]')),
+            row_index: i
+        });
+    }
+    return results;
+}
+"""
+
+
+def parse_number(value):
+    """將報表數值或顯示文字轉成 float
+
+    支援 'k' 後綴 (1.2k -> 1200)、'NT$' 前綴與千分位逗號。
+
+    Args:
+        value: 數字或文字
+
+    Returns:
+        float: 解析結果，無法解析時返回 None
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip().lower().replace('nt$', '').replace(',', '').strip()
+    if not text or text == '-':
+        return None
+    try:
+        if text.endswith('k'):
+            return float(text[:-1]) * 1000
+        return float(text)
+    except ValueError:
+        return None
+
+
+def format_number(value):
+    """將數值格式化成表格顯示用的文字 (去掉多餘的小數位)"""
+    if value is None:
+        return ''
+    return ('%.2f' % value).rstrip('0').rstrip('.')
+
+
+def _pick(entry, keys):
+    """依優先順序取得第一個存在且不為空的欄位"""
+    for key in keys:
+        if key in entry and entry[key] not in (None, ''):
+            return entry[key]
+    return None
+
+
+def _flatten(entry):
+    """將一層巢狀字典 (例如 campaign / report 區塊) 合併到同一層，外層欄位優先"""
+    flat = {}
+    for key, value in entry.items():
+        if not isinstance(value, dict):
+            flat[key.lower()] = value
+    for value in entry.values():
+        if isinstance(value, dict):
+            for key, inner in value.items():
+                if not isinstance(inner, dict):
+                    flat.setdefault(key.lower(), inner)
+    return flat
+
+
+def _candidate_lists(data):
+    """依深度優先順序列出JSON中所有由字典組成的列表"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            if node and all(isinstance(item, dict) for item in node):
+                yield node
+            stack.extend(reversed(node))
+
+
+def normalize_ad(entry, money_divisor=1):
+    """將一筆廣告資料正規化
+
+    Args:
+        entry (dict): 回應JSON中的一筆廣告
+        money_divisor (float): 金額欄位的除數 (API以最小單位回傳金額時使用)
+
+    Returns:
+        dict: {"ad_id", "name", "roas", "budget", "average_spend", "raw"}，
+              沒有ROAS欄位時返回 None
+    """
+    flat = _flatten(entry)
+    roas = parse_number(_pick(flat, ROAS_KEYS))
+    if roas is None:
+        return None
+
+    budget = parse_number(_pick(flat, BUDGET_KEYS))
+    avg_spend = parse_number(_pick(flat, AVG_SPEND_KEYS))
+    if money_divisor and money_divisor != 1:
+        budget = budget / money_divisor if budget is not None else None
+        avg_spend = avg_spend / money_divisor if avg_spend is not None else None
+
+    ad_id = _pick(flat, ID_KEYS)
+    name = _pick(flat, NAME_KEYS)
+    return {
+        "ad_id": str(ad_id) if ad_id is not None else None,
+        "name": str(name).strip() if name is not None else '',
+        "roas": roas,
+        "budget": budget,
+        "average_spend": avg_spend,
+        "raw": entry
+    }
+
+
+def parse_ads_report(data, money_divisor=1):
+    """從報表回應JSON中取出廣告列表
+
+    回應結構因API版本而異，這裡不依賴固定路徑：
+    找出所有由字典組成的列表，取能正規化出最多廣告的那一個。
+
+    Args:
+        data: 已解析的回應JSON
+        money_divisor (float): 金額欄位的除數
+
+    Returns:
+        list: 依回應順序 (即表格順序) 排列的正規化廣告，找不到時返回空列表
+    """
+    best = []
+    for candidate in _candidate_lists(data):
+        ads = [ad for ad in (normalize_ad(entry, money_divisor) for entry in candidate) if ad]
+        if len(ads) > len(best):
+            best = ads
+    return best
+
+
+def match_report_rows(ads, table_rows):
+    """將報表廣告對應到表格行，建立與表格抓取相同格式的行資料
+
+    Args:
+        ads (list): parse_ads_report 的結果
+        table_rows (list): TABLE_ROWS_JS 的結果
+
+    Returns:
+        list: [{roas, budget, name, ad_id, has_budget_warning, row_index}] (依表格順序)；
+              有任何表格行對不上報表廣告 (報表與表格不是同一頁或排序不同) 時返回 None，改用表格抓取
+    """
+    if not ads or not table_rows:
+        return None
+
+    results = []
+    used = set()
+    for i, ad in enumerate(ads):
+        # 先假設順序相同，名稱對不上時再依名稱尋找
+        row_index = None
+        if i < len(table_rows) and (not ad['name'] or ad['name'] in table_rows[i]['name']):
+            row_index = i
+        elif ad['name']:
+            for j, table_row in enumerate(table_rows):
+                if j not in used and ad['name'] in table_row['name']:
+                    row_index = j
+                    break
+        if row_index is None or row_index in used:
+            continue
+
+        used.add(row_index)
+        table_row = table_rows[row_index]
+        results.append({
+            'roas': format_number(ad['roas']),
+            'budget': format_number(ad['budget']) if ad['budget'] is not None else table_row['budget'],
+            'name': ad['name'] or table_row['name'],
+            'ad_id': ad['ad_id'],
+            'has_budget_warning': table_row['has_budget_warning'],
+            'row_index': row_index
+        })
+
+    if len(results) < len(table_rows):
+        unmatched = [row['name'] for i, row in enumerate(table_rows) if i not in used]
+        logger.info(f"報表與表格有 {len(unmatched)} 行對不上 ({'、'.join(unmatched[:3])}"
+                    f"{' 等' if len(unmatched) > 3 else ''})，改用表格抓取")
+        return None
+
+    results.sort(key=lambda item: item['row_index'])
+    return results
+
+
+def is_report_url(url):
+    """檢查網址是否為廣告報表API"""
+    url = (url or '').lower()
+    return (any(path in url for path in REPORT_URL_PATHS) and
+            any(keyword in url for keyword in REPORT_URL_KEYWORDS))
+
+
+class AdsReportCollector:
+    """收集頁面報表API回應中的廣告列表"""
+
+    def __init__(self, money_divisor=1):
+        """初始化收集器
+
+        Args:
+            money_divisor (float): 金額欄位的除數
+        """
+        self.money_divisor = money_divisor
+        self.ads = []
+        self.url = None
+        # 每收到一次有效報表就加一，用來判斷翻頁/排序後是否已收到新資料
+        self.version = 0
+
+    @staticmethod
+    def is_report_response(response):
+        """回應是否為成功的報表API (xhr/fetch) 回應"""
+        return (response.request.resource_type in ("xhr", "fetch") and
+                is_report_url(response.url) and response.status == 200)
+
+    def on_response(self, response):
+        """同步版 Playwright page.on("response") 的回呼"""
+        try:
+            if not self.is_report_response(response):
+                return
+            data = response.json()
+        except Exception as e:
+            logger.debug(f"解析報表回應失敗: {str(e)}")
+            return
+        self.accept(data, response.url)
+
+    async def on_response_async(self, response):
+        """async Playwright page.on("response") 的回呼 (Response.json() 是協程)"""
+        try:
+            if not self.is_report_response(response):
+                return
+            data = await response.json()
+        except Exception as e:
+            logger.debug(f"解析報表回應失敗: {str(e)}")
+            return
+        self.accept(data, response.url)
+
+    def accept(self, data, url=None):
+        """解析一份報表回應，有廣告時更新列表並遞增版本"""
+        try:
+            ads = parse_ads_report(data, self.money_divisor)
+        except Exception as e:
+            logger.debug(f"解析報表回應失敗: {str(e)}")
+            return
+
+        if ads:
+            self.ads = ads
+            self.url = url
+            self.version += 1
+            logger.debug(f"收到報表回應 ({len(ads)} 筆廣告): {url}")
+
+    def invalidate(self):
+        """清除目前的廣告列表 (頁面狀態改變但尚未收到新報表時使用)"""
+        self.ads = []
+
+    def latest(self):
+        """返回最新一次收到的廣告列表"""
+        return list(self.ads)
@@ -0,0 +1,336 @@
+"""
+非同步廣告調整引擎
+
+以 playwright.async_api 在獨立執行緒的事件迴圈上執行
+重新整理 → 時間範圍 → 每頁50條 → ROI排序 → 逐頁調整預算 的流程，
+進度透過 queue.Queue 回報給 Tk 介面，視窗不會因等待或預算彈窗而凍結。
+等待以事件為主 (等待元素出現/消失、等待報表回應)，
+確認點擊後的彈窗關閉與下一行的捲動同時進行。
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+
+from playwright.async_api import async_playwright
+
+from ads_report import AdsReportCollector, TABLE_ROWS_JS, SCRAPE_ROWS_JS, match_report_rows
+from budget_planner import plan_low_roas_rows, plan_high_roas_rows
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+PAS_URL = "seller.shopee.tw/portal/marketing/pas/index"
+NEXT_BUTTON_XPATH = '/html/body/div[1]/div[2]/div[2]/div/div/div/div[3]/div[2]/div[2]/div[3]/div[3]/div[5]/div/div[1]/button[2]'
+INPUT_XPATH = '//body/div[last()]/div/div/div[1]/div[2]/div[1]/div/input'
+CONFIRM_XPATH = '//body/div[last()]/div/div/div[2]/button[2]'
+CANCEL_XPATH = '//body/div[last()]/div/div/div[2]/button[1]'
+
+# 與 RoasCheckerGUI 介面預設值相同的設置
+DEFAULT_SETTINGS = {
+    'roas_threshold': 10.0,
+    'budget_step': 20.0,
+    'time_range': "過去一週",
+    'first_roas_min': 5.0,
+    'first_roas_max': 10.0,
+    'first_budget': 60.0,
+    'second_roas': 5.0,
+    'second_budget': 40.0,
+    'cooldown_minutes': 0.0
+}
+
+NEXT_BUTTON_STATUS_JS = """
+(xpath) => {
+    const nextBtn = document.evaluate(xpath, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (!nextBtn) return 'not_found';
+    if (nextBtn.disabled) return 'disabled';
+    nextBtn.click();
+    return 'clicked';
+}
+"""
+
+
+class AsyncRoasEngine:
+    """在背景事件迴圈上執行廣告預算調整流程"""
+
+    def __init__(self, events=None, cdp_url="http://localhost:9222", ledger=None):
+        """初始化引擎
+
+        Args:
+            events (queue.Queue): 回報給介面的事件佇列，項目為 (事件類型, 內容字典)
+            cdp_url (str): Chrome 遠端除錯位址
+            ledger (BudgetLedger): 預算調整紀錄，None 表示不記錄也不略過冷卻中的廣告
+        """
+        self.events = events if events is not None else queue.Queue()
+        self.cdp_url = cdp_url
+        self.ledger = ledger
+        self.loop = None
+        self.thread = None
+        self.playwright = None
+        self.browser = None
+        self.page = None
+        self.collector = AdsReportCollector()
+        self.is_running = False
+        self.busy = False
+
+    # ---- 執行緒與事件迴圈 ----
+
+    def start(self):
+        """啟動背景事件迴圈執行緒"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="AsyncRoasEngine", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        """將協程交給背景事件迴圈執行，返回 concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run_low_roas(self, settings):
+        """在背景執行低ROAS調整 (從介面執行緒呼叫)"""
+        return self._submit_job(self.low_roas_pipeline(settings))
+
+    def run_high_roas(self, settings):
+        """在背景執行高ROAS調整 (從介面執行緒呼叫)"""
+        return self._submit_job(self.high_roas_pipeline(settings))
+
+    def _submit_job(self, coro):
+        if self.busy:
+            coro.close()
+            self.log("背景引擎正在執行中，請稍候")
+            return None
+        self.busy = True
+        return self.submit(coro)
+
+    def stop(self):
+        """要求目前的流程在處理完當前廣告後停止"""
+        self.is_running = False
+
+    def shutdown(self):
+        """關閉瀏覽器連線並結束事件迴圈"""
+        if not self.loop:
+            return
+        try:
+            self.submit(self._close()).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"關閉背景引擎時發生錯誤: {str(e)}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop = None
+        self.thread = None
+
+    # ---- 事件回報 ----
+
+    def emit(self, kind, **payload):
+        self.events.put((kind, payload))
+
+    def log(self, message):
+        self.emit("log", message=message)
+
+    # ---- 瀏覽器操作 ----
+
+    async def _close(self):
+        if self.playwright:
+            await self.playwright.stop()
+        self.playwright = self.browser = self.page = None
+
+    async def connect(self):
+        """連接到已開啟的 Chrome 並找到蝦皮廣告頁面"""
+        if self.page and not self.page.is_closed():
+            return True
+        await self._close()
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_url)
+        for page in self.browser.contexts[0].pages:
+            if PAS_URL in page.url and "source_page_id=1" in page.url:
+                self.page = page
+                self.collector = AdsReportCollector()
+                self.page.on("response", self.collector.on_response_async)
+                self.log("背景引擎已連接到蝦皮廣告頁面")
+                return True
+        self.log("請確保已打開正確的蝦皮廣告頁面 (source_page_id=1)")
+        return False
+
+    async def wait_for_report(self, since_version, timeout=5):
+        """等待報表回應更新，逾時則清除舊數據"""
+        deadline = self.loop.time() + timeout
+        while self.loop.time() < deadline:
+            if self.collector.version > since_version:
+                return True
+            await asyncio.sleep(0.1)
+        self.collector.invalidate()
+        return False
+
+    async def set_time_range(self, selected_range):
+        try:
+            await self.page.click('div[class*="date-range-picker"]', timeout=5000)
+            option = self.page.locator(f'li:has-text("{selected_range}")').first
+            await option.click(timeout=5000)
+            self.log(f"成功切換到{selected_range}")
+        except Exception as e:
+            self.log(f"切換時間範圍失敗: {str(e)}")
+
+    async def set_page_size(self):
+        try:
+            size = self.page.locator(".eds-pagination-sizes__content")
+            if "50 / page" in (await size.text_content(timeout=5000) or ""):
+                return
+            await size.click()
+            await self.page.click("li:has-text('50')", timeout=5000)
+            await self.page.wait_for_function(
+                "() => (document.querySelector('.eds-pagination-sizes__content') || {}).textContent.includes('50 / page')",
+                timeout=5000)
+            self.log("成功設置為每頁顯示50條")
+        except Exception as e:
+            self.log(f"設置頁面大小失敗: {str(e)}")
+
+    async def sort_by_roas(self):
+        sort_selector = "th:nth-child(3) .eds-table__cell-actions"
+        try:
+            for _ in range(3):
+                sort_class = await self.page.get_attribute(sort_selector, "class", timeout=5000) or ""
+                if "sort-desc" in sort_class:
+                    self.log("ROI已經是降序排列")
+                    return
+                await self.page.click("th:nth-child(3) .eds-table__sort-icons")
+                # 等待排序狀態改變，取代固定的等待時間
+                await self.page.wait_for_function(
+                    "([sel, old]) => { const el = document.querySelector(sel); return el && el.className !== old; }",
+                    arg=[sort_selector, sort_class], timeout=3000)
+            self.log("警告：在多次嘗試後仍未能成功設置降序排列")
+        except Exception as e:
+            self.log(f"排序失敗: {str(e)}")
+
+    async def prepare_table(self, settings):
+        """重新整理並設定時間範圍、每頁數量與排序"""
+        await self.page.reload(wait_until="networkidle")
+        await self.set_time_range(settings['time_range'])
+        await self.set_page_size()
+        # 重新載入、切換時間範圍與每頁數量也會觸發報表回應，只等待排序後的那一份
+        report_version = self.collector.version
+        await self.sort_by_roas()
+        await self.wait_for_report(report_version)
+
+    async def read_rows(self):
+        """讀取當前頁的廣告行，優先使用報表回應"""
+        ads = self.collector.latest()
+        if ads:
+            results = match_report_rows(ads, await self.page.evaluate(TABLE_ROWS_JS))
+            if results is not None:
+                return results
+        return await self.page.evaluate(SCRAPE_ROWS_JS)
+
+    async def next_page(self):
+        """點擊下一頁並等待新數據，沒有下一頁時返回 False"""
+        report_version = self.collector.version
+        status = await self.page.evaluate(NEXT_BUTTON_STATUS_JS, NEXT_BUTTON_XPATH)
+        if status != 'clicked':
+            self.log("\n已到達最後一頁" if status == 'disabled' else "\n未找到下一頁按鈕")
+            return False
+        if not await self.wait_for_report(report_version):
+            await self.page.wait_for_load_state("networkidle")
+        return True
+
+    async def cancel_popup(self):
+        try:
+            await self.page.click(f"xpath={CANCEL_XPATH}", timeout=3000)
+        except Exception as e:
+            logger.debug(f"點擊取消按鈕失敗: {str(e)}")
+
+    async def adjust_budget(self, row_index, target_budget, next_row_index=None):
+        """打開指定行的預算彈窗並設為目標預算
+
+        確認後等待彈窗關閉的同時，先把下一個要調整的行捲動到畫面中。
+        """
+        rows = self.page.locator('div.eds-table tbody tr')
+        title = rows.nth(row_index).locator('td:nth-child(4) div.title')
+        try:
+            await title.hover()
+            await title.locator('i svg').click(timeout=3000)
+
+            input_box = self.page.locator(f"xpath={INPUT_XPATH}")
+            await input_box.fill(str(int(target_budget)), timeout=3000)
+            await self.page.click(f"xpath={CONFIRM_XPATH}", timeout=3000)
+
+            waits = [input_box.wait_for(state="hidden", timeout=5000)]
+            if next_row_index is not None:
+                waits.append(rows.nth(next_row_index).scroll_into_view_if_needed(timeout=3000))
+            await asyncio.gather(*waits, return_exceptions=True)
+            return True
+        except Exception as e:
+            self.log(f"調整預算失敗: {str(e)}")
+            await self.cancel_popup()
+            return False
+
+    # ---- 流程 ----
+
+    async def _run_pages(self, settings, plan_page, mode):
+        """共用的逐頁流程；plan_page(行資料, 頁碼) 返回 (本頁動作列表, 是否繼續下一頁)
+
+        settings['max_pages'] 限制最多處理的頁數，未設定時處理到沒有下一頁為止。
+        """
+        cooldown = settings.get('cooldown_minutes', 0) * 60
+        max_pages = settings.get('max_pages')
+        total_pages = 0
+        total_adjustments = 0
+        self.is_running = True
+        try:
+            if not await self.connect():
+                return
+            await self.prepare_table(settings)
+
+            while self.is_running:
+                total_pages += 1
+                self.emit("page", page=total_pages)
+                actions, continue_next = plan_page(await self.read_rows(), total_pages)
+                # 冷卻時間只用於低ROAS目標預算設定；高ROAS預算警告每次都要處理
+                if self.ledger and mode == "low":
+                    actions, cooling = self.ledger.filter_actions(actions, cooldown)
+                    if cooling:
+                        self.log(f"略過 {len(cooling)} 個冷卻時間內調整過的廣告")
+
+                if settings.get('dry_run'):
+                    # 只列出要調整的廣告，不打開彈窗
+                    for action in actions:
+                        self.log(f"[預覽] {action['name']}: NT${action['current']:g} → NT${action['target']:g}")
+                    actions = []
+
+                for i, action in enumerate(actions):
+                    if not self.is_running:
+                        break
+                    next_index = actions[i + 1]['row_index'] if i + 1 < len(actions) else None
+                    if await self.adjust_budget(action['row_index'], action['target'], next_index):
+                        total_adjustments += 1
+                        if self.ledger:
+                            self.ledger.record(action['name'], action['current'], action['target'],
+                                               roas=action['roas'], mode=mode)
+                        self.log(f"✅ {action['name']}: NT${action['current']:g} → NT${action['target']:g}")
+                        self.emit("adjusted", total=total_adjustments)
+
+                if max_pages and total_pages >= max_pages:
+                    self.log(f"已處理 {total_pages} 頁，達到頁數上限")
+                    break
+                if not continue_next or not self.is_running or not await self.next_page():
+                    break
+        except Exception as e:
+            self.log(f"背景執行發生錯誤: {str(e)}")
+        finally:
+            self.is_running = False
+            self.busy = False
+            self.emit("done", pages=total_pages, adjustments=total_adjustments)
+
+    async def high_roas_pipeline(self, settings):
+        """ROAS高於閾值且有預算警告的廣告增加預算，ROAS低於閾值時停止"""
+        await self._run_pages(settings, lambda rows, page: plan_high_roas_rows(rows, settings, page), "high")
+
+    async def low_roas_pipeline(self, settings):
+        """依低ROAS設置把廣告預算調整為目標預算，已在容許誤差內的廣告不打開彈窗"""
+        def plan_page(rows, page):
+            actions, _ = plan_low_roas_rows(rows, settings, page)
+            return actions, bool(rows)
+
+        await self._run_pages(settings, plan_page, "low")
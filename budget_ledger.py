@@ -0,0 +1,141 @@
+"""
+預算調整紀錄模組
+
+把每一次成功的預算調整 (廣告、時間、原預算、新預算、ROAS、七日平均花費) 寫入本機 SQLite，
+讓下一輪執行知道一小時前做過什麼：
+- 冷卻時間內調整過的廣告直接略過，不再打開預算彈窗
+- 以SQL彙總查詢提供統計資訊 (調整次數、廣告數、預算增減)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEDGER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budget_ledger.db")
+DEFAULT_COOLDOWN = 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS adjustments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    ad_id TEXT,
+    ts REAL NOT NULL,
+    old_budget REAL,
+    new_budget REAL NOT NULL,
+    roas REAL,
+    average_spend REAL,
+    mode TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_adjustments_name_ts ON adjustments (name, ts);
+CREATE INDEX IF NOT EXISTS idx_adjustments_ts ON adjustments (ts);
+"""
+
+
+def start_of_day(now):
+    """now 當天 00:00 的時間戳 (本地時間)"""
+    local = time.localtime(now)
+    return time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+class BudgetLedger:
+    """預算調整紀錄 (可同時由介面執行緒與背景引擎使用)"""
+
+    def __init__(self, path=DEFAULT_LEDGER_PATH, clock=time.time):
+        """初始化並建立資料表
+
+        Args:
+            path (str): 資料庫檔案路徑，":memory:" 表示只保存在記憶體
+            clock (callable): 取得目前時間的函數
+        """
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self._lock, self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def record(self, name, old_budget, new_budget, roas=None, average_spend=None, ad_id=None, mode=None):
+        """寫入一次成功的預算調整"""
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT INTO adjustments (name, ad_id, ts, old_budget, new_budget, roas, average_spend, mode)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((name or '').strip(), str(ad_id) if ad_id else None, self.clock(),
+                     old_budget, new_budget, roas, average_spend, mode))
+        except sqlite3.Error as e:
+            logger.warning(f"寫入預算調整紀錄失敗: {str(e)}")
+
+    def last_adjusted(self, name=None, ad_id=None):
+        """廣告最後一次調整的紀錄，沒有時返回 None"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT * FROM adjustments WHERE (ad_id IS NOT NULL AND ad_id = ?) OR name = ?"
+                " ORDER BY ts DESC LIMIT 1",
+                (str(ad_id) if ad_id else None, (name or '').strip())).fetchone()
+
+    def recently_adjusted(self, cooldown=DEFAULT_COOLDOWN):
+        """冷卻時間內調整過的廣告名稱與ID集合"""
+        since = self.clock() - cooldown
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT name, ad_id FROM adjustments WHERE ts >= ?", (since,)).fetchall()
+        return {row['name'] for row in rows} | {row['ad_id'] for row in rows if row['ad_id']}
+
+    def in_cooldown(self, name=None, ad_id=None, cooldown=DEFAULT_COOLDOWN):
+        """廣告是否在冷卻時間內調整過"""
+        if cooldown <= 0:
+            return False
+        last = self.last_adjusted(name, ad_id)
+        return last is not None and self.clock() - last['ts'] < cooldown
+
+    def filter_actions(self, actions, cooldown=DEFAULT_COOLDOWN):
+        """移除冷卻時間內調整過的廣告 (一次查詢整批動作)
+
+        Args:
+            actions (list): 含 name (可含 ad_id) 的調整動作
+            cooldown (float): 冷卻時間 (秒)，0 表示不過濾
+
+        Returns:
+            tuple: (保留的動作, 略過的動作)
+        """
+        if cooldown <= 0 or not actions:
+            return list(actions), []
+        recent = self.recently_adjusted(cooldown)
+        kept, skipped = [], []
+        for action in actions:
+            if (action.get('name') or '').strip() in recent or (action.get('ad_id') and str(action['ad_id']) in recent):
+                skipped.append(action)
+            else:
+                kept.append(action)
+        return kept, skipped
+
+    def stats(self, since=None):
+        """彙總 since 之後的調整紀錄
+
+        Args:
+            since (float): 起始時間戳，None 表示今天 00:00
+
+        Returns:
+            dict: count/ads/increase/decrease/average_roas/last
+        """
+        if since is None:
+            since = start_of_day(self.clock())
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) AS count, COUNT(DISTINCT name) AS ads,"
+                " COALESCE(SUM(CASE WHEN new_budget > old_budget THEN new_budget - old_budget END), 0) AS increase,"
+                " COALESCE(SUM(CASE WHEN new_budget < old_budget THEN old_budget - new_budget END), 0) AS decrease,"
+                " AVG(roas) AS average_roas, MAX(ts) AS last"
+                " FROM adjustments WHERE ts >= ?", (since,)).fetchone()
+        return dict(row)
@@ -0,0 +1,142 @@
+"""
+預算調整規劃模組
+
+先從抽取到的行資料算出整次執行所有需要的 (廣告, 目前預算, 目標預算)，
+去掉已經在容許誤差內的廣告，再只對真正需要變更的廣告打開預算彈窗：
+- plan_low_roas_rows / plan_high_roas_rows: 單頁的規劃 (不操作瀏覽器)，
+  以介面設置呼叫 roas_decision 的決策，級距規則只在 roas_decision 定義一次
+- BudgetPlan: 整次執行的規劃結果，可產生試跑預覽
+- BudgetPlanExecutor: 依頁碼順序執行規劃，並遵守每次執行的時間上限
+"""
+
+import logging
+import time
+
+from roas_decision import DEFAULT_TOLERANCE, tiers_from_settings, decide_low_roas, decide_high_roas
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+
+def plan_low_roas_rows(rows, settings, page=1, tolerance=DEFAULT_TOLERANCE):
+    """規劃一頁的低ROAS預算調整
+
+    Args:
+        rows (list): 行資料 (roas/budget 為顯示文字或數值)
+        settings (dict): first_roas_min/first_roas_max/first_budget/second_roas/second_budget
+        page (int): 行資料所在頁碼
+        tolerance (float): 容許誤差
+
+    Returns:
+        tuple: (需要調整的動作列表, 已在容許誤差內而略過的數量)
+    """
+    return decide_low_roas(rows, tiers_from_settings(settings), tolerance, page=page)
+
+
+def plan_high_roas_rows(rows, settings, page=1):
+    """規劃一頁的高ROAS預算增加
+
+    ROAS已降序排列，遇到低於閾值的行即停止。
+
+    Returns:
+        tuple: (需要調整的動作列表, 是否需要繼續下一頁)
+    """
+    return decide_high_roas(rows, settings['roas_threshold'], settings['budget_step'], page=page)
+
+
+class BudgetPlan:
+    """整次執行的預算調整規劃"""
+
+    def __init__(self):
+        self.actions = []
+        self.skipped = 0
+        self.pages = 0
+
+    def add_low_roas_page(self, page, rows, settings, tolerance=DEFAULT_TOLERANCE):
+        """加入一頁的低ROAS規劃"""
+        actions, skipped = plan_low_roas_rows(rows, settings, page, tolerance)
+        self.actions.extend(actions)
+        self.skipped += skipped
+        self.pages = max(self.pages, page)
+        return actions
+
+    def add_high_roas_page(self, page, rows, settings):
+        """加入一頁的高ROAS規劃，返回是否需要繼續下一頁"""
+        actions, continue_next = plan_high_roas_rows(rows, settings, page)
+        self.actions.extend(actions)
+        self.pages = max(self.pages, page)
+        return continue_next
+
+    def actions_by_page(self):
+        """依頁碼分組的動作 {頁碼: [動作, ...]}"""
+        grouped = {}
+        for action in self.actions:
+            grouped.setdefault(action['page'], []).append(action)
+        return grouped
+
+    def preview_lines(self):
+        """產生試跑預覽的文字行"""
+        lines = [f"共掃描 {self.pages} 頁，需要調整 {len(self.actions)} 個廣告，"
+                 f"{self.skipped} 個已在目標預算範圍內"]
+        for action in self.actions:
+            lines.append(f"   第{action['page']}頁 {action['name']}  ROI {action['roas']:g}  "
+                         f"NT${action['current']:g} → NT${action['target']:g}")
+        return lines
+
+
+class BudgetPlanExecutor:
+    """依頁碼順序執行預算調整規劃"""
+
+    def __init__(self, goto_page, adjust, time_budget=None, should_continue=None, clock=time.monotonic):
+        """初始化執行器
+
+        Args:
+            goto_page (callable): goto_page(頁碼) 切換到指定頁，失敗時返回 False
+            adjust (callable): adjust(動作) 執行單一調整，返回是否成功
+            time_budget (float): 每次執行的時間上限 (秒)，None 表示不限制
+            should_continue (callable): 返回 False 時停止 (例如使用者按下停止)
+            clock (callable): 取得目前時間的函數
+        """
+        self.goto_page = goto_page
+        self.adjust = adjust
+        self.time_budget = time_budget
+        self.should_continue = should_continue or (lambda: True)
+        self.clock = clock
+
+    def run(self, plan):
+        """執行規劃
+
+        預估下一個動作會超過時間上限時就不再開始新的動作。
+
+        Returns:
+            dict: {"done", "failed", "remaining", "timed_out"}
+        """
+        result = {'done': 0, 'failed': 0, 'remaining': len(plan.actions), 'timed_out': False}
+        started = self.clock()
+        attempted = 0
+
+        for page, actions in sorted(plan.actions_by_page().items()):
+            if not self.should_continue():
+                return result
+            if not self.goto_page(page):
+                logger.warning(f"無法切換到第 {page} 頁，略過 {len(actions)} 個調整")
+                result['failed'] += len(actions)
+                result['remaining'] -= len(actions)
+                continue
+
+            for action in actions:
+                elapsed = self.clock() - started
+                average = elapsed / attempted if attempted else 0
+                if self.time_budget is not None and elapsed + average > self.time_budget:
+                    result['timed_out'] = True
+                    return result
+                if not self.should_continue():
+                    return result
+
+                attempted += 1
+                result['remaining'] -= 1
+                if self.adjust(action):
+                    result['done'] += 1
+                else:
+                    result['failed'] += 1
+        return result
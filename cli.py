@@ -0,0 +1,244 @@
+"""
+命令列執行入口
+
+不啟動Tk介面，直接呼叫核心邏輯，可在伺服器上執行：
+    python cli.py capture --roas-threshold 10 --budget-step 20 --max-pages 3
+    python cli.py low-roas --first-min 5 --first-max 10 --first-budget 60 --dry-run
+    python cli.py discount-batch --url <活動網址> --bulk --output result.json
+    python cli.py discount-pages --pages 5 --parallel 3 --output result.json
+
+進度以每行一個JSON物件輸出到標準輸出 (event: log/page/adjusted/result)，
+一般日誌輸出到標準錯誤。
+"""
+
+import argparse
+import json
+import logging
+import queue
+import sys
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+
+def emit(event, **data):
+    """輸出一行機器可讀的進度"""
+    print(json.dumps(dict(event=event, **data), ensure_ascii=False, default=str), flush=True)
+
+
+class JsonLinesHandler(logging.Handler):
+    """把日誌記錄轉成 event=log 的JSON行"""
+
+    def emit(self, record):
+        emit("log", level=record.levelname, logger=record.name, message=record.getMessage())
+
+
+def write_output(path, result):
+    """把結果寫成JSON檔"""
+    if not path:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+    logger.info(f"已將結果保存至: {path}")
+
+
+# ---- 廣告ROAS ----
+
+def roas_settings(args):
+    from async_engine import DEFAULT_SETTINGS
+    return dict(
+        DEFAULT_SETTINGS,
+        roas_threshold=args.roas_threshold,
+        budget_step=args.budget_step,
+        time_range=args.time_range,
+        first_roas_min=args.first_min,
+        first_roas_max=args.first_max,
+        first_budget=args.first_budget,
+        second_roas=args.second_roas,
+        second_budget=args.second_budget,
+        cooldown_minutes=args.cooldown,
+        max_pages=args.max_pages,
+        dry_run=args.dry_run
+    )
+
+
+def run_roas(args):
+    """以背景引擎執行高ROAS (capture) 或低ROAS調整"""
+    from async_engine import AsyncRoasEngine
+    from budget_ledger import BudgetLedger
+
+    events = queue.Queue()
+    ledger = BudgetLedger()
+    engine = AsyncRoasEngine(events, cdp_url=args.cdp_url, ledger=ledger)
+    settings = roas_settings(args)
+    result = {"command": args.command, "pages": 0, "adjustments": 0, "log": []}
+    try:
+        future = engine.run_high_roas(settings) if args.command == "capture" else engine.run_low_roas(settings)
+        finished = False
+        while not finished:
+            try:
+                kind, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                if future.done():
+                    future.result()
+                    break
+                continue
+            emit(kind, **payload)
+            if kind == "log":
+                result["log"].append(payload["message"])
+            elif kind == "done":
+                result.update(pages=payload["pages"], adjustments=payload["adjustments"])
+                finished = True
+    finally:
+        engine.shutdown()
+        ledger.close()
+    return result
+
+
+# ---- 折扣活動調價 ----
+
+def connect_discount_page(args):
+    """連接已開啟的Chrome並 (選擇性) 前往活動網址"""
+    from 模組.瀏覽器處理 import 瀏覽器控制
+
+    browser_controller = 瀏覽器控制()
+    driver = browser_controller.connect_to_browser()
+    if not driver:
+        raise RuntimeError("連接Chrome瀏覽器失敗，請確認Chrome已以遠端除錯模式啟動")
+    if args.url and args.url not in driver.current_url:
+        if not browser_controller.導航到網址(args.url):
+            raise RuntimeError(f"導航失敗，請檢查網址是否正確: {args.url}")
+    return driver
+
+
+def run_discount_batch(args):
+    """處理目前頁面所有商品規格 (與主程式的「批量處理」相同)"""
+    from 模組.商品處理 import 商品處理集成
+
+    product_handler = 商品處理集成(connect_discount_page(args))
+    if not product_handler.搜尋.檢查是否編輯模式() and not product_handler.搜尋.進入編輯模式():
+        raise RuntimeError("無法進入編輯模式")
+
+    search_result = product_handler.搜尋.搜尋商品(增量=True)
+    products = search_result.get("products", [])
+    emit("page", page=1, products=len(products), specs=search_result.get("spec_count", 0))
+
+    總處理數, 開關成功數, 價格成功數, 調整記錄 = product_handler.批量處理.批量處理商品規格(
+        products, 批量模式=args.bulk, 只處理變更=args.changes_only)
+    return {"command": args.command, "processed": 總處理數, "switched": 開關成功數,
+            "priced": 價格成功數, "records": 調整記錄}
+
+
+def run_discount_pages(args):
+    """處理多頁商品規格 (與主程式的「多頁批量處理」相同)"""
+    from 模組.商品處理 import 商品處理集成
+
+    product_handler = 商品處理集成(connect_discount_page(args))
+    if not product_handler.搜尋.檢查是否編輯模式() and not product_handler.搜尋.進入編輯模式():
+        raise RuntimeError("無法進入編輯模式")
+
+    success, 已處理頁數, 處理結果摘要, 調整記錄 = product_handler.搜尋.批量處理多頁商品(
+        args.pages, 並行數=args.parallel)
+    return {"command": args.command, "success": success, "pages": 已處理頁數,
+            "summary": 處理結果摘要, "records": 調整記錄}
+
+
+def write_excel(records, summary):
+    """以紀錄管理器輸出Excel報表 (需要 pandas)"""
+    from 模組.紀錄輸出 import 紀錄管理器
+
+    紀錄器 = 紀錄管理器()
+    for 記錄 in records:
+        紀錄器.批量添加記錄(記錄)
+    excel_path = 紀錄器.輸出Excel報表()
+    if excel_path:
+        紀錄器.添加統計摘要(excel_path, summary["total"], summary["success"], summary["total"] - summary["success"])
+    return excel_path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="蝦皮廣告ROAS與折扣調價命令列工具")
+    parser.add_argument("--output", help="將結果寫入JSON檔")
+    parser.add_argument("--verbose", action="store_true", help="把模組日誌也以JSON行輸出")
+    parser.add_argument("--profile", choices=["fast", "demo"],
+                        help="折扣調價的執行設定檔 (預設讀取環境變數 SHOPEE_RUN_PROFILE，未設定時為 demo)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # 子命令也接受 --output/--verbose (放在子命令之後)；預設不設值，才不會蓋掉放在子命令之前的選項
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", default=argparse.SUPPRESS, help="將結果寫入JSON檔")
+    common.add_argument("--verbose", action="store_true", default=argparse.SUPPRESS,
+                        help="把模組日誌也以JSON行輸出")
+
+    for name, help_text in (("capture", "高ROAS預算調整 (有預算警告的廣告增加預算)"),
+                            ("low-roas", "低ROAS預算調整 (依ROAS範圍設為目標預算)")):
+        sub = subparsers.add_parser(name, help=help_text, parents=[common])
+        sub.add_argument("--cdp-url", default="http://localhost:9222", help="Chrome 遠端除錯位址")
+        sub.add_argument("--time-range", default="過去一週",
+                         choices=["今天", "昨天", "過去一週", "過去一個月", "近三個月"])
+        sub.add_argument("--roas-threshold", type=float, default=10, help="高ROAS閾值")
+        sub.add_argument("--budget-step", type=float, default=20, help="高ROAS預算調整金額")
+        sub.add_argument("--first-min", type=float, default=5, help="第一範圍ROAS下限")
+        sub.add_argument("--first-max", type=float, default=10, help="第一範圍ROAS上限")
+        sub.add_argument("--first-budget", type=float, default=60, help="第一範圍目標預算")
+        sub.add_argument("--second-roas", type=float, default=5, help="第二範圍ROAS上限")
+        sub.add_argument("--second-budget", type=float, default=40, help="第二範圍目標預算")
+        sub.add_argument("--cooldown", type=float, default=0,
+                         help="低ROAS調整的冷卻時間(分鐘)，期間內調整過的廣告略過，0表示不限")
+        sub.add_argument("--max-pages", type=int, help="最多處理的頁數 (預設處理到沒有下一頁)")
+        sub.add_argument("--dry-run", action="store_true", help="只列出要調整的廣告，不實際調整")
+
+    sub = subparsers.add_parser("discount-batch", help="處理目前頁面的折扣活動商品規格", parents=[common])
+    sub.add_argument("--url", help="折扣活動網址")
+    sub.add_argument("--bulk", action="store_true", help="使用頁內批量執行")
+    sub.add_argument("--changes-only", action="store_true",
+                     help="只執行需要的開關與價格操作 (已開啟且價格一致的規格不處理)")
+    sub.add_argument("--excel", action="store_true", help="另外輸出Excel調價紀錄")
+
+    sub = subparsers.add_parser("discount-pages", help="處理多頁折扣活動商品規格", parents=[common])
+    sub.add_argument("--url", help="折扣活動網址")
+    sub.add_argument("--pages", type=int, required=True, help="要處理的頁數")
+    sub.add_argument("--parallel", type=int, default=1, help="同時處理的分頁數")
+    sub.add_argument("--excel", action="store_true", help="另外輸出Excel調價紀錄")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.verbose:
+        logging.getLogger().addHandler(JsonLinesHandler())
+    if args.profile:
+        from 模組.執行設定 import 設定執行設定
+        設定執行設定(args.profile)
+
+    commands = {
+        "capture": run_roas,
+        "low-roas": run_roas,
+        "discount-batch": run_discount_batch,
+        "discount-pages": run_discount_pages
+    }
+    try:
+        result = commands[args.command](args)
+    except Exception as e:
+        logger.error(f"執行 {args.command} 時發生錯誤: {str(e)}")
+        emit("error", command=args.command, message=str(e))
+        return 1
+
+    if getattr(args, "excel", False) and result.get("records"):
+        if args.command == "discount-batch":
+            summary = {"total": result["processed"], "success": result["priced"]}
+        else:
+            summary = {"total": result["summary"].get("總處理規格數", 0),
+                       "success": result["summary"].get("總價格成功數", 0)}
+        result["excel"] = write_excel(result["records"], summary)
+
+    write_output(args.output, result)
+    emit("result", **{key: value for key, value in result.items() if key not in ("records", "log")})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
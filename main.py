@@ -1,12 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from playwright.sync_api import sync_playwright
-import pygetwindow as gw
 import time
-import win32gui
-import win32con
 import math
 import re
+import queue
+import threading
+from async_engine import AsyncRoasEngine
+from ads_report import AdsReportCollector, TABLE_ROWS_JS, SCRAPE_ROWS_JS, match_report_rows
+from budget_planner import BudgetPlan, BudgetPlanExecutor
+from spend_cache import SpendCache
+from budget_ledger import BudgetLedger
+from roas_scheduler import RoasScheduler, RunWindow, NoSlotError
+from roas_decision import tiers_from_settings, parse_values, apply_tiers, tier_range, find_first_page
+from 模組.重試策略 import 重試策略, 斷路器, 操作失敗, 找不到元素
+
+# 視窗控制只在 Windows 上可用；其他系統 (例如以 cli.py 在伺服器上執行) 略過最小化/還原
+try:
+    import pygetwindow as gw
+    import win32gui
+    import win32con
+except ImportError:
+    gw = win32gui = win32con = None
 
 class RoasCheckerGUI:
     def create_widgets(self):
@@ -33,6 +48,30 @@ class RoasCheckerGUI:
         self.roas_var = tk.StringVar(value="10")
         ttk.Entry(roas_frame, textvariable=self.roas_var, width=10).pack(side="left", padx=5)
         
+        # 從報表API回應讀取廣告數據
+        self.use_report_capture_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(settings_frame, text="從報表API讀取數據 (失敗時改用表格抓取)",
+                        variable=self.use_report_capture_var).pack(anchor="w", padx=5, pady=2)
+        
+        # 七日平均花費快取的有效期限
+        spend_cache_frame = ttk.Frame(settings_frame)
+        spend_cache_frame.pack(fill="x", pady=2, padx=5)
+        ttk.Label(spend_cache_frame, text="平均花費快取(小時):").pack(side="left")
+        self.spend_cache_hours_var = tk.StringVar(value="6")
+        ttk.Entry(spend_cache_frame, textvariable=self.spend_cache_hours_var, width=10).pack(side="left", padx=5)
+        
+        # 冷卻時間內調整過的廣告不再打開預算彈窗
+        cooldown_frame = ttk.Frame(settings_frame)
+        cooldown_frame.pack(fill="x", pady=2, padx=5)
+        ttk.Label(cooldown_frame, text="低ROAS調整冷卻時間(分鐘, 0=不限):").pack(side="left")
+        self.cooldown_minutes_var = tk.StringVar(value="0")
+        ttk.Entry(cooldown_frame, textvariable=self.cooldown_minutes_var, width=10).pack(side="left", padx=5)
+        
+        # 以背景非同步引擎執行，視窗不會在等待時凍結
+        self.use_async_engine_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="背景引擎執行 (執行時視窗不凍結)",
+                        variable=self.use_async_engine_var).pack(anchor="w", padx=5, pady=2)
+        
         # 低ROAS設置框架
         low_roas_frame = ttk.LabelFrame(control_frame, text="低ROAS設置")
         low_roas_frame.pack(fill="x", pady=(0, 5), padx=5)
@@ -60,6 +99,17 @@ class RoasCheckerGUI:
         self.second_budget_var = tk.StringVar(value="40")
         ttk.Entry(second_roas_frame, textvariable=self.second_budget_var, width=10).pack(side="left", padx=2)
         
+        # 預先規劃：先掃描所有頁面，只調整真正需要變更的廣告
+        plan_frame = ttk.Frame(low_roas_frame)
+        plan_frame.pack(fill="x", pady=2, padx=5)
+        self.preplan_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(plan_frame, text="預先規劃", variable=self.preplan_var).pack(side="left")
+        self.dry_run_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(plan_frame, text="試跑 (只預覽)", variable=self.dry_run_var).pack(side="left", padx=5)
+        ttk.Label(plan_frame, text="時間上限(分鐘, 0=不限):").pack(side="left", padx=(10,0))
+        self.time_budget_var = tk.StringVar(value="0")
+        ttk.Entry(plan_frame, textvariable=self.time_budget_var, width=5).pack(side="left", padx=2)
+        
         # 時間範圍選擇框架
         time_range_select_frame = ttk.LabelFrame(control_frame, text="廣告數據時間範圍")
         time_range_select_frame.pack(fill="x", pady=(0, 5), padx=5)
@@ -158,6 +208,10 @@ class RoasCheckerGUI:
         self.total_adjustments_var = tk.StringVar(value="總調整次數: 0")
         ttk.Label(stats_frame, textvariable=self.total_adjustments_var).pack(pady=2)
         
+        # 今日調整紀錄 (來自預算調整紀錄資料庫，程式重啟後仍保留)
+        self.ledger_stats_var = tk.StringVar(value="今日調整: 0 次")
+        ttk.Label(stats_frame, textvariable=self.ledger_stats_var).pack(pady=2)
+        
         # 最後執行時間
         self.last_run_var = tk.StringVar(value="最後執行: 無")
         ttk.Label(stats_frame, textvariable=self.last_run_var).pack(pady=2)
@@ -165,6 +219,10 @@ class RoasCheckerGUI:
     def update_statistics(self):
         """更新統計資訊"""
         self.total_adjustments_var.set(f"總調整次數: {self.total_session_adjustments}")
+        today = self.ledger.stats()
+        self.ledger_stats_var.set(
+            f"今日調整: {today['count']} 次 / {today['ads']} 個廣告  "
+            f"預算 +NT${today['increase']:g} / -NT${today['decrease']:g}")
         current_time = time.strftime("%Y-%m-%d %H:%M:%S")
         self.last_run_var.set(f"最後執行: {current_time}")
 
@@ -178,13 +236,31 @@ class RoasCheckerGUI:
         self.playwright = None
         self.browser = None
         self.page = None
-        self.auto_run_timer = None
+        self.auto_scheduler = None
+        
+        # 報表API回應收集器
+        self.report_collector = AdsReportCollector()
+        
+        # 七日平均花費快取 (保存在本機，程式重啟後仍有效)
+        self.spend_cache = SpendCache()
+        
+        # 預算調整紀錄 (冷卻時間與統計資訊)
+        self.ledger = BudgetLedger()
+        
+        # 預算彈窗操作的重試策略；斷路器在每次執行開始時重設
+        self.budget_retry = 重試策略(最大次數=3, 基礎延遲=1.0, 彈窗恢復=self.click_cancel_button)
+        self.budget_breaker = self.new_budget_breaker()
+        
+        # 背景非同步引擎 (第一次使用時建立) 與其事件佇列
+        self.engine = None
+        self.engine_events = queue.Queue()
         
         # 添加總計統計
         self.total_session_adjustments = 0
         
         # 初始化執行狀態
         self.is_running = False
+        self.reached_tier_floor = False
         
         # 初始化低ROAS相關變量
         self.low_roas_min_var = tk.StringVar(value="5")
@@ -197,6 +273,9 @@ class RoasCheckerGUI:
         
         # 創建界面
         self.create_widgets()
+        
+        # 定期處理背景引擎回報的事件
+        self.root.after(100, self.poll_engine_events)
 
     def toggle_auto_run(self):
         """切換自動執行狀態"""
@@ -225,67 +304,81 @@ class RoasCheckerGUI:
             return start_minutes <= current_minutes <= end_minutes
 
     def start_auto_run(self):
-        """開始自動執行"""
+        """開始自動執行
+
+        以牆上時鐘對齊的時段執行 (例如間隔30分鐘時固定在 :00、:30)，
+        執行時間的長短不會讓之後的時段漂移；執行超過下一個時段時略過錯過的時段。
+        """
         try:
-            # 檢查是否在執行時間範圍內
-            current_time = time.strftime("%H:%M")
-            start_time = self.start_time_var.get()
-            end_time = self.end_time_var.get()
-            
-            if self.is_within_time_range(current_time, start_time, end_time):
-                # 立即執行第一次
-                self.log("\n=== 開始自動執行 ===")
-                self.manual_capture()
-                
-                # 設置下一次執行的間隔
-                interval = int(self.interval_var.get()) * 60 * 1000  # 轉換為毫秒
-                self.auto_run_timer = self.root.after(interval, self.schedule_next_run)
-                self.log(f"下一次執行將在 {interval//60000} 分鐘後")
-            else:
-                self.log(f"當前時間 {current_time} 不在執行時間範圍內 ({start_time} - {end_time})")
-                # 仍然設置定時器，以便在到達執行時間時自動開始
-                self.schedule_next_run()
-                
+            interval = int(self.interval_var.get())
+            window = RunWindow(self.start_time_var.get(), self.end_time_var.get(), self.is_24h_var.get())
+            
+            self.stop_auto_run(quiet=True)
+            self.auto_scheduler = RoasScheduler(
+                self.scheduled_capture,
+                interval,
+                window,
+                log=lambda message: self.root.after(0, self.log, message))
+            self.auto_scheduler.start()
+            self.log("\n=== 開始自動執行 ===")
+            
+        except NoSlotError:
+            self.auto_scheduler = None
+            self.log(f"執行時間範圍 {self.start_time_var.get()}-{self.end_time_var.get()} 內沒有任何 "
+                     f"{self.interval_var.get()} 分鐘的時段，請調整時間範圍或執行間隔")
+            self.auto_run_var.set(False)
         except ValueError as e:
-            self.log("請輸入有效的執行間隔")
+            self.log("請輸入有效的執行間隔與時間範圍")
             self.auto_run_var.set(False)
         except Exception as e:
             self.log(f"啟動自動執行時發生錯誤: {str(e)}")
             self.auto_run_var.set(False)
 
-    def stop_auto_run(self):
+    def stop_auto_run(self, quiet=False):
         """停止自動執行"""
-        if self.auto_run_timer:
-            self.root.after_cancel(self.auto_run_timer)
-            self.auto_run_timer = None
-        self.log("自動執行已停止")
-
-    def schedule_next_run(self):
-        """安排下一次執行"""
-        if not self.auto_run_var.get():
-            return
+        if self.auto_scheduler:
+            self.auto_scheduler.stop()
+            self.auto_scheduler = None
+        if not quiet:
+            self.log("自動執行已停止")
+
+    def run_on_tk_thread(self, func):
+        """包裝成可從排程執行緒呼叫的函數：在介面執行緒執行 func 並等待完成"""
+        def wrapper():
+            done = threading.Event()
             
-        try:
-            # 獲取間隔時間
-            interval = int(self.interval_var.get()) * 60 * 1000  # 轉換為毫秒
-            
-            # 如果是24小時模式或在時間範圍內，直接執行
-            if self.is_24h_var.get() or self.is_within_time_range(
-                time.strftime("%H:%M"), 
-                self.start_time_var.get(), 
-                self.end_time_var.get()
-            ):
-                self.manual_capture()
+            def task():
+                try:
+                    func()
+                finally:
+                    done.set()
+            
+            self.root.after(0, task)
+            done.wait()
+        return wrapper
+
+    def scheduled_capture(self):
+        """排程時段執行的工作 (在排程執行緒呼叫)
+
+        抓取本身在介面執行緒進行；使用背景引擎時在排程執行緒等待引擎執行完成才返回，
+        讓排程器記錄實際的執行時間並正確處理時段重疊。
+        """
+        started = {}
+        
+        def start():
+            if not self.auto_run_var.get():
+                return
+            future = self.manual_capture()
+            if future is None:
+                # 同步流程已執行完畢 (背景引擎的統計由 done 事件輸出)
                 self.log(f"\n=== 自動執行統計 ===")
                 self.log(f"程式運行期間總共調整: {self.total_session_adjustments} 個廣告預算")
-                self.log(f"下一次執行將在 {interval//60000} 分鐘後")
-            
-            # 設置下一次執行
-            self.auto_run_timer = self.root.after(interval, self.schedule_next_run)
-            
-        except Exception as e:
-            self.log(f"排程執行失敗: {str(e)}")
-            self.auto_run_var.set(False)
+            started['future'] = future
+        
+        self.run_on_tk_thread(start)()
+        future = started.get('future')
+        if future is not None:
+            future.result()
 
     def log(self, message):
         """添加日誌信息"""
@@ -314,6 +407,8 @@ class RoasCheckerGUI:
             
             if found_page:
                 self.page = found_page
+                self.report_collector = AdsReportCollector()
+                self.page.on("response", self.report_collector.on_response)
                 self.log("成功連接到蝦皮廣告頁面")
                 return True
             else:
@@ -326,6 +421,9 @@ class RoasCheckerGUI:
 
     def find_chrome_window(self):
         """找到蝦皮廣告的 Chrome 視窗"""
+        if win32gui is None:
+            return False
+
         def callback(hwnd, extra):
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
@@ -352,6 +450,8 @@ class RoasCheckerGUI:
 
     def restore_browser(self):
         """還原瀏覽器視窗"""
+        if win32gui is None:
+            return
         try:
             if self.browser_hwnd:
                 win32gui.ShowWindow(self.browser_hwnd, win32con.SW_RESTORE)
@@ -502,66 +602,86 @@ class RoasCheckerGUI:
         except Exception as e:
             self.log(f"設置頁面大小失敗: {str(e)}")
 
-    def adjust_budget(self, row_element, current_budget_text):
-        """調整預算"""
-        MAX_RETRIES = 3
-        for attempt in range(MAX_RETRIES):
-            try:
-                # 使用設置的預算調整金額
-                budget_adjust = float(self.budget_var.get())
-                current_budget = float(current_budget_text.replace('NT$', '').strip().split()[0])
-                target_budget = int(current_budget + budget_adjust)
-                
-                # 1. 點擊編輯圖標
-                edit_icon = row_element.query_selector('td:nth-child(4) div.title i svg')
-                if edit_icon:
-                    parent_div = row_element.query_selector('td:nth-child(4) div.title')
-                    if parent_div:
-                        parent_div.hover()
-                        time.sleep(1)
-                    edit_icon.click()
-                    time.sleep(2)
-                else:
-                    self.log(f"嘗試 {attempt + 1}: 未找到編輯圖標")
-                    continue
-
-                # 2. 等待並處理輸入框
-                input_xpath = '//body/div[last()]/div/div/div[1]/div[2]/div[1]/div/input'
-                input_box = self.page.wait_for_selector(input_xpath, timeout=3000)
-                if input_box:
-                    input_box.click()
-                    input_box.fill(str(target_budget))
-                    time.sleep(1)
-                else:
-                    self.log(f"嘗試 {attempt + 1}: 未找到預算輸入框")
-                    self.click_cancel_button()
-                    continue
-
-                # 3. 找到並點擊確認按鈕
-                confirm_xpath = '//body/div[last()]/div/div/div[2]/button[2]'
-                confirm_button = self.page.wait_for_selector(confirm_xpath, timeout=3000)
-                if confirm_button:
-                    confirm_button.click()
-                    time.sleep(2)
-                    self.log(f"   預算從 NT${current_budget} 調整為 NT${target_budget}")
-                    return True
-                else:
-                    self.log(f"嘗試 {attempt + 1}: 未找到確認按鈕")
-                    self.click_cancel_button()
-                    continue
-
-            except Exception as e:
-                if "could not convert string to float" in str(e):
-                    self.log(f"預算文字解析錯誤，原始文字: '{current_budget_text}'")
-                self.log(f"嘗試 {attempt + 1} 失敗: {str(e)}")
-                self.click_cancel_button()
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(2)
-                    continue
-                    
-        self.log(f"商品預算調整失敗，達到最大重試次數")
+    def in_cooldown(self, name):
+        """廣告是否在冷卻時間內調整過 (冷卻中時記錄日誌)，只用於低ROAS目標預算設定"""
+        cooldown = float(self.cooldown_minutes_var.get() or 0) * 60
+        if name and self.ledger.in_cooldown(name, cooldown=cooldown):
+            self.log(f"   {cooldown / 60:g} 分鐘內已調整過，略過")
+            return True
+        return False
+
+    def new_budget_breaker(self):
+        """每次執行共用的斷路器：連續失敗時暫停並關閉預算彈窗，多次恢復無效時停止執行"""
+        return 斷路器(失敗門檻=3, 恢復=self.recover_budget_modal, 暫停秒數=2)
+
+    def recover_budget_modal(self):
+        """關閉可能仍開著、遮擋表格的預算彈窗"""
+        self.page.keyboard.press('Escape')
+        self.click_cancel_button()
+        return True
+
+    def submit_budget(self, row_element, target_budget):
+        """打開預算彈窗、填入目標預算並確認 (一次嘗試，失敗時拋出 操作失敗)"""
+        edit_icon = row_element.query_selector('td:nth-child(4) div.title i svg')
+        if not edit_icon:
+            raise 操作失敗(找不到元素, "未找到編輯圖標")
+        parent_div = row_element.query_selector('td:nth-child(4) div.title')
+        if parent_div:
+            parent_div.hover()
+            time.sleep(1)
+        edit_icon.click()
+        time.sleep(2)
+
+        try:
+            input_xpath = '//body/div[last()]/div/div/div[1]/div[2]/div[1]/div/input'
+            input_box = self.page.wait_for_selector(input_xpath, timeout=3000)
+            if not input_box:
+                raise 操作失敗(找不到元素, "未找到預算輸入框")
+            input_box.click()
+            input_box.fill(str(int(target_budget)))
+            time.sleep(1)
+
+            confirm_xpath = '//body/div[last()]/div/div/div[2]/button[2]'
+            confirm_button = self.page.wait_for_selector(confirm_xpath, timeout=3000)
+            if not confirm_button:
+                raise 操作失敗(找不到元素, "未找到確認按鈕")
+            confirm_button.click()
+            time.sleep(2)
+            return True
+        except Exception:
+            self.click_cancel_button()
+            raise
+
+    def retry_submit_budget(self, row_element, target_budget, name):
+        """以重試策略提交預算，斷路器停止時結束本次執行"""
+        if self.budget_retry.執行(lambda: self.submit_budget(row_element, target_budget),
+                                 f"調整 {name or ''} 預算", self.budget_breaker):
+            return True
+        if self.budget_breaker.已停止:
+            self.log("連續調整失敗且無法恢復，停止本次執行")
+            self.is_running = False
         return False
 
+    def adjust_budget(self, row_element, current_budget_text, name=None, roas=None):
+        """調整預算 (成功時寫入預算調整紀錄)"""
+        try:
+            # 使用設置的預算調整金額
+            budget_adjust = float(self.budget_var.get())
+            current_budget = float(current_budget_text.replace('NT$', '').strip().split()[0])
+        except (ValueError, IndexError):
+            self.log(f"預算文字解析錯誤，原始文字: '{current_budget_text}'")
+            return False
+        target_budget = int(current_budget + budget_adjust)
+
+        if not self.retry_submit_budget(row_element, target_budget, name):
+            self.log(f"商品預算調整失敗，達到最大重試次數")
+            return False
+
+        self.log(f"   預算從 NT${current_budget} 調整為 NT${target_budget}")
+        self.ledger.record(name or '', current_budget, target_budget, roas=roas,
+                           average_spend=self.spend_cache.get(name), mode='high')
+        return True
+
     def click_cancel_button(self):
         """點擊取消按鈕"""
         try:
@@ -573,8 +693,123 @@ class RoasCheckerGUI:
         except Exception as e:
             self.log(f"點擊取消按鈕失敗: {str(e)}")
 
+    def wait_for_report(self, since_version, timeout=5):
+        """等待報表API回應更新 (重新整理、排序、翻頁之後)
+
+        Playwright 同步API只有在呼叫 Playwright 方法時才會分派事件，
+        因此用 wait_for_timeout 輪詢收集器的版本號。
+        """
+        if not self.use_report_capture_var.get():
+            return False
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.report_collector.version > since_version:
+                return True
+            self.page.wait_for_timeout(100)
+        # 沒收到新報表時不能沿用上一頁的數據
+        self.report_collector.invalidate()
+        self.log("未收到新的報表回應，改用表格抓取")
+        return False
+
+    def get_report_rows(self):
+        """以報表API的廣告列表建立與表格抓取相同格式的行資料
+
+        數據完全來自回應JSON，只讀取一次表格前半部分的名稱、預算文字與警告圖標，
+        用來找出預算編輯時要點擊的行。
+
+        Returns:
+            list: [{roas, budget, name, has_budget_warning, row_index}] (依表格順序)，
+                  沒有可用的報表數據時返回 None
+        """
+        if not self.use_report_capture_var.get():
+            return None
+        ads = self.report_collector.latest()
+        if not ads:
+            return None
+        # 報表中有七日平均花費時順便寫入快取，之後不必打開彈窗讀取
+        self.spend_cache.update_many(ads)
+
+        table_rows = self.page.evaluate(TABLE_ROWS_JS)
+        results = match_report_rows(ads, table_rows)
+        if results is None:
+            self.log("報表數據與表格不一致，改用表格抓取")
+        return results
+
+    def apply_spend_cache_ttl(self):
+        """在每次執行開始時套用介面的平均花費快取有效期限"""
+        try:
+            self.spend_cache.ttl = float(self.spend_cache_hours_var.get()) * 3600
+        except ValueError:
+            self.log(f"平均花費快取時間無效，使用 {self.spend_cache.ttl / 3600:g} 小時")
+
+    def collect_settings(self):
+        """在介面執行緒讀取所有設置，交給背景引擎使用"""
+        return {
+            'roas_threshold': float(self.roas_var.get()),
+            'budget_step': float(self.budget_var.get()),
+            'time_range': self.time_range_var.get(),
+            'first_roas_min': float(self.first_roas_min_var.get()),
+            'first_roas_max': float(self.first_roas_max_var.get()),
+            'first_budget': float(self.first_budget_var.get()),
+            'second_roas': float(self.second_roas_var.get()),
+            'second_budget': float(self.second_budget_var.get()),
+            'cooldown_minutes': float(self.cooldown_minutes_var.get() or 0)
+        }
+
+    def start_engine_run(self, mode):
+        """以背景引擎執行高/低ROAS調整"""
+        try:
+            settings = self.collect_settings()
+        except ValueError:
+            self.log("請輸入有效的數值設置")
+            return
+        if self.engine is None:
+            self.engine = AsyncRoasEngine(self.engine_events, ledger=self.ledger)
+        
+        self.total_adjustments = 0
+        self.total_pages = 0
+        self.is_running = True
+        self.stop_button.configure(state="normal")
+        self.log(f"\n=== 背景引擎開始執行{'高' if mode == 'high' else '低'}ROAS調整 ===")
+        if mode == 'high':
+            return self.engine.run_high_roas(settings)
+        return self.engine.run_low_roas(settings)
+
+    def poll_engine_events(self):
+        """處理背景引擎回報的事件"""
+        try:
+            while True:
+                kind, payload = self.engine_events.get_nowait()
+                if kind == 'log':
+                    self.log(payload['message'])
+                elif kind == 'page':
+                    self.total_pages = payload['page']
+                    self.log(f"\n=== 正在處理第 {self.total_pages} 頁 ===")
+                elif kind == 'adjusted':
+                    self.total_adjustments = payload['total']
+                elif kind == 'done':
+                    self.is_running = False
+                    self.stop_button.configure(state="disabled")
+                    self.total_session_adjustments += payload['adjustments']
+                    self.log("\n=== 處理完成 ===")
+                    self.log(f"本次共處理 {payload['pages']} 頁")
+                    self.log(f"本次共調整 {payload['adjustments']} 個廣告預算")
+                    self.log(f"程式運行期間總共調整: {self.total_session_adjustments} 個廣告預算")
+                    self.update_statistics()
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_engine_events)
+
     def manual_capture(self):
-        """手動抓取當前選擇的元素"""
+        """手動抓取當前選擇的元素
+
+        Returns:
+            使用背景引擎時返回引擎執行的 Future (引擎忙碌時為 None)，否則返回 None
+        """
+        self.apply_spend_cache_ttl()
+        if self.use_async_engine_var.get():
+            return self.start_engine_run('high')
+        
         if not self.page:
             self.log("請先連接瀏覽器")
             return
@@ -588,6 +823,7 @@ class RoasCheckerGUI:
             # 初始化統計數據
             self.total_adjustments = 0
             self.total_pages = 0
+            self.budget_breaker = self.new_budget_breaker()
             
             # 重新整理頁面
             self.log("正在重新整理頁面...")
@@ -607,9 +843,11 @@ class RoasCheckerGUI:
             self.set_page_size()
             time.sleep(2)
 
-            # 先進行ROI排序
+            # 先進行ROI排序 (在排序前才記錄版本，重新整理、時間範圍與每頁數量的報表回應不算數)
+            report_version = self.report_collector.version
             self.sort_by_roas()
             time.sleep(2)
+            self.wait_for_report(report_version)
 
             while True:
                 self.total_pages += 1
@@ -618,6 +856,11 @@ class RoasCheckerGUI:
                 # 處理當前頁面
                 continue_next_page = self.process_current_page(roas_threshold)
                 
+                # 斷路器停止時不再處理後續頁面 (之後的調整都會立即失敗)
+                if self.budget_breaker.已停止:
+                    self.log("\n連續調整失敗，已停止處理後續頁面")
+                    break
+                
                 if not continue_next_page:
                     self.log("\n已達到ROAS閾值，停止處理")
                     break
@@ -646,6 +889,7 @@ class RoasCheckerGUI:
                         break
                         
                     # 點擊下一頁
+                    report_version = self.report_collector.version
                     self.page.evaluate('''() => {
                         const nextBtn = document.evaluate(
                             '/html/body/div[1]/div[2]/div[2]/div/div/div/div[3]/div[2]/div[2]/div[3]/div[3]/div[5]/div/div[1]/button[2]',
@@ -657,6 +901,7 @@ class RoasCheckerGUI:
                         if (nextBtn) nextBtn.click();
                     }''')
                     time.sleep(3)  # 等待頁面加載
+                    self.wait_for_report(report_version)
                     
                 except Exception as e:
                     self.log(f"翻頁失敗: {str(e)}")
@@ -723,31 +968,37 @@ class RoasCheckerGUI:
             }
             """
             
-            results = self.page.evaluate(js_code)
+            results = self.get_report_rows()
+            if results is None:
+                results = self.page.evaluate(js_code)
+            else:
+                self.log(f"使用報表API數據 ({len(results)} 筆廣告)")
             
             if results:
                 rows = self.page.query_selector_all('div.eds-table tbody tr')
                 total_rows = len(rows) // 2
                 
+                # 整頁一次解析ROAS (包含 'k' 的值)
+                roas_values = parse_values([item['roas'] for item in results])
+                roas_threshold = float(roas_threshold)
+                
                 for i, item in enumerate(results, 1):
-                    warning = " ⚠️" if item['has_budget_warning'] else ""
+                    if self.budget_breaker.已停止:
+                        return False
                     
-                    # 處理包含 'k' 的 ROAS 值
-                    roas_str = item['roas'].lower() if item['roas'] else '0'
-                    if 'k' in roas_str:
-                        roi = float(roas_str.replace('k', '')) * 1000
-                    else:
-                        roi = float(roas_str) if roas_str else 0
+                    warning = " ⚠️" if item['has_budget_warning'] else ""
+                    roi = roas_values[i - 1]
                     
                     self.log(f"{i}. ROI：{item['roas']}  預算：{item['budget']}{warning}")
                     
-                    if roi < float(roas_threshold):
+                    if roi < roas_threshold:
                         return False
                     
                     if item['has_budget_warning']:
-                        self.log(f"   正在調整預算...")
                         row = rows[item['row_index']]
-                        if self.adjust_budget(row, item['budget']):
+                        name = item.get('name') or (row.query_selector('td:nth-child(2)') or row).text_content().strip()
+                        self.log(f"   正在調整預算...")
+                        if self.adjust_budget(row, item['budget'], name=name, roas=float(roi)):
                             self.log(f"   預算調整成功")
                             self.total_adjustments += 1
                         else:
@@ -767,15 +1018,24 @@ class RoasCheckerGUI:
     def on_closing(self):
         """關閉程式時清理資源"""
         self.stop_auto_run()
+        try:
+            if self.engine:
+                self.engine.shutdown()
+        except:
+            pass
         try:
             if self.playwright:
                 self.playwright.stop()
         except:
             pass
+        self.ledger.close()
         self.root.destroy()
 
     def toggle_browser_state(self):
         """切換瀏覽器的前景/背景狀態"""
+        if win32gui is None:
+            self.log("此系統不支援瀏覽器視窗控制")
+            return
         try:
             if not self.browser_hwnd:
                 self.find_chrome_window()
@@ -793,123 +1053,6 @@ class RoasCheckerGUI:
         except Exception as e:
             self.log(f"切換瀏覽器狀態失敗: {str(e)}")
 
-    def get_average_spend(self, row_element):
-        """獲取七日內的平均花費"""
-        try:
-            # 1. 找到並點擊編輯圖標
-            edit_icon = row_element.query_selector('td:nth-child(4) div.title i svg')
-            if edit_icon:
-                parent_div = row_element.query_selector('td:nth-child(4) div.title')
-                if parent_div:
-                    parent_div.hover()
-                    time.sleep(1)
-                parent_div.click()
-                time.sleep(3)
-            else:
-                self.log("未找到編輯圖標")
-                return None
-
-            # 2. 等待並獲取平均花費
-            try:
-                # 獲取當前行的位置信息
-                rect = row_element.bounding_box()
-                if not rect:
-                    self.log("無法獲取行位置")
-                    return None
-                    
-                js_code = """
-                (rowY) => {
-                    return new Promise((resolve) => {
-                        let attempts = 0;
-                        const maxAttempts = 20;
-                        
-                        const checkElement = () => {
-                            try {
-                                const popups = Array.from(document.querySelectorAll('.budget-edit-cell'));
-                                let targetPopup = null;
-                                let minDistance = Infinity;
-                                
-                                popups.forEach(popup => {
-                                    if (window.getComputedStyle(popup).display !== 'none') {
-                                        const rect = popup.getBoundingClientRect();
-                                        const distance = Math.abs(rect.top - rowY);
-                                        if (distance < minDistance) {
-                                            minDistance = distance;
-                                            targetPopup = popup;
-                                        }
-                                    }
-                                });
-                                
-                                if (targetPopup) {
-                                    const tipItems = targetPopup.querySelectorAll('.tip-item');
-                                    let avgSpend = null;
-                                    
-                                    tipItems.forEach(item => {
-                                        const text = item.textContent.trim();
-                                        if (text.includes('七日內的平均花費')) {
-                                            avgSpend = text.split('NT$')[1].trim();
-                                        }
-                                    });
-                                    
-                                    resolve({
-                                        value: avgSpend,
-                                        distance: minDistance
-                                    });
-                                } else if (attempts >= maxAttempts) {
-                                    resolve({ value: null });
-                                } else {
-                                    attempts++;
-                                    setTimeout(checkElement, 500);
-                                }
-                            } catch (err) {
-                                resolve({ value: null, error: err.toString() });
-                            }
-                        };
-                        checkElement();
-                    });
-                }
-                """
-                
-                result = self.page.evaluate(js_code, rect['y'])
-                
-                if result.get('error'):
-                    self.log(f"JavaScript錯誤: {result['error']}")
-                    return None
-                
-                if result['value']:
-                    spend = float(result['value'])
-                    self.log(f"七日內的平均花費: NT${spend}")
-                    
-                    # 3. 點擊取消按鈕關閉編輯框
-                    self.click_cancel_button()
-                    return spend
-                else:
-                    self.log("未找到平均花費")
-                    self.click_cancel_button()
-                    return None
-                    
-            except Exception as e:
-                self.log(f"解析平均花費時出錯: {str(e)}")
-                self.click_cancel_button()
-                return None
-            
-        except Exception as e:
-            self.log(f"獲取平均花費失敗: {str(e)}")
-            self.click_cancel_button()
-            return None
-
-    def get_target_budget(self, avg_spend):
-        """根據平均花費決定目標預算"""
-        if avg_spend <= 40:
-            return 40
-        elif avg_spend <= 60:
-            return 60
-        elif avg_spend <= 80:
-            return 80
-        else:
-            # 向上取整到下一個20的倍數
-            return math.ceil(avg_spend / 20) * 20
-
     def test_low_roas_adjustment(self):
         """測試ROAS<10的廣告預算調整"""
         if not self.page:
@@ -956,6 +1099,11 @@ class RoasCheckerGUI:
 
     def execute_low_roas_adjustment(self):
         """執行低ROAS調整"""
+        self.apply_spend_cache_ttl()
+        if self.use_async_engine_var.get():
+            self.start_engine_run('low')
+            return
+        
         if not self.page:
             self.log("請先連接瀏覽器")
             return
@@ -966,6 +1114,7 @@ class RoasCheckerGUI:
             # 初始化統計數據
             self.total_adjustments = 0
             self.total_pages = 0
+            self.budget_breaker = self.new_budget_breaker()
             
             # 獲取ROAS範圍
             low_roas_min = float(self.low_roas_min_var.get())
@@ -985,9 +1134,18 @@ class RoasCheckerGUI:
             self.set_page_size()
             time.sleep(2)
             
-            # 先進行ROI排序
+            # 先進行ROI排序 (在排序前才記錄版本，重新整理、時間範圍與每頁數量的報表回應不算數)
+            report_version = self.report_collector.version
             self.sort_by_roas()
             time.sleep(2)
+            self.wait_for_report(report_version)
+            
+            if self.preplan_var.get():
+                self.run_planned_low_roas()
+                self.is_running = False
+            else:
+                # ROI已降序排列：直接跳到第一個可能有符合級距的頁
+                self.total_pages = self.skip_to_first_low_roas_page() - 1
             
             while self.is_running:
                 self.total_pages += 1
@@ -996,6 +1154,10 @@ class RoasCheckerGUI:
                 # 處理當前頁面，傳入ROAS範圍
                 self.process_low_roas_page(low_roas_min, low_roas_max)
                 
+                if self.reached_tier_floor:
+                    self.log("\nROAS已低於所有級距，後面的頁面不需處理")
+                    break
+                
                 # 檢查是否有下一頁按鈕且可點擊
                 try:
                     # 使用新的 XPath 檢查下一頁按鈕狀態
@@ -1020,6 +1182,7 @@ class RoasCheckerGUI:
                         break
                         
                     # 點擊下一頁
+                    report_version = self.report_collector.version
                     self.page.evaluate('''() => {
                         const nextBtn = document.evaluate(
                             '/html/body/div[1]/div[2]/div[2]/div/div/div/div[3]/div[2]/div[2]/div[3]/div[3]/div[5]/div/div[1]/button[2]',
@@ -1031,6 +1194,7 @@ class RoasCheckerGUI:
                         if (nextBtn) nextBtn.click();
                     }''')
                     time.sleep(3)  # 等待頁面加載
+                    self.wait_for_report(report_version)
                     
                 except Exception as e:
                     self.log(f"翻頁失敗: {str(e)}")
@@ -1054,8 +1218,192 @@ class RoasCheckerGUI:
             self.log(f"執行過程發生錯誤: {str(e)}")
             self.restore_browser()
 
+    def prepare_table(self):
+        """重新整理並設置時間範圍、每頁數量與ROI排序"""
+        self.page.reload()
+        time.sleep(5)
+        self.set_time_range()
+        time.sleep(2)
+        self.set_page_size()
+        time.sleep(2)
+        # 在排序前才記錄版本，只等待排序之後的報表回應
+        report_version = self.report_collector.version
+        self.sort_by_roas()
+        time.sleep(2)
+        self.wait_for_report(report_version)
+
+    def click_next_page(self):
+        """點擊下一頁並等待數據更新
+
+        Returns:
+            str: 'clicked'、'disabled' 或 'not_found'
+        """
+        report_version = self.report_collector.version
+        status = self.page.evaluate('''() => {
+            const nextBtn = document.evaluate(
+                '/html/body/div[1]/div[2]/div[2]/div/div/div/div[3]/div[2]/div[2]/div[3]/div[3]/div[5]/div/div[1]/button[2]',
+                document,
+                null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE,
+                null
+            ).singleNodeValue;
+            if (!nextBtn) return 'not_found';
+            if (nextBtn.disabled) return 'disabled';
+            nextBtn.click();
+            return 'clicked';
+        }''')
+        if status == 'clicked':
+            time.sleep(3)  # 等待頁面加載
+            self.wait_for_report(report_version)
+        return status
+
+    def get_total_pages(self):
+        """從分頁器讀取總頁數，找不到時返回 None"""
+        return self.page.evaluate('''() => {
+            const pages = Array.from(document.querySelectorAll('.eds-pager__page'))
+                .map(page => parseInt(page.textContent.trim(), 10))
+                .filter(n => !isNaN(n));
+            return pages.length ? Math.max(...pages) : null;
+        }''')
+
+    def goto_page_number(self, page_number):
+        """透過分頁器的頁碼按鈕或跳頁輸入框直接前往指定頁
+
+        Returns:
+            bool: 是否成功切換
+        """
+        report_version = self.report_collector.version
+        method = self.page.evaluate('''(target) => {
+            for (const page of document.querySelectorAll('.eds-pager__page')) {
+                if (page.textContent.trim() === String(target) && page.offsetParent !== null) {
+                    page.click();
+                    return 'button';
+                }
+            }
+            return document.querySelector('.eds-pager__jumper input, .eds-pager__jumper-input input') ? 'jumper' : null;
+        }''', page_number)
+        if method == 'jumper':
+            jumper = '.eds-pager__jumper input, .eds-pager__jumper-input input'
+            self.page.fill(jumper, str(page_number))
+            self.page.press(jumper, 'Enter')
+        elif not method:
+            return False
+        if not self.wait_for_report(report_version):
+            time.sleep(3)  # 等待頁面加載
+        return True
+
+    def skip_to_first_low_roas_page(self):
+        """以二分搜尋前往第一個可能包含符合低ROAS級距的頁
+
+        Returns:
+            int: 目前所在頁碼
+        """
+        tiers = tiers_from_settings(self.collect_settings())
+        highest = tier_range(tiers)[1]
+        total_pages = self.get_total_pages() or 1
+        if total_pages <= 1:
+            return 1
+
+        current = [1]
+
+        def get_page_min_roas(page_number):
+            if page_number != current[0]:
+                if not self.goto_page_number(page_number):
+                    return None
+                current[0] = page_number
+            roas_values = parse_values([row['roas'] for row in self.read_page_rows()])
+            return float(roas_values.min()) if roas_values.size else None
+
+        first_page = find_first_page(get_page_min_roas, total_pages, highest)
+        if first_page != current[0] and not self.goto_page_number(first_page):
+            self.log("無法直接跳頁，從第1頁開始處理")
+            self.prepare_table()
+            return 1
+        if first_page > 1:
+            self.log(f"前 {first_page - 1} 頁的ROAS都高於 {highest}，直接從第 {first_page} 頁開始")
+        return first_page
+
+    def read_page_rows(self):
+        """讀取當前頁所有廣告行，優先使用報表API數據"""
+        rows = self.get_report_rows()
+        if rows is None:
+            rows = self.page.evaluate(SCRAPE_ROWS_JS)
+        return rows or []
+
+    def find_row_by_name(self, action):
+        """依規劃時的名稱找到當前表格中對應的行元素"""
+        table_rows = self.page.evaluate(TABLE_ROWS_JS)
+        index = action['row_index']
+        if not (index < len(table_rows) and action['name'] in table_rows[index]['name']):
+            index = next((i for i, row in enumerate(table_rows) if action['name'] in row['name']), None)
+        if index is None:
+            return None
+        return self.page.query_selector_all('div.eds-table tbody tr')[index]
+
+    def run_planned_low_roas(self):
+        """先掃描所有頁面規劃低ROAS調整，再只對需要變更的廣告打開預算彈窗"""
+        settings = self.collect_settings()
+        plan = BudgetPlan()
+
+        # 1. 掃描：只讀取數據，不打開任何彈窗；跳過ROAS都高於級距的頁，低於級距後停止
+        lowest = tier_range(tiers_from_settings(settings))[0]
+        self.total_pages = self.skip_to_first_low_roas_page() - 1
+        while self.is_running:
+            self.total_pages += 1
+            rows = self.read_page_rows()
+            plan.add_low_roas_page(self.total_pages, rows, settings)
+            self.root.update()
+            roas_values = parse_values([row['roas'] for row in rows])
+            if not rows or roas_values[-1] < lowest or self.click_next_page() != 'clicked':
+                break
+
+        cooldown = settings['cooldown_minutes'] * 60
+        plan.actions, cooling = self.ledger.filter_actions(plan.actions, cooldown)
+        if cooling:
+            self.log(f"略過 {len(cooling)} 個 {cooldown / 60:g} 分鐘內已調整過的廣告")
+
+        self.log("\n=== 預算調整規劃 ===")
+        for line in plan.preview_lines():
+            self.log(line)
+        if self.dry_run_var.get() or not plan.actions:
+            return
+
+        # 2. 執行：透過分頁器直接跳到有調整項目的頁面 (掃描結束時停在最後掃描的頁)
+        current_page = [self.total_pages]
+
+        def goto_page(page):
+            if current_page[0] == page:
+                return True
+            if not self.goto_page_number(page):
+                self.log(f"無法跳到第 {page} 頁")
+                return False
+            current_page[0] = page
+            return True
+
+        def adjust(action):
+            self.root.update()
+            row = self.find_row_by_name(action)
+            if row is None:
+                self.log(f"   找不到廣告 {action['name']}，略過")
+                return False
+            if self.adjust_budget_with_target(row, action['current'], action['target'], action['name'],
+                                              roas=action['roas']):
+                self.total_adjustments += 1
+                return True
+            return False
+
+        time_budget = float(self.time_budget_var.get() or 0) * 60
+        executor = BudgetPlanExecutor(goto_page, adjust,
+                                      time_budget=time_budget or None,
+                                      should_continue=lambda: self.is_running)
+        result = executor.run(plan)
+        self.log(f"規劃執行結果: 成功 {result['done']} 個，失敗 {result['failed']} 個，未執行 {result['remaining']} 個")
+        if result['timed_out']:
+            self.log("已達到本次執行的時間上限，剩餘調整留待下次執行")
+
     def process_low_roas_page(self, low_roas_min, low_roas_max):
         """處理當前頁面的低ROAS數據"""
+        self.reached_tier_floor = False
         try:
             js_code = """
             () => {
@@ -1094,54 +1442,44 @@ class RoasCheckerGUI:
             }
             """
             
-            results = self.page.evaluate(js_code)
+            results = self.get_report_rows()
+            if results is None:
+                results = self.page.evaluate(js_code)
+            else:
+                self.log(f"使用報表API數據 ({len(results)} 筆廣告)")
             
             if results:
                 rows = self.page.query_selector_all('div.eds-table tbody tr')
                 total_rows = len(rows) // 2
 
+                # 整頁一次解析ROAS/預算 ('k'、'nt$0.00'、逗號；無法轉換時為0) 並套用級距表
+                tiers = tiers_from_settings(self.collect_settings())
+                roas_values = parse_values([item['roas'] for item in results])
+                budgets = parse_values([item['budget'] for item in results])
+                targets = apply_tiers(roas_values, tiers)
+                lowest = tier_range(tiers)[0]
+
                 for i, item in enumerate(results, 1):
                     if not self.is_running:
                         return False
                     
-                    self.root.update()
-                    
-                    # 處理包含 'k' 的 ROAS 值，並處理 'nt$0.00' 的情況
-                    roas_str = item['roas'].lower() if item['roas'] else '0'
-                    roas_str = roas_str.replace('nt$', '').replace(',', '')
-                    
-                    try:
-                        if 'k' in roas_str:
-                            roi = float(roas_str.replace('k', '')) * 1000
-                        else:
-                            roi = float(roas_str) if roas_str else 0
-                    except ValueError:
-                        roi = 0  # 如果無法轉換，設為0
+                    # ROI降序排列，低於所有級距後剩下的行都不需處理
+                    if roas_values[i - 1] < lowest:
+                        self.reached_tier_floor = True
+                        break
                     
-                    # 移除預算中的逗號和NT$符號，並處理可能的格式問題
-                    budget_str = item['budget'].replace('NT$', '').replace('nt$', '').replace(',', '').strip()
-                    try:
-                        current_budget = float(budget_str)
-                    except ValueError:
-                        current_budget = 0  # 如果無法轉換，設為0
+                    self.root.update()
                     
                     self.log(f"\n{i}. 商品：{item['name']}")
                     self.log(f"   ROI：{item['roas']}  預算：{item['budget']}")
                     
-                    # 根據不同的ROAS範圍設置目標預算
-                    first_roas_min = float(self.first_roas_min_var.get())
-                    first_roas_max = float(self.first_roas_max_var.get())
-                    second_roas_threshold = float(self.second_roas_var.get())
-                    
-                    target_budget = None
-                    if first_roas_min <= roi <= first_roas_max:
-                        target_budget = float(self.first_budget_var.get())
-                    elif roi <= second_roas_threshold:
-                        target_budget = float(self.second_budget_var.get())
-                    
-                    if target_budget is not None:
+                    target_budget = targets[i - 1]
+                    if not math.isnan(target_budget):
+                        if abs(budgets[i - 1] - target_budget) >= 1 and self.in_cooldown(item['name']):
+                            continue
                         row = rows[item['row_index']]
-                        if self.adjust_budget_with_target(row, current_budget, target_budget, item['name']):
+                        if self.adjust_budget_with_target(row, float(budgets[i - 1]), float(target_budget), item['name'],
+                                                          roas=float(roas_values[i - 1])):
                             self.total_adjustments += 1
                     
                     self.root.update()
@@ -1156,55 +1494,21 @@ class RoasCheckerGUI:
             self.log(f"處理當前頁面失敗: {str(e)}")
             return False
 
-    def adjust_budget_with_target(self, row_element, current_budget, target_budget, product_name):
-        """根據指定的目標預算進行調整"""
-        try:
-            # 檢查是否需要調整
-            if abs(current_budget - target_budget) < 1:  # 允許1元誤差
-                self.log(f"   當前預算 NT${current_budget} 已經接近目標預算 NT${target_budget}，無需調整")
-                return True
-
-            # 找到並點擊編輯圖標
-            edit_icon = row_element.query_selector('td:nth-child(4) div.title i svg')
-            if not edit_icon:
-                self.log("未找到編輯圖標")
-                return False
-
-            parent_div = row_element.query_selector('td:nth-child(4) div.title')
-            if parent_div:
-                parent_div.hover()
-                time.sleep(1)
-            edit_icon.click()
-            time.sleep(2)
+    def adjust_budget_with_target(self, row_element, current_budget, target_budget, product_name, roas=None):
+        """根據指定的目標預算進行調整 (成功時寫入預算調整紀錄)"""
+        # 檢查是否需要調整
+        if abs(current_budget - target_budget) < 1:  # 允許1元誤差
+            self.log(f"   當前預算 NT${current_budget} 已經接近目標預算 NT${target_budget}，無需調整")
+            return True
 
-            # 調整預算
-            input_xpath = '//body/div[last()]/div/div/div[1]/div[2]/div[1]/div/input'
-            input_box = self.page.wait_for_selector(input_xpath, timeout=3000)
-            if input_box:
-                input_box.click()
-                input_box.fill(str(int(target_budget)))
-                time.sleep(1)
-
-                # 確認修改
-                confirm_xpath = '//body/div[last()]/div/div/div[2]/button[2]'
-                confirm_button = self.page.wait_for_selector(confirm_xpath, timeout=3000)
-                if confirm_button:
-                    confirm_button.click()
-                    time.sleep(2)
-                    self.log(f"✅ 預算調整成功\n   商品：{product_name}\n   從 NT${current_budget} 調整為 NT${target_budget}")
-                    return True
-                else:
-                    self.log("未找到確認按鈕")
-                    self.click_cancel_button()
-            else:
-                self.log("未找到預算輸入框")
-                self.click_cancel_button()
+        if not self.retry_submit_budget(row_element, target_budget, product_name):
+            self.log(f"調整預算失敗: {product_name}")
+            return False
 
-        except Exception as e:
-            self.log(f"調整預算失敗: {str(e)}")
-            self.click_cancel_button()
-        
-        return False
+        self.log(f"✅ 預算調整成功\n   商品：{product_name}\n   從 NT${current_budget} 調整為 NT${target_budget}")
+        self.ledger.record(product_name, current_budget, target_budget, roas=roas,
+                           average_spend=self.spend_cache.get(product_name), mode='low')
+        return True
 
     def get_average_spend_from_popup(self):
         """從已打開的編輯框中獲取平均花費"""
@@ -1224,6 +1528,8 @@ class RoasCheckerGUI:
     def stop_execution(self):
         """停止執行"""
         self.is_running = False
+        if self.engine:
+            self.engine.stop()
         self.stop_button.configure(state="disabled")
         self.log("\n=== 執行已停止 ===")
         self.log(f"本次共調整 {self.total_adjustments} 個廣告預算")
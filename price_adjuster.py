@@ -12,6 +12,7 @@ import os
 import subprocess
 import json
 from page_analyzer import ShopeePageAnalyzer
+from 模組.執行設定 import 執行設定JS, 捲動到元素JS, 是否高亮, 等待
 from selenium.webdriver.common.keys import Keys
 
 class PriceAdjusterGUI:
@@ -478,8 +479,8 @@ class PriceAdjusterGUI:
                             
                             if not is_disabled and not is_open:
                                 # 滾動到元素位置
-                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", switch)
-                                time.sleep(0.5)
+                                self.driver.execute_script(捲動到元素JS(), switch)
+                                等待(0.5)
                                 
                                 # 點擊開關
                                 self.driver.execute_script("arguments[0].click();", switch)
@@ -674,12 +675,13 @@ class PriceAdjusterGUI:
                     
                     if edit_button:
                         # 高亮顯示找到的按鈕
-                        self.driver.execute_script("arguments[0].style.border='3px solid red';", edit_button)
+                        if 是否高亮():
+                            self.driver.execute_script("arguments[0].style.border='3px solid red';", edit_button)
                         
                         # 滾動到按鈕位置
                         self.log_status("滾動到按鈕位置...")
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", edit_button)
-                        time.sleep(1)  # 等待滾動完成
+                        self.driver.execute_script(捲動到元素JS(), edit_button)
+                        等待(1)  # 等待滾動完成
                         
                         # 使用操作鏈模擬更真實的滑鼠行為
                         self.log_status("模擬真實滑鼠點擊...")
@@ -737,7 +739,7 @@ class PriceAdjusterGUI:
                                     # 直接使用JavaScript查找並點擊按鈕
                                     self.log_status("使用直接JavaScript方法處理「注意」彈窗")
                                     
-                                    js_result = self.driver.execute_script("""
+                                    js_result = self.driver.execute_script(執行設定JS() + """
                                         // 方法1: 使用精確的CSS選擇器
                                         let btn = document.querySelector('.eds-modal__footer-buttons .eds-button--primary');
                                         console.log('方法1找到按鈕:', btn);
@@ -786,7 +788,7 @@ class PriceAdjusterGUI:
                                             console.log('按鈕HTML:', btn.outerHTML);
                                             
                                             // 標記按鈕
-                                            btn.style.border = '5px solid red';
+                                            if (執行設定.highlight) btn.style.border = '5px solid red';
                                             
                                             // 嘗試點擊按鈕的多種方法
                                             try {
@@ -988,12 +990,13 @@ class PriceAdjusterGUI:
                                         pass
                                     
                                     # 高亮顯示找到的按鈕
-                                    self.driver.execute_script("arguments[0].style.border='5px solid red';", confirm_button)
+                                    if 是否高亮():
+                                        self.driver.execute_script("arguments[0].style.border='5px solid red';", confirm_button)
                                     
                                     # 滾動到按鈕位置
                                     self.log_status("滾動到按鈕位置...")
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", confirm_button)
-                                    time.sleep(1)  # 等待滾動完成
+                                    self.driver.execute_script(捲動到元素JS(), confirm_button)
+                                    等待(1)  # 等待滾動完成
                                     
                                     # 獲取按鈕文本用於記錄
                                     button_text = confirm_button.text
@@ -1304,12 +1307,13 @@ class PriceAdjusterGUI:
                                     button_text = confirm_button.text
                                     
                                     # 高亮顯示找到的按鈕
-                                    self.driver.execute_script("arguments[0].style.border='3px solid red';", confirm_button)
+                                    if 是否高亮():
+                                        self.driver.execute_script("arguments[0].style.border='3px solid red';", confirm_button)
                                     
                                     # 滾動到按鈕位置
                                     self.log_status("滾動到按鈕位置...")
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", confirm_button)
-                                    time.sleep(1)  # 等待滾動完成
+                                    self.driver.execute_script(捲動到元素JS(), confirm_button)
+                                    等待(1)  # 等待滾動完成
                                     
                                     # 使用操作鏈模擬更真實的滑鼠行為
                                     self.log_status(f"模擬真實滑鼠點擊第二個彈窗的「{button_text}」按鈕...")
@@ -2041,13 +2045,13 @@ class PriceAdjusterGUI:
             
             # 方法1: 使用JavaScript直接定位並點擊按鈕 (最可靠的方法)
             self.log_status("方法1: 使用JavaScript直接點擊...")
-            js_result = self.driver.execute_script("""
+            js_result = self.driver.execute_script(執行設定JS() + """
                 try {
                     // 直接獲取確認按鈕
                     const confirmButton = document.querySelector('.eds-modal__footer-buttons .eds-button--primary');
                     if (confirmButton) {
                         // 高亮顯示按鈕
-                        confirmButton.style.border = '3px solid red';
+                        if (執行設定.highlight) confirmButton.style.border = '3px solid red';
                         
                         // 記錄按鈕資訊
                         console.log('確認按鈕文字:', confirmButton.innerText);
@@ -2102,7 +2106,8 @@ class PriceAdjusterGUI:
                     self.log_status(f"找到按鈕: {button.text}")
                     
                     # 高亮顯示按鈕
-                    self.driver.execute_script("arguments[0].style.border='3px solid blue';", button)
+                    if 是否高亮():
+                        self.driver.execute_script("arguments[0].style.border='3px solid blue';", button)
                     
                     # 方法3.1: 直接點擊
                     try:
@@ -0,0 +1,172 @@
+"""
+ROAS預算決策模組
+
+把整頁 (或整次執行、多個商店) 的行資料一次轉成 NumPy 陣列，
+向量化地解析 ROAS/預算文字，再套用宣告式的級距表 (ROAS範圍 → 目標預算) 產生調整動作。
+規則只依賴陣列與級距表，可以離線對大量廣告做單元測試。
+"""
+
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from ads_report import parse_number
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# ROAS 在 [low, high] (含兩端) 之間時把預算設為 budget；級距依順序比對，先符合者優先
+Tier = namedtuple("Tier", ["low", "high", "budget"])
+
+# 目前預算與目標預算相差小於此值時視為不需調整
+DEFAULT_TOLERANCE = 1
+
+
+def tiers_from_settings(settings):
+    """由介面的低ROAS設置建立級距表
+
+    與 process_low_roas_page 的判斷相同：
+    第一範圍 first_roas_min ≤ ROAS ≤ first_roas_max，否則 ROAS ≤ second_roas 套用第二範圍。
+    """
+    return [
+        Tier(settings['first_roas_min'], settings['first_roas_max'], settings['first_budget']),
+        Tier(-np.inf, settings['second_roas'], settings['second_budget'])
+    ]
+
+
+def parse_values(values):
+    """向量化解析 ROAS/預算文字
+
+    支援 'k' 後綴、'NT$' 前綴、千分位逗號；空白或無法解析的值為 0。
+
+    Args:
+        values: 文字或數字的序列
+
+    Returns:
+        numpy.ndarray: float64 陣列
+    """
+    if len(values) == 0:
+        return np.zeros(0)
+    text = np.char.strip(np.char.lower(np.asarray([str(v) if v is not None else '' for v in values])))
+    text = np.char.replace(np.char.replace(text, 'nt$', ''), ',', '')
+    is_k = np.char.endswith(text, 'k')
+    text = np.where(is_k, np.char.rstrip(text, 'k'), text)
+    text = np.where(np.char.str_len(text) == 0, '0', text)
+    try:
+        numbers = text.astype(np.float64)
+    except ValueError:
+        # 少數無法解析的文字 ('-' 等) 才逐一處理
+        numbers = np.array([parse_number(v) or 0.0 for v in text], dtype=np.float64)
+    return np.where(is_k, numbers * 1000, numbers)
+
+
+def apply_tiers(roas, tiers):
+    """依級距表計算每一行的目標預算
+
+    Args:
+        roas (numpy.ndarray): ROAS 陣列
+        tiers (list): Tier 列表
+
+    Returns:
+        numpy.ndarray: 目標預算，沒有符合任何級距的行為 NaN
+    """
+    target = np.full(roas.shape, np.nan)
+    unmatched = np.ones(roas.shape, dtype=bool)
+    for tier in tiers:
+        hit = unmatched & (roas >= tier.low) & (roas <= tier.high)
+        target[hit] = tier.budget
+        unmatched &= ~hit
+    return target
+
+
+def decide_low_roas(rows, tiers, tolerance=DEFAULT_TOLERANCE, page=1):
+    """產生低ROAS預算調整動作
+
+    Args:
+        rows (list): 行資料 (roas/budget/name/row_index，可含 page)
+        tiers (list): Tier 列表
+        tolerance (float): 容許誤差
+        page (int): 行資料沒有 page 時使用的頁碼
+
+    Returns:
+        tuple: (動作列表, 已在容許誤差內的數量)，動作格式與 budget_planner 相同
+    """
+    if not rows:
+        return [], 0
+    roas = parse_values([row['roas'] for row in rows])
+    current = parse_values([row['budget'] for row in rows])
+    target = apply_tiers(roas, tiers)
+
+    matched = ~np.isnan(target)
+    change = matched & (np.abs(current - np.nan_to_num(target)) >= tolerance)
+    actions = [{
+        'page': rows[i].get('page', page),
+        'name': rows[i].get('name', ''),
+        'row_index': rows[i]['row_index'],
+        'roas': float(roas[i]),
+        'current': float(current[i]),
+        'target': float(target[i])
+    } for i in np.flatnonzero(change)]
+    return actions, int(np.count_nonzero(matched & ~change))
+
+
+def decide_high_roas(rows, roas_threshold, budget_step, page=1):
+    """產生高ROAS預算增加動作
+
+    rows 依ROAS降序排列，只看第一個低於閾值的行之前的行；
+    預算文字無法解析的行不調整。
+
+    Returns:
+        tuple: (動作列表, 是否需要繼續下一頁)
+    """
+    if not rows:
+        return [], False
+    roas = parse_values([row['roas'] for row in rows])
+    current = parse_values([row['budget'] for row in rows])
+    below = np.flatnonzero(roas < roas_threshold)
+    stop = int(below[0]) if below.size else len(rows)
+
+    warning = np.array([bool(row.get('has_budget_warning')) and parse_number(row['budget']) is not None
+                        for row in rows[:stop]], dtype=bool)
+    actions = [{
+        'page': rows[i].get('page', page),
+        'name': rows[i].get('name', ''),
+        'row_index': rows[i]['row_index'],
+        'roas': float(roas[i]),
+        'current': float(current[i]),
+        'target': float(int(current[i] + budget_step))
+    } for i in np.flatnonzero(warning)]
+    return actions, stop == len(rows)
+
+
+def tier_range(tiers):
+    """級距表涵蓋的ROAS範圍 (最低下限, 最高上限)"""
+    return min(tier.low for tier in tiers), max(tier.high for tier in tiers)
+
+
+def find_first_page(get_page_min_roas, total_pages, highest):
+    """以二分搜尋找出第一個可能包含 ROAS ≤ highest 的頁
+
+    表格依ROAS降序排列，頁內與跨頁都是遞減的，
+    因此某頁最小ROAS > highest 時，該頁與之前的頁都不可能有符合級距的行。
+
+    Args:
+        get_page_min_roas (callable): get_page_min_roas(頁碼) 返回該頁最小ROAS，無法讀取時返回 None
+        total_pages (int): 總頁數
+        highest (float): 級距表的最高上限
+
+    Returns:
+        int: 頁碼 (從1開始)
+    """
+    low, high = 1, max(1, total_pages)
+    while low < high:
+        middle = (low + high) // 2
+        page_min = get_page_min_roas(middle)
+        if page_min is None:
+            return low
+        if page_min <= highest:
+            high = middle
+        else:
+            low = middle + 1
+    return low
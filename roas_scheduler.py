@@ -0,0 +1,270 @@
+"""
+廣告自動執行排程模組
+
+以牆上時鐘對齊執行時段 (例如間隔30分鐘時固定在 :00、:30 執行)，
+不會因為每次執行的時間長短而漂移：
+- RunWindow: 開始/結束時間 (可跨夜) 或24小時
+- next_slot: 計算下一個落在執行時間範圍內的時段
+- RoasScheduler: 在背景執行緒依時段執行工作；執行超過下一個時段時略過或補執行一次，並記錄每次執行時間
+
+直接執行此檔案時以背景引擎 (不需要Tk視窗) 作為常駐程式執行：
+    python roas_scheduler.py --mode high --interval 30 --start 09:00 --end 23:00
+"""
+
+import argparse
+import datetime
+import logging
+import queue
+import threading
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# 執行超過下一個時段時的處理方式
+OVERLAP_SKIP = "skip"
+OVERLAP_QUEUE = "queue"
+
+
+class NoSlotError(ValueError):
+    """執行時間範圍內沒有任何時段 (例如範圍比執行間隔短且沒有跨過任何時段)"""
+
+
+def _minutes(text):
+    hour, minute = map(int, text.split(':'))
+    return hour * 60 + minute
+
+
+class RunWindow:
+    """每日的執行時間範圍"""
+
+    def __init__(self, start="00:00", end="23:59", all_day=False):
+        """初始化執行時間範圍
+
+        Args:
+            start (str): 開始時間 HH:MM
+            end (str): 結束時間 HH:MM，早於開始時間代表跨夜
+            all_day (bool): 24小時執行
+        """
+        self.start = _minutes(start)
+        self.end = _minutes(end)
+        self.all_day = all_day
+
+    def contains(self, moment):
+        """檢查時間是否在範圍內 (與 RoasCheckerGUI.is_within_time_range 相同，含兩端)"""
+        if self.all_day:
+            return True
+        current = moment.hour * 60 + moment.minute
+        if self.end < self.start:  # 跨夜的情況
+            return current >= self.start or current <= self.end
+        return self.start <= current <= self.end
+
+
+def next_slot(now, interval_minutes, window):
+    """計算 now 之後第一個在執行時間範圍內的時段
+
+    時段是從當天 00:00 起每 interval_minutes 分鐘一個，與上一次執行何時結束無關。
+
+    Args:
+        now (datetime.datetime): 目前時間
+        interval_minutes (int): 執行間隔 (分鐘)
+        window (RunWindow): 執行時間範圍
+
+    Returns:
+        datetime.datetime: 下一個時段
+    """
+    interval = datetime.timedelta(minutes=interval_minutes)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    slot = midnight + interval * ((now - midnight) // interval + 1)
+    # 最多往後找兩天的時段
+    for _ in range(int(2 * 24 * 60 / interval_minutes) + 2):
+        if window.contains(slot):
+            return slot
+        slot += interval
+    raise NoSlotError("執行時間範圍內沒有任何時段")
+
+
+class RoasScheduler:
+    """依牆上時鐘時段執行工作的排程器"""
+
+    def __init__(self, job, interval_minutes, window, overlap=OVERLAP_SKIP,
+                 log=None, now=datetime.datetime.now, run_immediately=True):
+        """初始化排程器
+
+        Args:
+            job (callable): 每個時段要執行的工作 (執行完才返回)
+            interval_minutes (int): 執行間隔 (分鐘)
+            window (RunWindow): 執行時間範圍
+            overlap (str): 執行超過下一個時段時 "skip" 略過錯過的時段，"queue" 結束後立即補執行一次
+            log (callable): 日誌輸出函數
+            now (callable): 取得目前時間的函數
+            run_immediately (bool): 啟動時若在執行時間範圍內先執行一次
+        """
+        self.job = job
+        self.interval_minutes = interval_minutes
+        self.window = window
+        self.overlap = overlap
+        self.log = log or logger.info
+        self.now = now
+        self.run_immediately = run_immediately
+        self.history = []
+        self.next_run = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def validate(self):
+        """確認執行時間範圍內至少有一個時段，沒有時拋出 NoSlotError"""
+        next_slot(self.now(), self.interval_minutes, self.window)
+
+    def start(self):
+        """在背景執行緒啟動排程 (執行時間範圍內沒有時段時拋出 NoSlotError，不啟動)"""
+        self.validate()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="RoasScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=False):
+        """停止排程 (正在執行的工作會執行完)"""
+        self._stop_event.set()
+        if wait and self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def run_forever(self):
+        """排程主迴圈 (沒有可執行的時段時停止)"""
+        try:
+            self._loop()
+        except NoSlotError as e:
+            self.next_run = None
+            self._stop_event.set()
+            self.log(f"自動執行已停止: {str(e)}")
+
+    def _loop(self):
+        if self.run_immediately and self.window.contains(self.now()):
+            self._run_slot(self.now())
+
+        while not self.stopped:
+            self.next_run = next_slot(self.now(), self.interval_minutes, self.window)
+            self.log(f"下一次執行: {self.next_run:%Y-%m-%d %H:%M}")
+            # 以事件等待，停止時立即返回；分段等待以免系統休眠後時間跳動
+            while not self.stopped:
+                remaining = (self.next_run - self.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                self._stop_event.wait(min(remaining, 60))
+            if self.stopped:
+                break
+            self._run_slot(self.next_run)
+
+    def _run_slot(self, slot):
+        """執行一個時段的工作，處理執行時間超過下一個時段的情況"""
+        self._run_once(slot)
+
+        missed = self.missed_slots(slot, self.now())
+        if missed and not self.stopped:
+            if self.overlap == OVERLAP_QUEUE:
+                self.log(f"執行超過 {missed} 個時段，立即補執行一次")
+                self._run_once(self.now())
+            else:
+                self.log(f"執行超過 {missed} 個時段，略過錯過的時段")
+
+    def _run_once(self, slot):
+        started = self.now()
+        status = "ok"
+        try:
+            self.job()
+        except Exception as e:
+            status = f"error: {str(e)}"
+            self.log(f"排程執行失敗: {str(e)}")
+        finished = self.now()
+        record = {
+            "slot": slot,
+            "started": started,
+            "finished": finished,
+            "duration": (finished - started).total_seconds(),
+            "status": status
+        }
+        self.history.append(record)
+        self.log(f"本次執行耗時 {record['duration']:.0f} 秒")
+        return record
+
+    def missed_slots(self, slot, finished):
+        """slot 開始的執行在 finished 結束時，期間錯過了幾個時段"""
+        count = 0
+        upcoming = next_slot(slot, self.interval_minutes, self.window)
+        while upcoming <= finished:
+            count += 1
+            upcoming = next_slot(upcoming, self.interval_minutes, self.window)
+        return count
+
+
+def main():
+    """以背景引擎作為常駐程式執行 (不需要Tk視窗)"""
+    from async_engine import AsyncRoasEngine, DEFAULT_SETTINGS
+    from budget_ledger import BudgetLedger
+
+    parser = argparse.ArgumentParser(description="蝦皮廣告ROAS自動執行常駐程式")
+    parser.add_argument("--mode", choices=["high", "low"], default="high", help="執行高ROAS或低ROAS調整")
+    parser.add_argument("--interval", type=int, default=30, help="執行間隔(分鐘)")
+    parser.add_argument("--start", default="00:00", help="開始時間 HH:MM")
+    parser.add_argument("--end", default="23:59", help="結束時間 HH:MM")
+    parser.add_argument("--all-day", action="store_true", help="24小時執行")
+    parser.add_argument("--overlap", choices=[OVERLAP_SKIP, OVERLAP_QUEUE], default=OVERLAP_SKIP)
+    parser.add_argument("--roas-threshold", type=float, default=DEFAULT_SETTINGS["roas_threshold"],
+                        help="高ROAS調整的ROAS閾值")
+    parser.add_argument("--budget-step", type=float, default=DEFAULT_SETTINGS["budget_step"],
+                        help="高ROAS調整的預算調整金額")
+    parser.add_argument("--cooldown", type=float, default=DEFAULT_SETTINGS["cooldown_minutes"],
+                        help="低ROAS調整的冷卻時間(分鐘)，0表示不限")
+    parser.add_argument("--cdp-url", default="http://localhost:9222", help="Chrome 遠端除錯位址")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    events = queue.Queue()
+    ledger = BudgetLedger()
+    engine = AsyncRoasEngine(events, cdp_url=args.cdp_url, ledger=ledger)
+    settings = dict(DEFAULT_SETTINGS, roas_threshold=args.roas_threshold, budget_step=args.budget_step,
+                    cooldown_minutes=args.cooldown)
+
+    def drain_events(timeout):
+        try:
+            kind, payload = events.get(timeout=timeout)
+        except queue.Empty:
+            return
+        if kind == "log":
+            logger.info(payload["message"])
+        elif kind == "done":
+            logger.info(f"處理 {payload['pages']} 頁，調整 {payload['adjustments']} 個廣告預算")
+
+    def job():
+        future = engine.run_high_roas(settings) if args.mode == "high" else engine.run_low_roas(settings)
+        if future is None:
+            return
+        while not future.done():
+            drain_events(0.5)
+        while not events.empty():
+            drain_events(0)
+        future.result()
+
+    scheduler = RoasScheduler(job, args.interval, RunWindow(args.start, args.end, args.all_day), args.overlap)
+    try:
+        scheduler.validate()
+    except NoSlotError:
+        logger.error(f"{args.start}-{args.end} 之間沒有任何 {args.interval} 分鐘的時段，請調整時間範圍或間隔")
+        engine.shutdown()
+        ledger.close()
+        return
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info("已停止常駐程式")
+    finally:
+        engine.shutdown()
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
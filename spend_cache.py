@@ -0,0 +1,113 @@
+"""
+平均花費快取模組
+
+讀取「七日內的平均花費」需要打開預算編輯彈窗並輪詢數秒，
+而同一個廣告的七日平均在數小時內幾乎不會改變。
+此模組把讀到的值依廣告ID/名稱保存到本機JSON檔，在有效期限 (TTL) 內直接使用，
+24小時自動執行時同一批廣告不必每一輪都打開彈窗。
+"""
+
+import json
+import logging
+import os
+import time
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spend_cache.json")
+DEFAULT_TTL = 6 * 60 * 60
+
+
+def cache_keys(name=None, ad_id=None):
+    """廣告的快取鍵 (有ID時優先使用ID)"""
+    keys = []
+    if ad_id:
+        keys.append(f"id:{ad_id}")
+    if name:
+        keys.append(f"name:{name.strip()}")
+    return keys
+
+
+class SpendCache:
+    """具有效期限的七日平均花費快取"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, clock=time.time):
+        """初始化快取並載入既有的快取檔
+
+        Args:
+            path (str): 快取檔路徑，None 表示只保存在記憶體
+            ttl (float): 有效期限 (秒)
+            clock (callable): 取得目前時間的函數
+        """
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """從快取檔載入，並丟棄已過期的項目"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"讀取平均花費快取失敗: {str(e)}")
+            self.entries = {}
+        self.purge()
+
+    def save(self):
+        """寫入快取檔 (先寫暫存檔再取代，避免寫到一半的檔案)"""
+        if not self.path:
+            return
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.warning(f"寫入平均花費快取失敗: {str(e)}")
+
+    def purge(self):
+        """移除已過期的項目"""
+        now = self.clock()
+        self.entries = {key: entry for key, entry in self.entries.items()
+                        if now - entry["time"] < self.ttl}
+
+    def get(self, name=None, ad_id=None):
+        """取得有效期限內的平均花費，沒有時返回 None"""
+        now = self.clock()
+        for key in cache_keys(name, ad_id):
+            entry = self.entries.get(key)
+            if entry and now - entry["time"] < self.ttl:
+                self.hits += 1
+                return entry["value"]
+        self.misses += 1
+        return None
+
+    def set(self, value, name=None, ad_id=None, save=True):
+        """保存平均花費"""
+        entry = {"value": float(value), "time": self.clock()}
+        for key in cache_keys(name, ad_id):
+            self.entries[key] = entry
+        if save:
+            self.save()
+
+    def update_many(self, ads):
+        """一次保存多個廣告的平均花費 (例如報表API回應中的數據)
+
+        Args:
+            ads (list): 含 name/ad_id/average_spend 的廣告字典
+        """
+        updated = 0
+        for ad in ads:
+            if ad.get("average_spend") is not None:
+                self.set(ad["average_spend"], ad.get("name"), ad.get("ad_id"), save=False)
+                updated += 1
+        if updated:
+            self.save()
+        return updated
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+離線解析測試腳本
+
+此腳本使用倉庫中的 html.txt / HTML2.txt 頁面傾印，
+測試離線解析器是否能在沒有瀏覽器的情況下抽取商品與規格
+"""
+
+import sys
+import os
+import logging
+
+# 設置日誌
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("離線解析測試")
+
+目錄 = os.path.dirname(os.path.abspath(__file__))
+
+def test_search_products():
+    """測試離線搜尋商品的結構與數量"""
+    logger.info("測試離線搜尋商品...")
+    
+    from 模組.商品處理.離線解析 import 離線頁面解析器
+    
+    解析器 = 離線頁面解析器.從檔案載入(os.path.join(目錄, "html.txt"))
+    結果 = 解析器.搜尋商品()
+    
+    assert 結果["product_count"] == 10, 結果["product_count"]
+    assert 結果["spec_count"] == 57, 結果["spec_count"]
+    
+    第一規格 = 結果["products"][0]["specs"][0]
+    assert 第一規格["name"] == "現貨-牛油綠色"
+    assert 第一規格["stock"] == "24"
+    assert 第一規格["price"] == "249"
+    assert 第一規格["status"] == "關閉"
+    
+    預期鍵 = {"name", "stock", "price", "priceType", "priceDisplay",
+            "originalPrice", "discountRate", "status", "disabled", "key"}
+    for product in 結果["products"]:
+        for spec in product["specs"]:
+            assert set(spec) == 預期鍵, set(spec)
+    
+    logger.info("✓ 離線搜尋商品結果正確")
+    return True
+
+def test_full_page_dump():
+    """測試完整頁面傾印 (HTML2.txt) 的解析"""
+    logger.info("測試完整頁面傾印解析...")
+    
+    from 模組.商品處理.離線解析 import 離線頁面解析器
+    
+    解析器 = 離線頁面解析器.從檔案載入(os.path.join(目錄, "HTML2.txt"))
+    結果 = 解析器.搜尋商品()
+    
+    assert 結果["product_count"] == 10, 結果["product_count"]
+    assert 結果["spec_count"] == 56, 結果["spec_count"]
+    
+    logger.info("✓ 完整頁面傾印解析正確")
+    return True
+
+def test_columnar_expansion():
+    """測試欄位陣列展開與編輯模式的輸入框/開關"""
+    logger.info("測試編輯模式欄位抽取...")
+    
+    from 模組.商品處理.離線解析 import 離線頁面解析器
+    
+    html = """
+    <div class="discount-edit-item">
+      <div class="ellipsis-content single"> 商品A </div>
+      <div class="discount-edit-item-model-component">
+        <div class="ellipsis-content single"> 黑色-M </div>
+        <div class="item-content item-stock"> 5 </div>
+        <div class="eds-input__inner"><span class="eds-input__prefix">NT$</span>
+          <input class="eds-input__input" data-v-7fcfdf7e value="320"></div>
+        <div class="eds-switch eds-switch--open"></div>
+      </div>
+      <div class="discount-edit-item-model-component">
+        <div class="ellipsis-content single"> 白色-L </div>
+        <div class="item-content item-stock"> 0 </div>
+        <div class="eds-switch eds-switch--disabled"></div>
+      </div>
+    </div>
+    """
+    解析器 = 離線頁面解析器(html)
+    結果 = 解析器.搜尋商品()
+    規格 = 結果["products"][0]["specs"]
+    
+    assert 結果["spec_count"] == 2
+    assert 規格[0]["price"] == "320" and 規格[0]["priceType"] == "NT$特價輸入框"
+    assert 規格[0]["status"] == "開啟" and not 規格[0]["disabled"]
+    assert 規格[1]["price"] == "0" and 規格[1]["priceDisplay"] == "未知價格"
+    assert 規格[1]["status"] == "關閉" and 規格[1]["disabled"]
+    
+    欄位結果 = 解析器.欄位搜尋商品()
+    assert [spec["price"] for spec in 欄位結果["products"][0]["specs"]] == ["320", "0"]
+    
+    分析結果 = 解析器.extract_all_products()
+    assert 分析結果[0]["name"] == "商品A"
+    assert 分析結果[0]["specs"][0]["isOpen"] is True
+    assert 分析結果[0]["specs"][1]["isDisabled"] is True
+    
+    logger.info("✓ 編輯模式欄位抽取正確")
+    return True
+
+def test_search_matches_expected():
+    """測試離線搜尋商品在 html.txt 上與預期結果 (html_expected.json) 完全相同"""
+    logger.info("測試離線搜尋商品預期結果...")
+    
+    import json
+    from 模組.商品處理.離線解析 import 離線頁面解析器
+    
+    解析器 = 離線頁面解析器.從檔案載入(os.path.join(目錄, "html.txt"))
+    with open(os.path.join(目錄, "html_expected.json"), encoding="utf-8") as f:
+        預期結果 = json.load(f)
+    
+    結果 = 解析器.搜尋商品()
+    assert 結果 == 預期結果
+    
+    # 檢視模式的價格來自折扣價標記，不是欄位模式的簡化價格類型
+    第一規格 = 結果["products"][0]["specs"][0]
+    assert 第一規格["priceType"] == "折扣價標記" and 第一規格["priceDisplay"] == "NT$249"
+    assert 解析器.欄位搜尋商品()["products"][0]["specs"][0]["priceType"] == "單一價格文本"
+    
+    # ShopeePageAnalyzer 的選擇器不把檢視模式的卡片當成商品容器
+    assert 解析器.extract_all_products() == []
+    
+    logger.info("✓ 離線搜尋商品與預期結果相同")
+    return True
+
+def test_discount_rate_price():
+    """測試折扣率與原價計算折扣價，以及輸入框位置判斷"""
+    logger.info("測試多層價格判斷...")
+    
+    from 模組.商品處理.離線解析 import 判斷規格價格, 解析HTML
+    
+    折扣率 = 解析HTML('<div><span>原價 NT$</span><span>7.5折 NT$</span></div>').children[0]
+    結果 = 判斷規格價格(折扣率)
+    assert 結果["discountRate"] == "7.5" and 結果["priceDisplay"] == "未知價格"
+    
+    輸入框 = 解析HTML('<div><input class="price" value="3"><input class="price" value="150"></div>').children[0]
+    結果 = 判斷規格價格(輸入框)
+    assert 結果["price"] == "150" and 結果["priceType"] == "第二輸入框特價"
+    
+    logger.info("✓ 多層價格判斷正確")
+    return True
+
+def test_locator_index():
+    """測試搜尋結果的定位鍵與定位索引對照"""
+    logger.info("測試定位索引...")
+    
+    from 模組.商品處理.離線解析 import 離線頁面解析器
+    from 模組.商品處理.定位索引 import 定位索引
+    
+    結果 = 離線頁面解析器.從檔案載入(os.path.join(目錄, "html.txt")).搜尋商品()
+    索引 = 定位索引()
+    索引.更新(結果["products"])
+    
+    第一商品 = 結果["products"][0]
+    assert 索引.商品鍵(第一商品["name"]) == "0"
+    assert 索引.規格鍵(第一商品["name"], 第一商品["specs"][0]["name"]) == "0-0"
+    assert 索引.規格鍵(第一商品["name"], 第一商品["specs"][2]["name"]) == "0-2"
+    assert 索引.規格鍵(第一商品["name"], "不存在的規格") is None
+    
+    索引.更新([], 完整=True)
+    assert 索引.商品鍵(第一商品["name"]) is None
+    
+    logger.info("✓ 定位索引正確")
+    return True
+
+def test_name_index():
+    """測試名稱索引的前綴與子字串查詢"""
+    logger.info("測試名稱索引...")
+    
+    from 模組.商品處理.離線解析 import 離線頁面解析器
+    from 模組.商品處理.名稱索引 import 商品名稱索引
+    
+    商品列表 = 離線頁面解析器.從檔案載入(os.path.join(目錄, "html.txt")).搜尋商品()["products"]
+    索引 = 商品名稱索引(商品列表)
+    
+    assert len(索引.前綴查詢("【Fee")) == 10
+    assert len(索引.前綴查詢("【Fee現貨")) == 9
+    assert 索引.前綴查詢("【Fee爆款")[0]["name"].startswith("【Fee爆款11色長款】")
+    assert 索引.前綴查詢("Fee") == []
+    
+    牛仔外套 = 索引.子字串查詢("牛仔外套")
+    assert [商品列表.index(p) for p in 牛仔外套] == [5, 9]
+    assert 索引.子字串查詢("不存在的文字") == []
+    
+    不分大小寫 = 商品名稱索引(商品列表, 忽略大小寫=True)
+    assert len(不分大小寫.子字串查詢("BRA")) == 2
+    assert len(不分大小寫.前綴查詢("【fee")) == 10
+    
+    logger.info("✓ 名稱索引正確")
+    return True
+
+def test_run_profile():
+    """測試執行設定檔切換高亮、捲動與等待倍率"""
+    logger.info("測試執行設定檔...")
+    
+    from 模組 import 執行設定
+    
+    try:
+        # 未指定時為 demo，fast 必須明確選擇
+        if 執行設定.環境變數 not in os.environ:
+            執行設定._目前設定 = None
+            assert 執行設定.取得執行設定()["name"] == "demo"
+        
+        執行設定.設定執行設定("demo")
+        assert 執行設定.是否高亮() and 執行設定.縮放延遲(1.5) == 1.5
+        assert "smooth" in 執行設定.捲動到元素JS()
+        
+        執行設定.設定執行設定("fast")
+        assert not 執行設定.是否高亮()
+        assert 執行設定.縮放延遲(1) < 1 and 執行設定.縮放延遲(1, 最短=0.5) == 0.5
+        assert '"highlight": false' in 執行設定.執行設定JS() and "'auto'" in 執行設定.捲動到元素JS()
+        
+        assert 執行設定.設定執行設定("不存在")["name"] == 執行設定.預設設定檔
+    finally:
+        執行設定._目前設定 = None
+    
+    logger.info("✓ 執行設定檔正確")
+    return True
+
+def test_verify_mismatches():
+    """測試讀回驗證只挑出開關或價格不符的規格"""
+    logger.info("測試讀回驗證...")
+    
+    from 模組.商品處理.批量處理 import 規劃動作, 找出不符項目
+    
+    動作列表 = 規劃動作([{"name": "商品A", "specs": [
+        {"name": "紅色", "price": "299"},
+        {"name": "藍色", "price": "299"},
+        {"name": "綠色", "price": "0"},
+        {"name": "黑色", "price": "299"}
+    ]}])
+    assert [動作["price"] for 動作 in 動作列表] == ["299", "299", None, "299"]
+    
+    狀態列表 = [
+        {"found": True, "open": True, "disabled": False, "value": "299"},
+        {"found": True, "open": True, "disabled": False, "value": "199"},
+        {"found": True, "open": False, "disabled": True, "value": ""},
+        {"found": False}
+    ]
+    不符項目 = 找出不符項目(動作列表, 狀態列表)
+    assert set(不符項目) == {("商品A", "藍色"), ("商品A", "黑色")}
+    
+    logger.info("✓ 讀回驗證正確")
+    return True
+
+def test_page_cache_versions():
+    """測試頁面快取依版本合併增量結果並回答規格查詢"""
+    logger.info("測試頁面快取...")
+    
+    from 模組.商品處理.頁面快取 import 頁面商品快取
+    
+    def 欄位(索引列表, 價格列表):
+        return {"names": [f"商品{i}" for i in 索引列表], "offsets": list(range(len(索引列表))),
+                "cardIndices": 索引列表, "specNames": ["M"] * len(索引列表), "stocks": ["1"] * len(索引列表),
+                "prices": 價格列表, "priceSources": [1] * len(索引列表), "switches": [1] * len(索引列表)}
+    
+    class 頁面:
+        """依序回傳預先準備的同步結果，並記錄每次帶入的版本"""
+        def __init__(self, 回應列表):
+            self.回應列表 = list(回應列表)
+            self.帶入版本 = []
+        
+        def execute_script(self, 腳本, 選擇器, 快取ID, 版本):
+            self.帶入版本.append(版本)
+            return self.回應列表.pop(0)
+    
+    driver = 頁面([
+        {"id": "a", "version": 3, "full": True, "total": 3, "indices": [], "cols": 欄位([0, 1, 2], ["100", "200", "300"])},
+        {"id": "a", "version": 5, "full": False, "total": 3, "indices": [1], "cols": 欄位([1], ["250"])},
+        {"id": "a", "version": 5, "full": False, "total": 3, "indices": [], "cols": 欄位([], [])},
+    ])
+    快取 = 頁面商品快取(driver)
+    assert 快取.查找規格("商品1", "M") is None          # 尚未啟用時不與頁面往返
+    assert driver.帶入版本 == []
+    
+    結果 = 快取.搜尋商品()
+    assert 結果["product_count"] == 3 and 快取.已啟用
+    assert 快取.查找規格("商品1", "M")["price"] == "250"   # 只重新抽取版本 3 之後變動的卡片
+    assert 快取.查找規格("商品2", "M")["price"] == "300"
+    assert driver.帶入版本 == [0, 3, 5]
+    
+    logger.info("✓ 頁面快取正確")
+    return True
+
+def test_parallel_page_merge():
+    """測試並行多頁結果合併：待儲存頁不算成功，其調整記錄標記為未儲存"""
+    logger.info("測試並行多頁結果合併...")
+    
+    from 模組.商品處理.並行處理 import 彙整頁結果
+    
+    def 頁(頁碼, 成功, 待儲存, 處理數, 記錄):
+        return {"頁碼": 頁碼, "成功": 成功, "待儲存": 待儲存, "處理數": 處理數,
+                "開關成功數": 0, "價格成功數": len(記錄), "調整記錄": 記錄}
+    
+    成功頁, 摘要, 記錄列表 = 彙整頁結果([
+        頁(3, False, False, 0, []),
+        頁(2, False, True, 4, [{"規格名稱": "M", "成功": True}]),
+        頁(1, True, False, 5, []),
+    ])
+    assert [頁結果["頁碼"] for 頁結果 in 成功頁] == [1]
+    assert 摘要["總處理規格數"] == 5 and 摘要["總價格成功數"] == 0
+    assert 摘要["待儲存頁"] == [2] and 摘要["待儲存規格數"] == 4
+    assert 記錄列表 == [{"規格名稱": "M", "成功": False, "待儲存": True}]
+    
+    logger.info("✓ 並行多頁結果合併正確")
+    return True
+
+def test_change_plan():
+    """測試變更規劃只產生需要的開關與價格操作"""
+    logger.info("測試變更規劃...")
+    
+    from 模組.商品處理.規格分析 import 規格分析
+    from 模組.商品處理.變更規劃 import 規劃變更
+    
+    商品列表 = [{"name": "商品A", "specs": [
+        {"name": "紅色", "price": "299", "status": "開啟"},
+        {"name": "藍色", "price": "299", "status": "開啟"},
+        {"name": "綠色", "price": "0", "status": "關閉"},
+        {"name": "黑色", "price": "199", "status": "開啟"},
+        {"name": "白色", "price": "0", "status": "關閉", "disabled": True}
+    ]}]
+    動作列表, 統計 = 規劃變更(商品列表, 規格分析(None))
+    
+    assert 統計 == {"規格數": 5, "開啟開關": 1, "設定價格": 2, "無需變更": 2, "無法開啟": 1}
+    動作 = {a["spec"]: a for a in 動作列表}
+    assert set(動作) == {"綠色", "黑色"}
+    assert 動作["綠色"]["open"] and 動作["綠色"]["price"] == "299"
+    assert not 動作["黑色"]["open"] and 動作["黑色"]["price"] == "299"
+    
+    logger.info("✓ 變更規劃正確")
+    return True
+
+def test_retry_policy():
+    """測試重試策略的退避、錯誤分類與斷路器"""
+    logger.info("測試重試策略...")
+    
+    from 模組 import 重試策略 as 重試
+    
+    class StaleElementReferenceException(Exception):
+        pass
+    
+    assert 重試.分類錯誤(StaleElementReferenceException("stale")) == 重試.過期元素
+    assert 重試.分類錯誤(Exception("Element is not clickable: Other element would receive the click")) == 重試.彈窗遮擋
+    assert 重試.分類錯誤(重試.操作失敗(重試.找不到元素)) == 重試.找不到元素
+    
+    睡眠紀錄 = []
+    恢復紀錄 = []
+    策略 = 重試.重試策略(最大次數=4, 基礎延遲=1, 最大延遲=3, 抖動=0.5, 隨機=lambda: 0.5,
+                   彈窗恢復=lambda: 恢復紀錄.append("彈窗"), 睡眠=睡眠紀錄.append)
+    assert [策略.延遲(n) for n in (1, 2, 3)] == [0.75, 1.5, 2.25]
+    assert 策略.延遲(1, 重試.過期元素) == 0
+    
+    錯誤序列 = [StaleElementReferenceException(), Exception("would receive the click")]
+    def 動作():
+        if 錯誤序列:
+            raise 錯誤序列.pop(0)
+        return "完成"
+    assert 策略.執行(動作, "測試") == "完成"
+    assert 睡眠紀錄 == [1.5] and 恢復紀錄 == ["彈窗"]
+    
+    # 斷路器跳脫後只給一次恢復後的嘗試，之後的項目不再耗盡重試次數
+    斷路 = 重試.斷路器(失敗門檻=2, 恢復=lambda: 恢復紀錄.append("斷路器"), 最多恢復次數=2, 睡眠=睡眠紀錄.append)
+    呼叫次數 = []
+    for _ in range(4):
+        策略.執行(lambda: 呼叫次數.append(1), "失敗項目", 斷路)
+    assert 斷路.已停止 and 恢復紀錄.count("斷路器") == 2
+    assert len(呼叫次數) < 4 * 策略.最大次數
+    
+    logger.info("✓ 重試策略正確")
+    return True
+
+def test_spec_type_classifier():
+    """測試規格類型分類的優先順序與批量分析"""
+    logger.info("測試規格類型分類...")
+    
+    from 模組.商品處理.規格分析 import 規格分析
+    
+    分析 = 規格分析(None)
+    assert 分析.分析規格類型("紅色 XL") == "尺寸"  # 尺寸關鍵詞優先於顏色
+    assert 分析.分析規格類型(" 印花 ") == "款式"
+    assert 分析.分析規格類型("120") == "尺寸"
+    assert 分析.分析規格類型("預設") == "通用"
+    assert 分析.分析規格類型("  ") is None
+    
+    類型表 = 分析.批量分析規格類型([{"name": "黑色"}, {"name": "短袖"}, "均碼"])
+    assert 類型表 == {"黑色": "顏色", "短袖": "款式", "均碼": "尺寸"}
+    
+    logger.info("✓ 規格類型分類正確")
+    return True
+
+def test_price_resolver():
+    """測試商品價格解析器的參考順序"""
+    logger.info("測試商品價格解析器...")
+    
+    from 模組.商品處理.規格分析 import 規格分析
+    
+    分析 = 規格分析(None)
+    商品 = {"specs": [
+        {"name": "M", "price": "350", "status": "開啟"},
+        {"name": "紅色", "price": "299", "status": "開啟"},
+        {"name": "藍色", "price": "0", "status": "關閉"},
+        {"name": "綠色", "price": "8", "priceType": "折扣率值", "originalPrice": "500", "status": "開啟"}
+    ]}
+    assert 分析.查找同類規格價格(商品, "藍色") == (299, "紅色", True)      # 同類規格優先
+    assert 分析.查找同類規格價格(商品, "紅色") == (400, "綠色", True)      # 折扣率換算
+    assert 分析.查找同類規格價格(商品, "預設") == (350, "M", True)         # 第一個有效規格
+    assert 分析.建立價格解析器(商品) is 分析.建立價格解析器(商品)
+    
+    單一規格 = {"specs": [{"name": "預設", "price": "199", "status": "關閉"}]}
+    assert 分析.查找同類規格價格(單一規格, "預設") == (199, "保持原價", False)
+    assert 分析.查找同類規格價格({"specs": []}, "預設") == (499, "默認價格", True)
+    
+    logger.info("✓ 商品價格解析器正確")
+    return True
+
+def run_tests():
+    """運行所有測試"""
+    logger.info("開始運行離線解析測試...")
+    
+    tests = [
+        ("離線搜尋商品測試", test_search_products),
+        ("離線搜尋商品預期結果測試", test_search_matches_expected),
+        ("多層價格判斷測試", test_discount_rate_price),
+        ("完整頁面傾印測試", test_full_page_dump),
+        ("編輯模式欄位測試", test_columnar_expansion),
+        ("定位索引測試", test_locator_index),
+        ("名稱索引測試", test_name_index),
+        ("執行設定檔測試", test_run_profile),
+        ("讀回驗證測試", test_verify_mismatches),
+        ("頁面快取測試", test_page_cache_versions),
+        ("並行多頁結果合併測試", test_parallel_page_merge),
+        ("變更規劃測試", test_change_plan),
+        ("重試策略測試", test_retry_policy),
+        ("規格類型分類測試", test_spec_type_classifier),
+        ("商品價格解析器測試", test_price_resolver)
+    ]
+    
+    success_count = 0
+    fail_count = 0
+    
+    for test_name, test_func in tests:
+        logger.info(f"\n開始執行測試: {test_name}")
+        
+        try:
+            test_func()
+            logger.info(f"✓ 測試 '{test_name}' 成功")
+            success_count += 1
+        except Exception as e:
+            logger.error(f"✗ 測試 '{test_name}' 失敗: {str(e)}")
+            fail_count += 1
+    
+    logger.info(f"\n測試執行完成，共執行 {len(tests)} 個測試，成功 {success_count} 個，失敗 {fail_count} 個")
+    
+    return success_count == len(tests)
+
+if __name__ == "__main__":
+    if run_tests():
+        logger.info("✅ 所有測試通過！")
+        sys.exit(0)
+    else:
+        logger.error("❌ 測試未全部通過，請檢查離線解析模組。")
+        sys.exit(1)
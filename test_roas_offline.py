@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+廣告ROAS工具離線測試腳本
+
+此腳本不需要瀏覽器，測試 RoasCheckerGUI 使用的報表解析與決策邏輯
+"""
+
+import sys
+import os
+import logging
+
+# 設置日誌
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("廣告ROAS離線測試")
+
+# 模擬報表API回應 (巢狀結構與顯示文字混用)
+報表回應 = {
+    "code": 0,
+    "data": {
+        "total": 3,
+        "filters": [{"key": "status", "value": "ongoing"}],
+        "entry_list": [
+            {"campaign": {"campaign_id": 101, "daily_budget": 60}, "title": "【Fee現貨】針織外套",
+             "report": {"roas": "1.2k", "avg_daily_cost": "NT$45.5"}},
+            {"campaign": {"campaign_id": 102, "daily_budget": "NT$1,000"}, "title": "【Fee爆款】牛仔外套",
+             "report": {"roas": 8.25}},
+            {"campaign": {"campaign_id": 103, "daily_budget": 40}, "title": "【Fee】無數據"}
+        ]
+    }
+}
+
+def test_ads_report_parsing():
+    """測試報表回應解析"""
+    logger.info("測試報表回應解析...")
+
+    from ads_report import parse_number, parse_ads_report, is_report_url, format_number, match_report_rows
+
+    assert parse_number("1.2k") == 1200
+    assert parse_number("NT$1,234.5") == 1234.5
+    assert parse_number("-") is None
+    assert parse_number(True) is None
+
+    廣告列表 = parse_ads_report(報表回應)
+    assert [廣告["ad_id"] for 廣告 in 廣告列表] == ["101", "102"]
+    assert 廣告列表[0]["roas"] == 1200 and 廣告列表[0]["budget"] == 60
+    assert 廣告列表[0]["average_spend"] == 45.5
+    assert 廣告列表[1]["budget"] == 1000 and 廣告列表[1]["average_spend"] is None
+    assert 廣告列表[1]["name"] == "【Fee爆款】牛仔外套"
+
+    assert parse_ads_report(報表回應, money_divisor=10)[0]["budget"] == 6
+    assert parse_ads_report({"data": []}) == []
+
+    assert is_report_url("https://seller.shopee.tw/api/pas/v1/homepage/report/list/?x=1")
+    assert not is_report_url("https://seller.shopee.tw/api/pas/v1/setting/")
+    assert format_number(8.25) == "8.25" and format_number(60.0) == "60"
+
+    表格 = [{"name": "【Fee爆款】牛仔外套", "budget": "1000", "has_budget_warning": False},
+          {"name": "其他廣告", "budget": "50", "has_budget_warning": True}]
+    assert match_report_rows(廣告列表, 表格[:1]) is not None
+    # 任何表格行對不上報表時改用表格抓取，而不是默默略過該行
+    assert match_report_rows(廣告列表, 表格) is None
+
+    # async Playwright 的 Response.json() 是協程，需由 on_response_async 等待後再解析
+    import asyncio
+    from types import SimpleNamespace
+    from ads_report import AdsReportCollector
+
+    class 非同步回應:
+        url = "https://seller.shopee.tw/api/pas/v1/homepage/report/list/?x=1"
+        status = 200
+        request = SimpleNamespace(resource_type="fetch")
+
+        async def json(self):
+            return 報表回應
+
+    收集器 = AdsReportCollector()
+    asyncio.run(收集器.on_response_async(非同步回應()))
+    assert 收集器.version == 1 and [廣告["ad_id"] for 廣告 in 收集器.latest()] == ["101", "102"]
+    assert 收集器.url == 非同步回應.url
+
+    logger.info("✓ 報表回應解析正確")
+    return True
+
+def test_budget_planner():
+    """測試預算調整規劃與時間上限"""
+    logger.info("測試預算調整規劃...")
+
+    from budget_planner import BudgetPlan, BudgetPlanExecutor, plan_high_roas_rows
+
+    設置 = {"first_roas_min": 5, "first_roas_max": 10, "first_budget": 60,
+          "second_roas": 5, "second_budget": 40, "roas_threshold": 10, "budget_step": 20}
+    第一頁 = [
+        {"name": "A", "roas": "12", "budget": "100", "row_index": 0},
+        {"name": "B", "roas": "8", "budget": "60", "row_index": 1},
+        {"name": "C", "roas": "6.5", "budget": "NT$100", "row_index": 2}
+    ]
+    第二頁 = [
+        {"name": "D", "roas": "3", "budget": "40.5", "row_index": 0},
+        {"name": "E", "roas": "0", "budget": "80", "row_index": 1}
+    ]
+
+    規劃 = BudgetPlan()
+    規劃.add_low_roas_page(1, 第一頁, 設置)
+    規劃.add_low_roas_page(2, 第二頁, 設置)
+    assert [(動作["name"], 動作["target"]) for 動作 in 規劃.actions] == [("C", 60), ("E", 40)]
+    assert 規劃.skipped == 2 and 規劃.pages == 2
+    assert len(規劃.preview_lines()) == 3
+
+    動作列表, 繼續 = plan_high_roas_rows(
+        [{"roas": "1.2k", "budget": "60", "has_budget_warning": True, "row_index": 0},
+         {"roas": "9", "budget": "60", "has_budget_warning": True, "row_index": 1}], 設置)
+    assert [動作["target"] for 動作 in 動作列表] == [80] and not 繼續
+
+    # 每個調整耗時10秒，時間上限15秒：第二個調整預估會超時而不執行
+    時鐘 = [0]
+    def 調整(動作):
+        時鐘[0] += 10
+        return True
+    結果 = BudgetPlanExecutor(lambda 頁碼: True, 調整, time_budget=15, clock=lambda: 時鐘[0]).run(規劃)
+    assert 結果 == {"done": 1, "failed": 0, "remaining": 1, "timed_out": True}
+
+    結果 = BudgetPlanExecutor(lambda 頁碼: 頁碼 == 1, lambda 動作: True).run(規劃)
+    assert 結果 == {"done": 1, "failed": 1, "remaining": 0, "timed_out": False}
+
+    logger.info("✓ 預算調整規劃正確")
+    return True
+
+def test_spend_cache():
+    """測試平均花費快取的有效期限與持久化"""
+    logger.info("測試平均花費快取...")
+
+    import tempfile
+    from spend_cache import SpendCache
+
+    時鐘 = [1000.0]
+    with tempfile.TemporaryDirectory() as 暫存目錄:
+        路徑 = os.path.join(暫存目錄, "spend_cache.json")
+        快取 = SpendCache(路徑, ttl=3600, clock=lambda: 時鐘[0])
+        快取.set(45.5, name="【Fee】針織外套", ad_id="101")
+        assert 快取.update_many([{"name": "B", "ad_id": None, "average_spend": 30},
+                               {"name": "C", "average_spend": None}]) == 1
+
+        # 重新載入後仍可依ID或名稱命中
+        快取 = SpendCache(路徑, ttl=3600, clock=lambda: 時鐘[0])
+        assert 快取.get(ad_id="101") == 45.5
+        assert 快取.get(name="【Fee】針織外套") == 45.5
+        assert 快取.get(name="B") == 30
+        assert 快取.get(name="C") is None
+
+        時鐘[0] += 3600
+        assert 快取.get(ad_id="101") is None
+        assert SpendCache(路徑, ttl=3600, clock=lambda: 時鐘[0]).entries == {}
+
+    logger.info("✓ 平均花費快取正確")
+    return True
+
+def test_roas_decision():
+    """測試向量化決策與逐行判斷結果一致"""
+    logger.info("測試向量化ROAS決策...")
+
+    import random
+    from ads_report import parse_number
+    from roas_decision import parse_values, tiers_from_settings, decide_low_roas, decide_high_roas
+
+    assert list(parse_values(["1.2k", "NT$1,234", "nt$0.00", "", "-", 3, None])) == [1200, 1234, 0, 0, 0, 3, 0]
+
+    設置 = {"first_roas_min": 5, "first_roas_max": 10, "first_budget": 60,
+          "second_roas": 5, "second_budget": 40, "roas_threshold": 10, "budget_step": 20}
+    級距 = tiers_from_settings(設置)
+
+    亂數 = random.Random(0)
+    行列表 = [{"name": f"廣告{i}", "row_index": i,
+             "roas": 亂數.choice([f"{亂數.uniform(0, 15):.2f}", "1.1k", "nt$0.00", "10", "5"]),
+             "budget": 亂數.choice(["40", "60", "60.5", "NT$1,000", "80"]),
+             "has_budget_warning": 亂數.random() < 0.5} for i in range(2000)]
+
+    # 逐行參考實作：第一範圍優先，否則 ROAS ≤ second_roas 套用第二範圍
+    逐行動作, 逐行略過 = [], 0
+    for 行 in 行列表:
+        roi = parse_number(行["roas"]) or 0
+        if 設置["first_roas_min"] <= roi <= 設置["first_roas_max"]:
+            目標 = 設置["first_budget"]
+        elif roi <= 設置["second_roas"]:
+            目標 = 設置["second_budget"]
+        else:
+            continue
+        if abs((parse_number(行["budget"]) or 0) - 目標) < 1:
+            逐行略過 += 1
+        else:
+            逐行動作.append((行["row_index"], 目標))
+
+    向量動作, 向量略過 = decide_low_roas(行列表, 級距)
+    assert 向量略過 == 逐行略過
+    assert [(動作["row_index"], 動作["target"]) for 動作 in 向量動作] == 逐行動作
+
+    排序行 = sorted(行列表, key=lambda 行: -parse_values([行["roas"]])[0])
+    逐行目標 = []
+    for 行 in 排序行:
+        if (parse_number(行["roas"]) or 0) < 設置["roas_threshold"]:
+            break
+        if 行["has_budget_warning"]:
+            逐行目標.append(int(parse_number(行["budget"]) + 設置["budget_step"]))
+    向量動作, 向量繼續 = decide_high_roas(排序行, 設置["roas_threshold"], 設置["budget_step"])
+    assert not 向量繼續
+    assert [動作["target"] for 動作 in 向量動作] == 逐行目標
+    assert decide_high_roas([{"roas": "20", "budget": "-", "has_budget_warning": True, "row_index": 0}],
+                            設置["roas_threshold"], 設置["budget_step"]) == ([], True)
+
+    # 依ROAS降序分頁 (每頁50條)：二分搜尋到的頁碼與逐頁尋找的結果相同，且讀取頁數較少
+    from roas_decision import tier_range, find_first_page
+    最低, 最高 = tier_range(級距)
+    assert 最高 == 10 and 最低 < 0
+    全部ROAS = sorted(parse_values([行["roas"] for 行 in 行列表]), reverse=True)
+    頁列表 = [全部ROAS[i:i + 50] for i in range(0, len(全部ROAS), 50)]
+    讀取次數 = []
+    def 頁最小ROAS(頁碼):
+        讀取次數.append(頁碼)
+        return 頁列表[頁碼 - 1][-1]
+    預期 = next(i + 1 for i, 頁 in enumerate(頁列表) if 頁[-1] <= 最高)
+    assert find_first_page(頁最小ROAS, len(頁列表), 最高) == 預期
+    assert len(讀取次數) <= 6
+    assert find_first_page(lambda 頁碼: None, 40, 最高) == 1
+
+    logger.info("✓ 向量化ROAS決策正確")
+    return True
+
+def test_roas_scheduler():
+    """測試牆上時鐘對齊的排程時段與重疊處理"""
+    logger.info("測試自動執行排程...")
+
+    import datetime
+    from roas_scheduler import RunWindow, RoasScheduler, next_slot, NoSlotError
+
+    時間 = datetime.datetime
+    全天 = RunWindow(all_day=True)
+    assert next_slot(時間(2024, 5, 1, 10, 7, 30), 30, 全天) == 時間(2024, 5, 1, 10, 30)
+    assert next_slot(時間(2024, 5, 1, 10, 30), 30, 全天) == 時間(2024, 5, 1, 11, 0)
+
+    # 跨夜範圍 22:00-02:00：02:00之後下一個時段是當晚22:00
+    跨夜 = RunWindow("22:00", "02:00")
+    assert next_slot(時間(2024, 5, 1, 1, 45), 30, 跨夜) == 時間(2024, 5, 1, 2, 0)
+    assert next_slot(時間(2024, 5, 1, 2, 0), 30, 跨夜) == 時間(2024, 5, 1, 22, 0)
+
+    # 執行耗時65分鐘：錯過兩個時段，skip 只執行一次，queue 補執行一次
+    for 方式, 預期次數 in (("skip", 1), ("queue", 2)):
+        現在 = [時間(2024, 5, 1, 10, 0)]
+        def 工作():
+            現在[0] += datetime.timedelta(minutes=65)
+        排程 = RoasScheduler(工作, 30, 全天, overlap=方式, log=lambda 訊息: None, now=lambda: 現在[0])
+        排程._run_slot(現在[0])
+        assert len(排程.history) == 預期次數, 方式
+        assert 排程.history[0]["duration"] == 65 * 60
+        assert next_slot(現在[0], 30, 全天).minute in (0, 30)
+
+    # 09:05-09:10 沒有任何30分鐘時段：啟動時就拒絕，執行中遇到時乾淨地停止
+    沒有時段 = RoasScheduler(lambda: None, 30, RunWindow("09:05", "09:10"), log=lambda 訊息: None,
+                         now=lambda: 時間(2024, 5, 1, 9, 6))
+    try:
+        沒有時段.start()
+        assert False, "應該拋出 NoSlotError"
+    except NoSlotError:
+        pass
+    沒有時段.run_forever()
+    assert 沒有時段.stopped and 沒有時段.next_run is None and len(沒有時段.history) == 1
+
+    logger.info("✓ 自動執行排程正確")
+    return True
+
+def test_budget_ledger():
+    """測試預算調整紀錄的冷卻時間與統計"""
+    logger.info("測試預算調整紀錄...")
+
+    from budget_ledger import BudgetLedger
+
+    時鐘 = [1_700_000_000.0]
+    紀錄 = BudgetLedger(":memory:", clock=lambda: 時鐘[0])
+    紀錄.record("A", 60, 80, roas=12, mode="high")
+    紀錄.record("B", 100, 40, roas=3, ad_id=202, mode="low")
+
+    時鐘[0] += 30 * 60
+    assert 紀錄.in_cooldown("A", cooldown=3600)
+    assert 紀錄.in_cooldown(ad_id=202, cooldown=3600)
+    assert not 紀錄.in_cooldown("A", cooldown=0)
+    保留, 略過 = 紀錄.filter_actions([{"name": "A"}, {"name": "C"}, {"name": "?", "ad_id": "202"}], 3600)
+    assert [動作["name"] for 動作 in 保留] == ["C"] and len(略過) == 2
+
+    統計 = 紀錄.stats(since=0)
+    assert 統計["count"] == 2 and 統計["ads"] == 2
+    assert 統計["increase"] == 20 and 統計["decrease"] == 60
+
+    時鐘[0] += 3600
+    assert not 紀錄.in_cooldown("A", cooldown=3600)
+    assert 紀錄.filter_actions([{"name": "A"}], 3600) == ([{"name": "A"}], [])
+    紀錄.close()
+
+    logger.info("✓ 預算調整紀錄正確")
+    return True
+
+def test_cli_arguments():
+    """測試命令列參數解析"""
+    logger.info("測試命令列參數...")
+
+    from cli import build_parser
+
+    參數 = build_parser().parse_args(["low-roas", "--first-budget", "80", "--dry-run"])
+    assert 參數.first_budget == 80 and 參數.second_budget == 40 and 參數.dry_run
+    assert 參數.cdp_url == "http://localhost:9222"
+
+    參數 = build_parser().parse_args(["--output", "結果.json", "discount-pages", "--pages", "3"])
+    assert 參數.command == "discount-pages" and 參數.pages == 3 and 參數.parallel == 1
+    assert 參數.output == "結果.json" and not 參數.verbose
+
+    參數 = build_parser().parse_args(["discount-batch", "--bulk", "--output", "結果.json", "--verbose"])
+    assert 參數.output == "結果.json" and 參數.verbose
+
+    參數 = build_parser().parse_args(["capture", "--max-pages", "2", "--cooldown", "30"])
+    assert 參數.max_pages == 2 and 參數.cooldown == 30 and 參數.output is None
+
+    logger.info("✓ 命令列參數正確")
+    return True
+
+def run_tests():
+    """運行所有測試"""
+    logger.info("開始運行廣告ROAS離線測試...")
+
+    tests = [
+        ("報表回應解析測試", test_ads_report_parsing),
+        ("預算調整規劃測試", test_budget_planner),
+        ("平均花費快取測試", test_spend_cache),
+        ("向量化ROAS決策測試", test_roas_decision),
+        ("自動執行排程測試", test_roas_scheduler),
+        ("預算調整紀錄測試", test_budget_ledger),
+        ("命令列參數測試", test_cli_arguments)
+    ]
+
+    success_count = 0
+    fail_count = 0
+
+    for test_name, test_func in tests:
+        logger.info(f"\n開始執行測試: {test_name}")
+
+        try:
+            test_func()
+            logger.info(f"✓ 測試 '{test_name}' 成功")
+            success_count += 1
+        except Exception as e:
+            logger.error(f"✗ 測試 '{test_name}' 失敗: {str(e)}")
+            fail_count += 1
+
+    logger.info(f"\n測試執行完成，共執行 {len(tests)} 個測試，成功 {success_count} 個，失敗 {fail_count} 個")
+
+    return success_count == len(tests)
+
+if __name__ == "__main__":
+    if run_tests():
+        logger.info("✅ 所有測試通過！")
+        sys.exit(0)
+    else:
+        logger.error("❌ 測試未全部通過，請檢查廣告ROAS模組。")
+        sys.exit(1)
@@ -23,6 +23,7 @@ from 模組.商品處理 import 商品處理集成
 from 模組.介面處理 import 介面控制
 from 模組.彈窗處理 import 彈窗處理
 from 模組.紀錄輸出 import 紀錄管理器
+from 模組.執行設定 import 取得執行設定, 設定執行設定
 
 # 設置日誌
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -101,12 +102,24 @@ class 調價主程式:
                   command=self.multi_page_process_thread,
                   width=20).grid(row=0, column=2)
         
+        # 執行設定檔：預設 demo，勾選後改用 fast (不高亮、縮短穩定等待)
+        self.快速模式 = tk.BooleanVar(value=取得執行設定()["name"] == "fast")
+        ttk.Checkbutton(self.interface.button_frame, text="快速模式 (不高亮、縮短等待)",
+                        variable=self.快速模式,
+                        command=self.切換執行設定).grid(row=2, column=0, columnspan=3, sticky=tk.W)
+        
         # 創建日誌區域
         self.interface.create_log_area()
         
         # 設置關閉視窗時的操作
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    def 切換執行設定(self):
+        """依「快速模式」選項切換執行設定檔"""
+        名稱 = "fast" if self.快速模式.get() else "demo"
+        設定執行設定(名稱)
+        self.interface.log_message(f"執行設定檔: {名稱}")
+    
     def on_closing(self):
         """關閉視窗時的處理"""
         try:
@@ -230,7 +243,7 @@ class 調價主程式:
             
             # 獲取商品數據
             self.interface.log_message("正在獲取商品數據...")
-            search_result = product_handler.搜尋.搜尋商品()
+            search_result = product_handler.搜尋.搜尋商品(增量=True)
             
             if not search_result:
                 self.interface.log_message("⚠ 未能獲取商品數據")
@@ -298,89 +311,32 @@ class 調價主程式:
             # 初始化商品處理模組
             product_handler = 商品處理集成(self.driver)
             
+            # 先比對目前狀態，只處理需要開啟開關或調整價格的規格
+            動作列表, 統計 = product_handler.規劃變更(self.products)
+            self.interface.log_message(
+                f"共 {統計['規格數']} 個規格: 需開啟開關 {統計['開啟開關']} 個，需設定價格 {統計['設定價格']} 個，"
+                f"無需變更 {統計['無需變更']} 個，無法開啟 {統計['無法開啟']} 個")
+            
             # 批量處理商品規格
-            總處理數, 開關成功數, 價格成功數 = product_handler.批量處理.批量處理商品規格(self.products)
+            總處理數, 開關成功數, 價格成功數, _ = product_handler.批量處理.執行變更計畫(動作列表)
             
             # 記錄商品調整結果
-            self.interface.log_message("正在記錄調整結果...")
+            self.interface.log_message("正在讀回驗證調整結果...")
             
-            # 尋找最近處理過的商品，從頁面獲取其規格和價格信息
             try:
-                # 使用JavaScript從頁面獲取已處理的商品規格信息
-                已處理商品記錄 = self.driver.execute_script("""
-                    // 收集已處理的商品規格和價格信息
-                    const result = [];
-                    
-                    // 獲取所有商品容器
-                    const productContainers = document.querySelectorAll('div.discount-item-component, div.discount-edit-item');
-                    
-                    for (const container of productContainers) {
-                        // 獲取商品名稱
-                        const nameEl = container.querySelector('div.ellipsis-content.single');
-                        if (!nameEl) continue;
-                        
-                        const 商品名稱 = nameEl.textContent.trim();
-                        
-                        // 獲取規格元素
-                        const specElements = container.querySelectorAll('div.discount-view-item-model-component, div.discount-edit-item-model-component');
-                        
-                        for (const specElement of specElements) {
-                            // 獲取規格名稱
-                            const specNameEl = specElement.querySelector('div.ellipsis-content.single');
-                            if (!specNameEl) continue;
-                            
-                            const 規格名稱 = specNameEl.textContent.trim();
-                            
-                            // 獲取價格信息
-                            const priceInput = specElement.querySelector('input.eds-input__input');
-                            const priceDisplay = specElement.querySelector('.currency-input, [class*="price"]');
-                            
-                            let 價格 = '未知';
-                            if (priceInput) {
-                                價格 = priceInput.value;
-                            } else if (priceDisplay) {
-                                價格 = priceDisplay.textContent.trim();
-                            }
-                            
-                            // 確認是否為開啟狀態
-                            const switchEl = specElement.querySelector('div.eds-switch');
-                            let 是否開啟 = false;
-                            
-                            if (switchEl) {
-                                是否開啟 = switchEl.classList.contains('eds-switch--open');
-                            }
-                            
-                            result.push({
-                                '商品名稱': 商品名稱,
-                                '規格名稱': 規格名稱,
-                                '折扣價格': 價格,
-                                '是否開啟': 是否開啟
-                            });
-                        }
-                    }
-                    
-                    return result;
-                """)
+                # 一次頁內讀取所有規格的開關與價格，只重試不符的規格
+                動作列表, 狀態列表, 不符項目 = product_handler.批量處理.驗證並重試(動作列表=動作列表)
+                if 不符項目:
+                    self.interface.log_message(f"⚠ {len(不符項目)} 個規格重試後仍與設定不符")
+                    for (商品名稱, 規格名稱), 項目 in 不符項目.items():
+                        self.interface.log_message(f"  - {商品名稱} / {規格名稱}: {'、'.join(項目['原因'])}")
                 
-                if 已處理商品記錄:
-                    for 記錄 in 已處理商品記錄:
-                        # 從products中找到對應的規格價格設定
-                        商品名稱 = 記錄.get('商品名稱', '')
-                        規格名稱 = 記錄.get('規格名稱', '')
-                        折扣價格 = 記錄.get('折扣價格', '未知')
-                        
-                        設定價格 = '未設定'
-                        成功狀態 = False
-                        
-                        # 在products中尋找對應的設定價格
-                        for product in self.products:
-                            if product.get('name') == 商品名稱:
-                                for spec in product.get('specs', []):
-                                    if spec.get('name') == 規格名稱:
-                                        設定價格 = spec.get('price', '未設定')
-                                        # 假設與折扣價格相同的視為成功
-                                        成功狀態 = str(設定價格) in str(折扣價格)
-                                        break
+                if 動作列表:
+                    for 動作, 狀態 in zip(動作列表, 狀態列表):
+                        商品名稱, 規格名稱 = 動作["product"], 動作["spec"]
+                        折扣價格 = (狀態 or {}).get("value") or '未知'
+                        設定價格 = 動作["price"] if 動作["price"] is not None else '未設定'
+                        成功狀態 = (商品名稱, 規格名稱) not in 不符項目
                         
                         # 記錄調整信息
                         self.紀錄器.記錄價格調整(商品名稱, 規格名稱, 折扣價格, 設定價格, 成功狀態)
@@ -396,16 +352,20 @@ class 調價主程式:
                     else:
                         self.interface.log_message("⚠ 無法生成調整記錄Excel")
                 else:
-                    self.interface.log_message("⚠ 無法從頁面獲取已處理的商品信息")
+                    self.interface.log_message("⚠ 沒有需要驗證的商品規格")
             except Exception as record_error:
                 logger.error(f"記錄調整結果時出錯: {str(record_error)}")
                 self.interface.log_message(f"⚠ 記錄調整結果時出錯: {str(record_error)}")
             
             # 更新UI
             if 總處理數 > 0:
-                結果訊息 = f"批量處理完成!\n\n總共 {總處理數} 個規格\n開啟 {開關成功數} 個\n調整價格 {價格成功數} 個"
+                結果訊息 = (f"批量處理完成!\n\n總共 {統計['規格數']} 個規格\n無需變更 {統計['無需變更']} 個\n"
+                        f"開啟開關 {開關成功數}/{統計['開啟開關']} 個\n調整價格 {價格成功數}/{統計['設定價格']} 個")
                 self.interface.log_message(結果訊息.replace('\n', ' '))
                 self.interface.show_info_dialog("處理結果", 結果訊息)
+            elif 統計['規格數'] > 0:
+                self.interface.log_message("所有規格的開關與價格都已正確，不需要處理")
+                self.interface.show_info_dialog("處理結果", "所有規格的開關與價格都已正確，不需要處理")
             else:
                 self.interface.log_message("未找到需要處理的規格")
                 self.interface.show_info_dialog("處理結果", "未找到需要處理的規格")
@@ -497,17 +457,25 @@ class 調價主程式:
                                 self.interface.log_message("⚠ 無法生成調整記錄Excel")
                 else:
                     success = False if 多頁處理結果 is None else 多頁處理結果
+                    處理結果摘要 = {}
                     總處理規格數 = 0
                     總開關成功數 = 0
                     總價格成功數 = 0
                 
+                # 並行模式下有修改的分頁保持開啟，需由使用者逐一儲存
+                待儲存頁 = 處理結果摘要.get("待儲存頁") if isinstance(處理結果摘要, dict) else []
+                if 待儲存頁:
+                    待儲存訊息 = f"第 {', '.join(map(str, 待儲存頁))} 頁的修改保留在各自的分頁中，尚未儲存，請逐一確認儲存"
+                    self.interface.log_message(f"⚠ {待儲存訊息}")
+                    self.interface.show_warning_dialog("待儲存", 待儲存訊息)
+                
                 # 顯示處理結果
                 if success:
                     結果訊息 = f"多頁批量處理完成!\n\n成功處理了 {已處理頁數}/{頁數} 頁商品\n總共 {總處理規格數} 個規格\n開啟 {總開關成功數} 個\n調整價格 {總價格成功數} 個"
                     
                     self.interface.log_message(f"✓ {結果訊息.replace('!', '').replace('\n', ' ')}")
                     self.interface.show_info_dialog("處理結果", 結果訊息)
-                else:
+                elif not 待儲存頁:
                     self.interface.log_message("⚠ 多頁批量處理過程中發生錯誤，請查看日誌了解詳情")
                     self.interface.show_warning_dialog("處理結果", "多頁批量處理過程中發生錯誤，請查看日誌了解詳情")
             except Exception as e:
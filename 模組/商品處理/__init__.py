@@ -7,6 +7,12 @@
 - 價格調整: 商品價格調整功能
 - 開關控制: 商品規格開關控制功能
 - 批量處理: 批量處理商品規格功能
+- 離線解析: 不需瀏覽器，從已儲存的頁面HTML抽取商品規格
+- 頁面快取: 以頁內MutationObserver增量維護商品規格資料
+- 定位索引: 商品/規格名稱到頁面定位標記的對照，供直接定位元素
+- 並行處理: 以多個分頁並行處理多頁商品
+- 名稱索引: 商品名稱的前綴/子字串索引
+- 變更規劃: 比對目前狀態與期望狀態，只產生需要的操作
 """
 
 import importlib.util
@@ -23,6 +29,12 @@ from .開關控制 import 開關控制
 from .規格分析 import 規格分析
 from .價格調整 import 價格調整
 from .批量處理 import 批量處理
+from .離線解析 import 離線頁面解析器
+from .頁面快取 import 頁面商品快取, 取得頁面快取
+from .定位索引 import 取得定位索引
+from .並行處理 import 並行多頁處理
+from .名稱索引 import 商品名稱索引
+from .變更規劃 import 規劃變更
 
 # 商品處理集成類
 class 商品處理集成:
@@ -54,13 +66,29 @@ class 商品處理集成:
         buttons = 按鈕操作(self.driver)
         return buttons.進入編輯模式()
     
-    def 搜尋商品(self):
+    def 搜尋商品(self, 欄位模式=False, 增量=False):
         """搜尋頁面上的所有商品"""
-        return self.搜尋.搜尋商品()
+        return self.搜尋.搜尋商品(欄位模式, 增量)
     
-    def 搜尋特定前綴商品(self, prefix="Fee"):
+    def 逐批搜尋商品(self, 每批數量=20):
+        """分批抽取頁面上的商品，邊讀取邊產出"""
+        return self.搜尋.逐批搜尋商品(每批數量)
+    
+    def 串流處理商品規格(self, 每批數量=20, 批量模式=False):
+        """邊分批抽取商品邊處理開關和價格"""
+        return self.批量處理.串流處理商品規格(每批數量, 批量模式)
+    
+    def 增量搜尋商品(self):
+        """只重新抽取有變動的商品卡片"""
+        return self.搜尋.增量搜尋商品()
+    
+    def 搜尋特定前綴商品(self, prefix="Fee", 重新抽取=False):
         """搜尋特定前綴的商品"""
-        return self.搜尋.搜尋特定前綴商品(prefix)
+        return self.搜尋.搜尋特定前綴商品(prefix, 重新抽取)
+    
+    def 搜尋包含文字商品(self, 關鍵字, 重新抽取=False):
+        """搜尋名稱包含指定文字的商品"""
+        return self.搜尋.搜尋包含文字商品(關鍵字, 重新抽取)
     
     def 格式化商品資訊(self, products):
         """格式化商品和規格信息以便顯示"""
@@ -70,6 +98,10 @@ class 商品處理集成:
         """分析規格名稱的類型"""
         return self.規格分析.分析規格類型(spec_name)
     
+    def 批量分析規格類型(self, specs):
+        """一次分析整個商品的規格類型"""
+        return self.規格分析.批量分析規格類型(specs)
+    
     def 查找同類規格價格(self, product, target_spec):
         """在商品中查找與目標規格同類的規格價格"""
         return self.規格分析.查找同類規格價格(product, target_spec)
@@ -79,6 +111,18 @@ class 商品處理集成:
         logger.info(f"透過介面調整商品 '{商品名稱}' 規格 '{規格名稱}' 的價格為 {新價格}")
         return self.價格調整.調整商品價格(商品名稱, 規格名稱, 新價格)
     
+    def 批量處理商品規格(self, products, 批量模式=False, 每批數量=50):
+        """批量開啟規格開關並設定價格"""
+        return self.批量處理.批量處理商品規格(products, 批量模式, 每批數量)
+    
+    def 驗證並重試(self, products=None, 重試次數=2, 動作列表=None):
+        """讀回驗證批量處理結果，只重試不符的規格"""
+        return self.批量處理.驗證並重試(products, 重試次數, 動作列表)
+    
+    def 規劃變更(self, products):
+        """比對目前狀態與期望狀態，只產生需要的開關與價格操作"""
+        return 規劃變更(products, self.規格分析)
+    
     def 批量調整價格(self, products, 調整策略="同類規格統一價格"):
         """批量調整多個商品的價格"""
         return self.批量處理.批量調整價格(products, 調整策略)
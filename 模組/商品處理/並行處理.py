@@ -0,0 +1,201 @@
+"""
+並行處理模組
+
+以多個分頁同時處理同一折扣活動的不同頁面：
+- 每個工作執行緒各自建立一個連接到同一個Chrome (遠端除錯埠) 的WebDriver，並開啟自己的分頁
+- 各分頁直接跳到負責的頁碼，處理完後合併調整記錄
+- 與循序處理相同，修改只留在編輯中的分頁、不會自動儲存：有修改的分頁保持開啟並回報為待儲存，
+  由使用者逐一確認；待儲存頁不算成功，其調整記錄標記為未儲存
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from .搜尋 import 商品搜尋, 商品卡片選擇器
+from .批量處理 import 批量處理
+from ..瀏覽器處理 import 等待元素出現
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+
+def 彙整頁結果(頁結果列表):
+    """依頁碼順序合併各分頁的處理結果
+
+    Args:
+        頁結果列表 (list): 處理單頁 的回傳值
+
+    Returns:
+        tuple: (成功頁列表, 處理結果摘要, 調整記錄列表)；
+               待儲存頁的調整記錄標記 "成功": False, "待儲存": True
+    """
+    頁結果列表 = sorted(頁結果列表, key=lambda 頁結果: 頁結果["頁碼"])
+    成功頁 = [頁結果 for 頁結果 in 頁結果列表 if 頁結果["成功"]]
+    待儲存頁 = [頁結果 for 頁結果 in 頁結果列表 if 頁結果.get("待儲存")]
+    處理結果摘要 = {
+        "總處理規格數": sum(頁結果["處理數"] for 頁結果 in 成功頁),
+        "總開關成功數": sum(頁結果["開關成功數"] for 頁結果 in 成功頁),
+        "總價格成功數": sum(頁結果["價格成功數"] for 頁結果 in 成功頁),
+        "待儲存頁": [頁結果["頁碼"] for 頁結果 in 待儲存頁],
+        "待儲存規格數": sum(頁結果["處理數"] for 頁結果 in 待儲存頁)
+    }
+    所有調整記錄 = []
+    for 頁結果 in 頁結果列表:
+        if 頁結果["成功"]:
+            所有調整記錄.extend(頁結果["調整記錄"])
+        elif 頁結果.get("待儲存"):
+            所有調整記錄.extend(dict(記錄, 成功=False, 待儲存=True) for 記錄 in 頁結果["調整記錄"])
+    return 成功頁, 處理結果摘要, 所有調整記錄
+
+
+class 並行多頁處理:
+    """以多個分頁並行執行多頁批量處理"""
+
+    def __init__(self, 活動網址, debugger_address="127.0.0.1:9222", 工作數=3, 批量模式=False):
+        """初始化並行多頁處理
+
+        Args:
+            活動網址 (str): 折扣活動頁面網址
+            debugger_address (str): 已開啟Chrome的遠端除錯位址，各分頁共用登入狀態
+            工作數 (int): 同時處理的分頁數
+            批量模式 (bool): 是否使用頁內批量執行處理每頁規格
+        """
+        self.活動網址 = 活動網址
+        self.debugger_address = debugger_address
+        self.工作數 = max(1, 工作數)
+        self.批量模式 = 批量模式
+        # chromedriver 啟動時會競爭同一個除錯埠，建立連線時依序進行
+        self._連線鎖 = threading.Lock()
+
+    @classmethod
+    def 從現有driver建立(cls, driver, 工作數=3, 批量模式=False):
+        """以目前driver所連接的Chrome與網址建立並行處理器
+
+        Args:
+            driver: 以 debuggerAddress 連接的 Selenium WebDriver實例
+
+        Returns:
+            並行多頁處理: 處理器實例
+        """
+        chrome選項 = driver.capabilities.get("goog:chromeOptions", {})
+        debugger_address = chrome選項.get("debuggerAddress", "127.0.0.1:9222")
+        return cls(driver.current_url, debugger_address, 工作數, 批量模式)
+
+    def _建立工作分頁(self):
+        """連接到Chrome並開啟新分頁"""
+        with self._連線鎖:
+            chrome_options = Options()
+            chrome_options.add_experimental_option("debuggerAddress", self.debugger_address)
+            driver = webdriver.Chrome(options=chrome_options)
+            driver.switch_to.new_window("tab")
+        return driver
+
+    def _結束工作連線(self, driver):
+        """只結束WebDriver連線，分頁與其中尚未儲存的修改保留在瀏覽器中"""
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"結束工作連線時發生錯誤: {str(e)}")
+
+    def _關閉工作分頁(self, driver):
+        """關閉工作分頁並結束連線 (不關閉瀏覽器本身)"""
+        try:
+            driver.close()
+        except Exception as e:
+            logger.warning(f"關閉工作分頁時發生錯誤: {str(e)}")
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"結束工作連線時發生錯誤: {str(e)}")
+
+    def 處理單頁(self, 頁碼):
+        """在新分頁中處理指定頁碼的商品
+
+        Args:
+            頁碼 (int): 要處理的頁碼 (從1開始)
+
+        有修改時分頁保持開啟、回報為待儲存 (成功為 False)，沒有任何修改時才算成功並關閉分頁。
+
+        Returns:
+            dict: {"頁碼", "成功", "待儲存", "處理數", "開關成功數", "價格成功數", "調整記錄"}
+        """
+        頁結果 = {"頁碼": 頁碼, "成功": False, "待儲存": False, "處理數": 0, "開關成功數": 0,
+                 "價格成功數": 0, "調整記錄": []}
+        driver = None
+        try:
+            driver = self._建立工作分頁()
+            driver.get(self.活動網址)
+            等待元素出現(driver, 商品卡片選擇器, 超時時間=15)
+
+            搜尋 = 商品搜尋(driver)
+            if not 搜尋.進入編輯模式():
+                logger.error(f"⚠ 第 {頁碼} 頁無法進入編輯模式")
+                return 頁結果
+            if not 搜尋.前往指定頁(頁碼):
+                logger.error(f"⚠ 無法前往第 {頁碼} 頁")
+                return 頁結果
+            # 換頁可能會退出編輯模式
+            if not 搜尋.進入編輯模式():
+                logger.error(f"⚠ 前往第 {頁碼} 頁後無法進入編輯模式")
+                return 頁結果
+
+            商品列表 = 搜尋.搜尋商品().get("products", [])
+            if not 商品列表:
+                logger.warning(f"⚠ 第 {頁碼} 頁未找到任何商品")
+                return 頁結果
+
+            處理數, 開關成功數, 價格成功數, 調整記錄 = 批量處理(driver).批量處理商品規格(
+                商品列表, 批量模式=self.批量模式)
+            已修改 = bool(開關成功數 or 價格成功數)
+            頁結果.update({"成功": not 已修改, "待儲存": 已修改, "處理數": 處理數, "開關成功數": 開關成功數,
+                         "價格成功數": 價格成功數, "調整記錄": 調整記錄})
+            if 已修改:
+                logger.warning(f"第 {頁碼} 頁已修改 (開關 {開關成功數} 個，調價 {價格成功數} 個)，"
+                               f"修改保留在分頁中尚未儲存，請在該分頁確認儲存")
+            else:
+                logger.info(f"第 {頁碼} 頁處理完成: 處理 {處理數} 個規格，沒有需要儲存的修改")
+        except Exception as e:
+            logger.error(f"處理第 {頁碼} 頁時發生錯誤: {str(e)}")
+        finally:
+            if driver is not None:
+                if 頁結果["待儲存"]:
+                    self._結束工作連線(driver)
+                else:
+                    self._關閉工作分頁(driver)
+        return 頁結果
+
+    def 批量處理多頁商品(self, 頁數, 起始頁=1):
+        """並行處理多頁商品的規格
+
+        Args:
+            頁數 (int): 要處理的頁數
+            起始頁 (int): 第一個要處理的頁碼
+
+        Returns:
+            tuple: (是否成功, 已處理頁數, 處理結果摘要, 調整記錄列表)，與 商品搜尋.批量處理多頁商品 相同；
+                   處理結果摘要另含 "待儲存頁" (仍需在分頁中儲存的頁碼) 與 "待儲存規格數"
+        """
+        頁碼列表 = list(range(起始頁, 起始頁 + 頁數))
+        logger.info(f"以 {min(self.工作數, len(頁碼列表))} 個分頁並行處理第 {頁碼列表[0]}-{頁碼列表[-1]} 頁")
+
+        頁結果列表 = []
+        with ThreadPoolExecutor(max_workers=self.工作數) as executor:
+            futures = {executor.submit(self.處理單頁, 頁碼): 頁碼 for 頁碼 in 頁碼列表}
+            for future in as_completed(futures):
+                頁結果列表.append(future.result())
+
+        # 依頁碼順序合併，調整記錄與循序處理時的順序一致
+        成功頁, 處理結果摘要, 所有調整記錄 = 彙整頁結果(頁結果列表)
+
+        失敗頁 = [頁結果["頁碼"] for 頁結果 in 頁結果列表 if not 頁結果["成功"] and not 頁結果["待儲存"]]
+        if 失敗頁:
+            logger.warning(f"⚠ 以下頁面處理失敗: {失敗頁}")
+        if 處理結果摘要["待儲存頁"]:
+            logger.warning(f"⚠ 以下頁面的修改仍保留在分頁中等待儲存: {處理結果摘要['待儲存頁']}")
+        logger.info(f"並行多頁處理完成: 共處理 {len(成功頁)}/{頁數} 頁，{處理結果摘要['總處理規格數']} 個規格")
+
+        return bool(成功頁), len(成功頁), 處理結果摘要, 所有調整記錄
@@ -0,0 +1,96 @@
+"""
+名稱索引模組
+
+以一次抽取的商品列表建立商品名稱索引，之後任意次數的前綴/子字串查詢都不需要再讀取頁面：
+- 前綴查詢: 排序陣列 + 二分搜尋，O(log n + 結果數)
+- 子字串查詢: 在以分隔字元串接的全文上用 str.find 搜尋，再以二分搜尋對應回商品
+"""
+
+import bisect
+import logging
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# 商品名稱中不會出現的分隔字元
+_分隔字元 = "\x00"
+
+
+class 商品名稱索引:
+    """商品名稱的前綴/子字串索引"""
+
+    def __init__(self, products, 忽略大小寫=False):
+        """建立名稱索引
+
+        Args:
+            products (list): 搜尋商品 回傳的商品列表
+            忽略大小寫 (bool): 是否以不分大小寫的方式比對
+        """
+        self.products = list(products)
+        self.忽略大小寫 = 忽略大小寫
+
+        名稱列表 = [self._正規化(product.get("name", "")) for product in self.products]
+
+        # 前綴查詢用：依名稱排序的 (名稱, 商品索引)
+        排序 = sorted(range(len(名稱列表)), key=lambda i: (名稱列表[i], i))
+        self._排序名稱 = [名稱列表[i] for i in 排序]
+        self._排序索引 = 排序
+
+        # 子字串查詢用：全文與每個名稱的起始位置
+        self._全文 = _分隔字元.join(名稱列表)
+        self._起始位置 = []
+        位置 = 0
+        for 名稱 in 名稱列表:
+            self._起始位置.append(位置)
+            位置 += len(名稱) + 1
+
+        logger.debug(f"已建立 {len(self.products)} 個商品的名稱索引")
+
+    def _正規化(self, 文字):
+        文字 = (文字 or "").strip()
+        return 文字.casefold() if self.忽略大小寫 else 文字
+
+    def __len__(self):
+        return len(self.products)
+
+    def 前綴查詢(self, prefix):
+        """回傳名稱以 prefix 開頭的商品 (依頁面順序)
+
+        Args:
+            prefix (str): 名稱前綴
+
+        Returns:
+            list: 符合的商品
+        """
+        prefix = self._正規化(prefix)
+        起點 = bisect.bisect_left(self._排序名稱, prefix)
+        索引列表 = []
+        for i in range(起點, len(self._排序名稱)):
+            if not self._排序名稱[i].startswith(prefix):
+                break
+            索引列表.append(self._排序索引[i])
+        return [self.products[i] for i in sorted(索引列表)]
+
+    def 子字串查詢(self, 關鍵字):
+        """回傳名稱包含關鍵字的商品 (依頁面順序)
+
+        Args:
+            關鍵字 (str): 要搜尋的文字
+
+        Returns:
+            list: 符合的商品
+        """
+        關鍵字 = self._正規化(關鍵字)
+        if not 關鍵字:
+            return list(self.products)
+
+        索引集合 = set()
+        位置 = self._全文.find(關鍵字)
+        while 位置 != -1:
+            商品索引 = bisect.bisect_right(self._起始位置, 位置) - 1
+            索引集合.add(商品索引)
+            # 直接跳到下一個名稱，同一名稱只需命中一次
+            下一名稱 = (self._起始位置[商品索引 + 1]
+                      if 商品索引 + 1 < len(self._起始位置) else len(self._全文))
+            位置 = self._全文.find(關鍵字, 下一名稱)
+        return [self.products[i] for i in sorted(索引集合)]
@@ -0,0 +1,138 @@
+"""
+定位索引模組
+
+搜尋商品時會在每個商品卡片與規格行上標記 data-product-key / data-spec-key，
+此模組在Python端保存 (商品名稱, 規格名稱) -> 標記鍵 的對照表，
+讓後續的價格調整與開關控制可以用一次 querySelector 直接取得元素，
+不必每個規格都線性掃描所有商品容器。
+規格行查找JS 是價格調整與批量處理共用的頁內查找函數 (先依標記鍵，再依名稱)。
+"""
+
+import logging
+import weakref
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# 商品卡片與規格行的選擇器
+商品卡片選擇器 = 'div.discount-item-component, div.discount-edit-item'
+規格行選擇器 = 'div.discount-view-item-model-component, div.discount-edit-item-model-component'
+
+# 依標記鍵查找規格行，並確認商品名稱與規格名稱仍然相符 (頁面重新渲染後標記可能過期)
+依鍵查找規格行JS = """
+function 依鍵查找規格行(productName, specName, specKey) {
+    if (!specKey) return null;
+    const row = document.querySelector('[data-spec-key="' + specKey + '"]');
+    if (!row) return null;
+    const specNameEl = row.querySelector('div.ellipsis-content.single');
+    if (!specNameEl || specNameEl.innerText.trim() !== specName) return null;
+    const card = row.closest('[data-product-key]');
+    const nameEl = card ? card.querySelector('div.ellipsis-content.single') : null;
+    if (!nameEl || nameEl.innerText.trim() !== productName) return null;
+    return row;
+}
+"""
+
+# 查找規格行 (標記鍵失效時依商品名稱→卡片的對照表線性查找) 與折扣價輸入框 (排除原價輸入框)，
+# 不做高亮與捲動；同一次 execute_script 內的多次查找共用卡片對照表
+規格行查找JS = 依鍵查找規格行JS + """
+const cardSelector = '%s';
+const rowSelector = '%s';
+
+let cardMap = null;
+function 線性查找(productName, specName) {
+    if (!cardMap) {
+        cardMap = new Map();
+        for (const card of document.querySelectorAll(cardSelector)) {
+            const nameEl = card.querySelector('div.ellipsis-content.single');
+            if (nameEl && !cardMap.has(nameEl.innerText.trim())) cardMap.set(nameEl.innerText.trim(), card);
+        }
+    }
+    const card = cardMap.get(productName);
+    if (!card) return null;
+    for (const row of card.querySelectorAll(rowSelector)) {
+        const specNameEl = row.querySelector('div.ellipsis-content.single');
+        if (specNameEl && specNameEl.innerText.trim() === specName) return row;
+    }
+    return null;
+}
+
+function 查找規格行(productName, specName, specKey) {
+    return 依鍵查找規格行(productName, specName, specKey) || 線性查找(productName, specName);
+}
+
+function 找價格輸入框(row) {
+    for (const prefix of row.querySelectorAll('.eds-input__prefix')) {
+        if (!prefix.textContent.includes('NT$')) continue;
+        const input = prefix.parentElement.querySelector('input.eds-input__input');
+        const control = input && input.closest('.eds-form-control');
+        const label = control ? control.querySelector('.eds-form-control__label') : null;
+        const labelText = label ? label.textContent.trim() : '';
+        if (input && !labelText.includes('原價') && !labelText.toLowerCase().includes('original')) return input;
+    }
+    return row.querySelector('input.eds-input__input');
+}
+""" % (商品卡片選擇器, 規格行選擇器)
+
+# 每個 driver 各自一份索引，driver 被回收時自動清除
+_索引表 = weakref.WeakKeyDictionary()
+
+
+class 定位索引:
+    """商品/規格名稱到頁面標記鍵的對照表"""
+
+    def __init__(self):
+        self.商品 = {}
+        self.規格 = {}
+
+    def 清除(self):
+        """清除所有對照"""
+        self.商品.clear()
+        self.規格.clear()
+
+    def 更新(self, products, 完整=True):
+        """依搜尋結果更新對照表
+
+        Args:
+            products (list): 搜尋商品 回傳的商品列表 (商品與規格需帶有 key)
+            完整 (bool): 為True時先清除舊對照 (整頁重新抽取)
+        """
+        if 完整:
+            self.清除()
+        for product in products:
+            if not product:
+                continue
+            if product.get("key") is not None:
+                self.商品[product["name"]] = product["key"]
+            for spec in product.get("specs", []):
+                if spec.get("key") is not None:
+                    self.規格[(product["name"], spec["name"])] = spec["key"]
+        logger.debug(f"定位索引已更新: {len(self.商品)} 個商品, {len(self.規格)} 個規格")
+
+    def 商品鍵(self, 商品名稱):
+        """取得商品卡片的標記鍵，找不到時回傳 None"""
+        return self.商品.get(商品名稱)
+
+    def 規格鍵(self, 商品名稱, 規格名稱):
+        """取得規格行的標記鍵，找不到時回傳 None"""
+        return self.規格.get((商品名稱, 規格名稱))
+
+
+def 取得定位索引(driver):
+    """取得 driver 對應的定位索引，不存在時建立
+
+    Args:
+        driver: Selenium WebDriver實例
+
+    Returns:
+        定位索引: 該 driver 的索引
+    """
+    try:
+        索引 = _索引表.get(driver)
+        if 索引 is None:
+            索引 = 定位索引()
+            _索引表[driver] = 索引
+        return 索引
+    except TypeError:
+        # 無法建立弱參照的 driver (例如測試替身) 不共用索引
+        return 定位索引()
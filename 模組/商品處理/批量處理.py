@@ -3,14 +3,203 @@
 
 包含與商品規格批量處理相關的功能：
 - 批量處理商品規格
+- 頁內批量執行 (每批動作只需一次 execute_script)
+- 串流處理 (邊分批抽取商品邊處理)
+- 讀回驗證 (一次頁內讀取所有動作的開關與價格，只重試不符的規格)
+- 只處理變更 (依 變更規劃 只執行真正需要的開關與價格操作)
 """
 
 import time
 import logging
 
+from .定位索引 import 取得定位索引, 規格行查找JS
+from ..瀏覽器處理 import 等待DOM穩定
+from ..重試策略 import 斷路器
+
 # 設置日誌
 logger = logging.getLogger(__name__)
 
+# 頁內批量執行動作：先開啟所有開關，等待頁面更新後填入所有價格，再等待一次後逐項驗證。
+# 以 execute_async_script 執行，整批只需一次往返。
+批量執行動作JS = 規格行查找JS + """
+const actions = arguments[0];
+const waitMs = arguments[1];
+const done = arguments[arguments.length - 1];
+
+function 設定輸入值(input, value) {
+    // 使用原生 setter，讓框架的受控輸入框也能收到新值
+    const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    input.focus();
+    setter.call(input, value);
+    input.dispatchEvent(new Event('input', { bubbles: true }));
+    input.dispatchEvent(new Event('change', { bubbles: true }));
+    input.blur();
+}
+
+const rows = [];
+const results = actions.map((a, i) => {
+    const r = { found: false, switchOk: !a.open, switchMessage: '', priceOk: false, priceMessage: '', before: '' };
+    const row = 查找規格行(a.product, a.spec, a.key);
+    rows[i] = row;
+    if (!row) {
+        r.switchOk = false;
+        r.switchMessage = r.priceMessage = '找不到規格行';
+        return r;
+    }
+    r.found = true;
+    if (a.open) {
+        const switchEl = row.querySelector('div.eds-switch');
+        if (!switchEl) {
+            r.switchMessage = '未找到開關';
+        } else if (switchEl.classList.contains('eds-switch--disabled')) {
+            r.switchMessage = '開關被禁用';
+        } else if (switchEl.classList.contains('eds-switch--open')) {
+            r.switchOk = true;
+            r.switchMessage = '開關已開啟';
+        } else {
+            switchEl.click();
+            r.clicked = true;
+        }
+    }
+    return r;
+});
+
+setTimeout(() => {
+    actions.forEach((a, i) => {
+        const r = results[i];
+        if (!r.found) return;
+        if (!rows[i].isConnected) rows[i] = 查找規格行(a.product, a.spec, a.key);
+        const row = rows[i];
+        if (r.clicked) {
+            const switchEl = row && row.querySelector('div.eds-switch');
+            r.switchOk = !!switchEl && switchEl.classList.contains('eds-switch--open');
+            r.switchMessage = r.switchOk ? '已開啟開關' : '點擊後仍未開啟';
+        }
+        if (!a.price || !row) return;
+        const input = 找價格輸入框(row);
+        if (!input) {
+            r.priceMessage = '找不到價格輸入框';
+            return;
+        }
+        r.before = input.value;
+        設定輸入值(input, a.price);
+        r.priceSet = true;
+    });
+
+    setTimeout(() => {
+        actions.forEach((a, i) => {
+            const r = results[i];
+            if (!r.priceSet) return;
+            const row = rows[i] && rows[i].isConnected ? rows[i] : 查找規格行(a.product, a.spec, a.key);
+            const input = row && 找價格輸入框(row);
+            const errorEl = row && row.querySelector('.eds-input__error-msg');
+            const error = errorEl ? errorEl.textContent.trim() : '';
+            r.priceOk = !!input && input.value === a.price && !error;
+            r.priceMessage = r.priceOk ? '價格輸入成功' : (error || '輸入失敗，值不匹配');
+            delete r.priceSet;
+        });
+        results.forEach(r => delete r.clicked);
+        done(results);
+    }, waitMs);
+}, waitMs);
+"""
+
+# 讀回驗證：一次讀取所有動作目前的開關狀態、折扣價與錯誤訊息，不做任何操作
+批量讀取狀態JS = 規格行查找JS + """
+return arguments[0].map(a => {
+    const row = 查找規格行(a.product, a.spec, a.key);
+    if (!row) return { found: false };
+    const switchEl = row.querySelector('div.eds-switch');
+    const input = 找價格輸入框(row);
+    const errorEl = row.querySelector('.eds-input__error-msg');
+    return {
+        found: true,
+        open: !!switchEl && switchEl.classList.contains('eds-switch--open'),
+        disabled: !!switchEl && switchEl.classList.contains('eds-switch--disabled'),
+        value: input ? input.value : null,
+        error: errorEl ? errorEl.textContent.trim() : ''
+    };
+});
+"""
+
+
+def 解析參考價格(價格):
+    """將規格的價格欄位轉為浮點數，無法轉換時回傳 None
+
+    Args:
+        價格: 數字或字串 (可能帶有貨幣符號與千分位)
+
+    Returns:
+        float: 價格；無法轉換時為 None
+    """
+    try:
+        if isinstance(價格, str):
+            # 移除非數字字符（例如貨幣符號）
+            價格 = 價格.replace(',', '')
+            價格 = ''.join(c for c in 價格 if c.isdigit() or c == '.')
+            價格 = float(價格) if 價格 else 0
+        return float(價格)
+    except (ValueError, TypeError):
+        return None
+
+
+def 格式化價格(價格):
+    """整數價格不帶小數點，與頁面輸入框的值一致"""
+    return str(int(價格)) if float(價格).is_integer() else str(價格)
+
+
+def 規劃動作(商品資料列表):
+    """把商品資料轉成頁內動作列表
+
+    Args:
+        商品資料列表 (list): 搜尋商品 回傳的商品列表
+
+    Returns:
+        list: [{"product", "spec", "open": True, "price": str 或 None}]，參考價格無效時 price 為 None
+    """
+    動作列表 = []
+    for product_idx, 商品 in enumerate(商品資料列表):
+        商品名稱 = 商品.get("name", f"未命名商品_{product_idx}")
+        for spec_idx, 規格 in enumerate(商品.get("specs", [])):
+            參考價格 = 解析參考價格(規格.get("price", 0))
+            動作列表.append({
+                "product": 商品名稱,
+                "spec": 規格.get("name", f"未命名規格_{spec_idx}"),
+                "open": True,
+                "price": 格式化價格(參考價格) if 參考價格 and 參考價格 > 0 else None
+            })
+    return 動作列表
+
+
+def 找出不符項目(動作列表, 狀態列表):
+    """比對動作與讀回的頁面狀態
+
+    Args:
+        動作列表 (list): 規劃動作 產生的動作
+        狀態列表 (list): 與動作一一對應的頁面狀態 {found, open, disabled, value, error}
+
+    Returns:
+        dict: {(商品名稱, 規格名稱): {"動作", "狀態", "原因": [...]}}，只包含不符的規格
+    """
+    不符項目 = {}
+    for 動作, 狀態 in zip(動作列表, 狀態列表):
+        狀態 = 狀態 or {"found": False}
+        原因 = []
+        if not 狀態.get("found"):
+            原因.append("找不到規格行")
+        else:
+            # 被禁用的開關無法由程式開啟，不列為可重試的不符
+            if 動作.get("open") and not 狀態.get("open") and not 狀態.get("disabled"):
+                原因.append("開關未開啟")
+            if 動作.get("price"):
+                if 狀態.get("error"):
+                    原因.append(狀態["error"])
+                elif 解析參考價格(狀態.get("value") or "") != float(動作["price"]):
+                    原因.append(f"價格為 {狀態.get('value')}")
+        if 原因:
+            不符項目[(動作["product"], 動作["spec"])] = {"動作": 動作, "狀態": 狀態, "原因": 原因}
+    return 不符項目
+
 class 批量處理:
     """處理商品規格批量處理相關功能的類"""
     
@@ -29,11 +218,14 @@ class 批量處理:
         self.價格調整 = 價格調整(driver)
         self.規格分析 = 規格分析(driver)
     
-    def 批量處理商品規格(self, 商品資料列表):
+    def 批量處理商品規格(self, 商品資料列表, 批量模式=False, 每批數量=50, 只處理變更=False):
         """批量處理多個商品的開關和價格設定
         
         參數:
             商品資料列表: 包含商品資料的列表
+            批量模式: 為True時改用頁內批量執行，每批只需一次 execute_script
+            每批數量: 批量模式下每次送進頁面的規格數
+            只處理變更: 為True時先比對目前狀態，只執行需要的開關與價格操作 (一律頁內執行)
             
         返回:
             tuple: (處理總數, 開關成功數, 價格成功數, 調整記錄列表)
@@ -41,13 +233,26 @@ class 批量處理:
         if not 商品資料列表:
             logger.warning("批量處理傳入的商品列表為空")
             return (0, 0, 0, [])
+        
+        if 只處理變更:
+            from .變更規劃 import 規劃變更
+            動作列表, _ = 規劃變更(商品資料列表, self.規格分析)
+            return self.執行變更計畫(動作列表, 每批數量)
+        
+        if 批量模式:
+            return self.頁內批量處理商品規格(商品資料列表, 每批數量)
             
         總處理規格數 = 0
         開關成功數 = 0
         價格成功數 = 0
         調整記錄列表 = []
+        # 整批共用：連續失敗時暫停並處理彈窗，而不是讓剩下的每個規格都重試到底
+        價格斷路器 = 斷路器(失敗門檻=5, 恢復=self.價格調整.恢復彈窗)
         
         for product_idx, 商品 in enumerate(商品資料列表):
+            if 價格斷路器.已停止:
+                logger.error(f"連續失敗且彈窗恢復無效，停止批量處理 (剩餘 {len(商品資料列表) - product_idx} 個商品未處理)")
+                break
             商品名稱 = 商品.get("name", f"未命名商品_{product_idx}")
             規格清單 = 商品.get("specs", [])
             
@@ -60,19 +265,14 @@ class 批量處理:
                 
             # 處理每個規格
             for spec_idx, 規格 in enumerate(規格清單):
+                if 價格斷路器.已停止:
+                    break
                 規格名稱 = 規格.get("name", f"未命名規格_{spec_idx}")
                 參考價格 = 規格.get("price", 0)
                 
                 # 確保參考價格是數字類型
-                try:
-                    # 如果是字符串，轉換為數字
-                    if isinstance(參考價格, str):
-                        # 移除非數字字符（例如貨幣符號）
-                        參考價格 = 參考價格.replace(',', '')
-                        參考價格 = ''.join(c for c in 參考價格 if c.isdigit() or c == '.')
-                        參考價格 = float(參考價格) if 參考價格 else 0
-                    參考價格 = float(參考價格)  # 確保轉換為浮點數
-                except (ValueError, TypeError):
+                參考價格 = 解析參考價格(參考價格)
+                if 參考價格 is None:
                     logger.warning(f"⚠ 規格 '{規格名稱}' 的參考價格 '{規格.get('price')}' 無法轉換為數字，設為0")
                     參考價格 = 0
                 
@@ -90,7 +290,7 @@ class 批量處理:
                 
                 # 2. 處理價格
                 if 參考價格 > 0:
-                    價格調整結果 = self.價格調整.調整商品價格(商品名稱, 規格名稱, 參考價格)
+                    價格調整結果 = self.價格調整.調整商品價格(商品名稱, 規格名稱, 參考價格, 斷路器=價格斷路器)
                     
                     # 判斷是否返回了調整記錄
                     if isinstance(價格調整結果, tuple) and len(價格調整結果) == 2:
@@ -108,9 +308,215 @@ class 批量處理:
                 else:
                     logger.warning(f"⚠ 規格 '{規格名稱}' 參考價格為零或負值 ({參考價格})，跳過價格設定")
                 
-                # 操作間隔，避免過度頻繁操作
-                time.sleep(0.5)
+                # 操作間隔：等待頁面完成上一個操作的重新渲染，避免過度頻繁操作
+                等待DOM穩定(self.driver, 200, 超時時間=0.5)
         
         # 返回處理結果
         logger.info(f"批量處理完成: 共處理 {總處理規格數} 個規格，成功設定開關 {開關成功數} 個，成功設定價格 {價格成功數} 個")
-        return (總處理規格數, 開關成功數, 價格成功數, 調整記錄列表) 
\ No newline at end of file
+        return (總處理規格數, 開關成功數, 價格成功數, 調整記錄列表)
+    
+    def 執行頁內動作(self, 動作列表, 每批數量=50, 等待毫秒=800):
+        """在頁面內分批執行開關/價格動作
+        
+        參數:
+            動作列表: 每項為 {"product", "spec", "open": bool, "price": str 或 None}
+            每批數量: 每次 execute_script 處理的動作數
+            等待毫秒: 點擊開關後與填入價格後各等待的毫秒數
+            
+        返回:
+            list: 與動作列表一一對應的結果，
+                  {"found", "switchOk", "switchMessage", "priceOk", "priceMessage", "before"}
+        """
+        定位 = 取得定位索引(self.driver)
+        結果列表 = []
+        
+        for 起點 in range(0, len(動作列表), 每批數量):
+            批次 = [dict(動作, key=定位.規格鍵(動作["product"], 動作["spec"]))
+                  for 動作 in 動作列表[起點:起點 + 每批數量]]
+            logger.info(f"頁內執行第 {起點 + 1}-{起點 + len(批次)} / {len(動作列表)} 個動作")
+            
+            try:
+                批次結果 = self.driver.execute_async_script(批量執行動作JS, 批次, 等待毫秒)
+            except Exception as e:
+                logger.error(f"頁內批量執行時發生錯誤: {str(e)}")
+                批次結果 = None
+            
+            if not 批次結果 or len(批次結果) != len(批次):
+                批次結果 = [{"found": False, "switchOk": False, "switchMessage": "執行失敗",
+                          "priceOk": False, "priceMessage": "執行失敗", "before": ""}
+                         for _ in 批次]
+            結果列表.extend(批次結果)
+        
+        return 結果列表
+    
+    def 頁內批量處理商品規格(self, 商品資料列表, 每批數量=50):
+        """以頁內批量執行處理多個商品的開關和價格設定
+        
+        參數:
+            商品資料列表: 包含商品資料的列表
+            每批數量: 每次送進頁面的規格數
+            
+        返回:
+            tuple: (處理總數, 開關成功數, 價格成功數, 調整記錄列表)
+        """
+        動作列表 = 規劃動作(商品資料列表)
+        for 動作 in 動作列表:
+            if not 動作["price"]:
+                logger.warning(f"⚠ 規格 '{動作['spec']}' 參考價格為零或無效，跳過價格設定")
+        
+        return self.執行變更計畫(動作列表, 每批數量)
+    
+    def 執行變更計畫(self, 動作列表, 每批數量=50):
+        """頁內執行動作列表並彙整成批量處理的結果
+        
+        參數:
+            動作列表: 規劃動作 或 變更規劃.規劃變更 產生的動作
+            每批數量: 每次送進頁面的規格數
+            
+        返回:
+            tuple: (動作數, 開關成功數, 價格成功數, 調整記錄列表)
+        """
+        if not 動作列表:
+            logger.info("沒有需要執行的動作")
+            return (0, 0, 0, [])
+        
+        結果列表 = self.執行頁內動作(動作列表, 每批數量)
+        
+        開關成功數 = 0
+        價格成功數 = 0
+        調整記錄列表 = []
+        for 動作, 結果 in zip(動作列表, 結果列表):
+            # 只設定價格的動作不需要開關，不列入開關成功數
+            if 動作.get("open", True):
+                if 結果.get("switchOk"):
+                    開關成功數 += 1
+                else:
+                    logger.warning(f"✗ 規格 '{動作['spec']}' 開關設定失敗: {結果.get('switchMessage', '未知')}")
+            
+            if not 動作["price"]:
+                continue
+            if 結果.get("priceOk"):
+                價格成功數 += 1
+                調整記錄 = {
+                    "商品名稱": 動作["product"],
+                    "規格名稱": 動作["spec"],
+                    "原價格": 結果.get("before", ""),
+                    "新價格": 動作["price"],
+                    "成功": True,
+                    "時間": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "參考規格": 動作.get("reference", ""),
+                    "參考折扣價": None
+                }
+                self.價格調整.調整記錄.append(調整記錄)
+                調整記錄列表.append(調整記錄)
+            else:
+                logger.warning(f"✗ 規格 '{動作['spec']}' 價格設定失敗: {結果.get('priceMessage', '未知')}")
+        
+        logger.info(f"頁內批量處理完成: 共處理 {len(動作列表)} 個動作，成功設定開關 {開關成功數} 個，成功設定價格 {價格成功數} 個")
+        return (len(動作列表), 開關成功數, 價格成功數, 調整記錄列表)
+    
+    def 驗證動作(self, 動作列表, 每批數量=200):
+        """以頁內讀取驗證動作是否都已生效 (每批一次 execute_script)
+        
+        參數:
+            動作列表: 規劃動作 產生的動作
+            每批數量: 每次讀取的動作數
+            
+        返回:
+            tuple: (與動作一一對應的頁面狀態列表, 不符項目字典)
+        """
+        定位 = 取得定位索引(self.driver)
+        狀態列表 = []
+        for 起點 in range(0, len(動作列表), 每批數量):
+            批次 = [dict(動作, key=定位.規格鍵(動作["product"], 動作["spec"]))
+                  for 動作 in 動作列表[起點:起點 + 每批數量]]
+            try:
+                批次狀態 = self.driver.execute_script(批量讀取狀態JS, 批次)
+            except Exception as e:
+                logger.error(f"讀回驗證時發生錯誤: {str(e)}")
+                批次狀態 = None
+            狀態列表.extend(批次狀態 if 批次狀態 and len(批次狀態) == len(批次) else [None] * len(批次))
+        
+        不符項目 = 找出不符項目(動作列表, 狀態列表)
+        logger.info(f"讀回驗證完成: {len(動作列表)} 個規格中有 {len(不符項目)} 個不符")
+        return 狀態列表, 不符項目
+    
+    def 重試不符項目(self, 不符項目, 重試次數=2, 每批數量=50):
+        """只對不符的規格重新執行動作並再次驗證
+        
+        參數:
+            不符項目: 驗證動作 回傳的不符項目字典
+            重試次數: 最多重試幾輪
+            每批數量: 每次送進頁面的規格數
+            
+        返回:
+            dict: 重試後仍不符的項目
+        """
+        for 輪次 in range(1, 重試次數 + 1):
+            if not 不符項目:
+                break
+            動作列表 = [項目["動作"] for 項目 in 不符項目.values()]
+            logger.info(f"第 {輪次} 輪重試 {len(動作列表)} 個不符的規格")
+            self.執行頁內動作(動作列表, 每批數量)
+            _, 不符項目 = self.驗證動作(動作列表)
+        
+        for (商品名稱, 規格名稱), 項目 in 不符項目.items():
+            logger.warning(f"✗ 商品 '{商品名稱}' 規格 '{規格名稱}' 仍不符: {', '.join(項目['原因'])}")
+        return 不符項目
+    
+    def 驗證並重試(self, 商品資料列表=None, 重試次數=2, 動作列表=None):
+        """批量處理之後的驗證階段：一次讀回所有規格，只重試不符的規格
+        
+        參數:
+            商品資料列表: 已處理的商品列表 (與批量處理商品規格相同)
+            重試次數: 最多重試幾輪
+            動作列表: 已執行的動作 (例如變更規劃的結果)，提供時只驗證這些動作
+            
+        返回:
+            tuple: (動作列表, 與動作對應的最終頁面狀態列表, 仍不符的項目字典)
+        """
+        if 動作列表 is None:
+            動作列表 = 規劃動作(商品資料列表 or [])
+        狀態列表, 不符項目 = self.驗證動作(動作列表)
+        if not 不符項目 or 重試次數 <= 0:
+            return 動作列表, 狀態列表, 不符項目
+        
+        重試鍵 = set(不符項目)
+        不符項目 = self.重試不符項目(不符項目, 重試次數)
+        
+        # 只重新讀取重試過的規格，更新其最終狀態
+        索引 = [i for i, 動作 in enumerate(動作列表) if (動作["product"], 動作["spec"]) in 重試鍵]
+        最終狀態, _ = self.驗證動作([動作列表[i] for i in 索引])
+        for i, 狀態 in zip(索引, 最終狀態):
+            狀態列表[i] = 狀態
+        return 動作列表, 狀態列表, 不符項目
+    
+    def 串流處理商品規格(self, 每批數量=20, 批量模式=False):
+        """分批抽取目前頁面的商品，每批抽取完成就立即處理
+        
+        參數:
+            每批數量: 每批抽取的商品卡片數
+            批量模式: 是否使用頁內批量執行處理每批規格
+            
+        返回:
+            tuple: (處理總數, 開關成功數, 價格成功數, 調整記錄列表)
+        """
+        from .搜尋 import 商品搜尋
+        
+        總處理規格數 = 0
+        開關成功數 = 0
+        價格成功數 = 0
+        調整記錄列表 = []
+        
+        for 批次編號, 商品批次 in enumerate(商品搜尋(self.driver).逐批搜尋商品(每批數量), 1):
+            if not 商品批次:
+                continue
+            處理數, 開關數, 價格數, 記錄 = self.批量處理商品規格(商品批次, 批量模式=批量模式)
+            總處理規格數 += 處理數
+            開關成功數 += 開關數
+            價格成功數 += 價格數
+            調整記錄列表.extend(記錄)
+            logger.info(f"第 {批次編號} 批處理完成，累計處理 {總處理規格數} 個規格")
+        
+        logger.info(f"串流處理完成: 共處理 {總處理規格數} 個規格，成功設定開關 {開關成功數} 個，成功設定價格 {價格成功數} 個")
+        return (總處理規格數, 開關成功數, 價格成功數, 調整記錄列表)
@@ -14,6 +14,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from .搜尋 import 編輯模式選擇器
+from ..瀏覽器處理 import 等待元素出現
+from ..重試策略 import 重試策略
+from ..彈窗處理 import 彈窗處理
+
 # 設置日誌
 logger = logging.getLogger(__name__)
 
@@ -71,7 +76,7 @@ class 按鈕操作:
                         logger.info("✓ 成功點擊編輯按鈕")
                         
                         # 等待頁面加載
-                        time.sleep(3)
+                        等待元素出現(self.driver, 編輯模式選擇器, 超時時間=3)
                         return True
             
             # 方法3: 使用JavaScript查找和點擊編輯按鈕
@@ -108,7 +113,7 @@ class 按鈕操作:
             
             if js_result:
                 logger.info("✓ JavaScript成功找到並點擊了編輯按鈕")
-                time.sleep(3)
+                等待元素出現(self.driver, 編輯模式選擇器, 超時時間=3)
                 return True
             
             logger.warning("✗ 未找到編輯按鈕")
@@ -175,11 +180,12 @@ class 按鈕操作:
             
             # 尚未進入編輯模式，嘗試點擊編輯按鈕
             logger.info("嘗試進入編輯模式...")
-            success = self.點擊編輯按鈕()
+            success = 重試策略(最大次數=2, 彈窗恢復=彈窗處理(self.driver).處理彈窗).執行(
+                self.點擊編輯按鈕, "點擊編輯按鈕")
             
             if success:
                 # 等待頁面加載
-                time.sleep(3)
+                等待元素出現(self.driver, 編輯模式選擇器, 超時時間=3)
                 
                 # 再次檢查是否成功進入編輯模式
                 if self.檢查是否編輯模式():
@@ -221,7 +227,7 @@ class 按鈕操作:
             
             if js_result:
                 logger.info("✓ JavaScript嘗試進入編輯模式")
-                time.sleep(3)
+                等待元素出現(self.driver, 編輯模式選擇器, 超時時間=3)
                 
                 if self.檢查是否編輯模式():
                     logger.info("✓ 成功進入編輯模式")
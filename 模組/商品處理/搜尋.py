@@ -3,7 +3,12 @@
 
 包含與商品搜索相關的功能：
 - 搜尋商品
-- 搜尋特定前綴商品
+- 欄位模式搜尋商品 (單次往返，只讀取目標欄位)
+- 增量搜尋商品 (頁內快取，只重新抽取有變動的商品卡片)
+- 逐批搜尋商品 (依卡片索引範圍分批抽取，邊讀取邊產出)
+- 搜尋時在商品卡片/規格行標記 data-product-key / data-spec-key 供後續直接定位
+- 前往指定頁 (透過分頁器直接跳頁)
+- 搜尋特定前綴商品 / 搜尋包含文字商品 (以名稱索引回答，一次抽取可重複查詢)
 """
 
 import time
@@ -15,9 +20,162 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
 
+from .定位索引 import 取得定位索引, 商品卡片選擇器, 規格行選擇器
+from .名稱索引 import 商品名稱索引
+from ..瀏覽器處理 import 等待元素出現, 等待頁面條件, 等待網路閒置
+from ..執行設定 import 執行設定JS, 捲動到元素JS, 等待
+from ..重試策略 import 重試策略
+from ..彈窗處理 import 彈窗處理
+
 # 設置日誌
 logger = logging.getLogger(__name__)
 
+# 編輯模式的選擇器 (商品卡片與規格行的選擇器定義在定位索引)
+編輯模式選擇器 = 'div.discount-edit-item, div.discount-edit-item-model-component'
+
+# 欄位抽取函數：只讀取名稱、庫存、價格輸入框/折扣價文字與開關class，
+# 以欄位陣列回傳，避免對每個規格做 querySelectorAll('*') 和 offsetParent 版面檢查；
+# 同時標記 data-product-key="卡片索引" 與 data-spec-key="卡片索引-規格序號"
+欄位抽取函數JS = """
+function 抽取欄位(cards, 起始索引, 索引列表) {
+    const cols = {
+        names: [], offsets: [], cardIndices: [],
+        specNames: [], stocks: [], prices: [], priceSources: [], switches: []
+    };
+    for (let i = 0; i < cards.length; i++) {
+        const card = cards[i];
+        const nameEl = card.querySelector('div.ellipsis-content.single');
+        if (!nameEl) continue;
+        cols.names.push(nameEl.textContent.trim());
+        cols.offsets.push(cols.specNames.length);
+        const cardIndex = 索引列表 ? 索引列表[i] : 起始索引 + i;
+        cols.cardIndices.push(cardIndex);
+        card.setAttribute('data-product-key', String(cardIndex));
+        const specStart = cols.specNames.length;
+
+        const rows = card.querySelectorAll('%s');
+        for (const row of rows) {
+            const specNameEl = row.querySelector('div.ellipsis-content.single');
+            if (!specNameEl) continue;
+            row.setAttribute('data-spec-key', cardIndex + '-' + (cols.specNames.length - specStart));
+            cols.specNames.push(specNameEl.textContent.trim());
+
+            const stockEl = row.querySelector('div.item-content.item-stock');
+            cols.stocks.push(stockEl ? stockEl.textContent.trim() : '0');
+
+            // 價格: 編輯模式優先取NT$前綴輸入框，其次第一個輸入框；檢視模式取折扣價文字
+            let price = '';
+            let source = 0;
+            const prefixes = row.querySelectorAll('.eds-input__prefix');
+            for (const prefix of prefixes) {
+                if (prefix.textContent.includes('NT$')) {
+                    const input = prefix.parentElement.querySelector('input.eds-input__input');
+                    if (input) { price = input.value; source = 1; break; }
+                }
+            }
+            if (!source) {
+                const input = row.querySelector('input.eds-input__input');
+                if (input) {
+                    price = input.value; source = 1;
+                } else {
+                    const priceEl = row.querySelector('div.item-discounted-price');
+                    if (priceEl) { price = priceEl.textContent.trim(); source = 2; }
+                }
+            }
+            cols.prices.push(price);
+            cols.priceSources.push(source);
+
+            // 開關狀態位元: 1=開啟, 2=禁用
+            const switchEl = row.querySelector('div.eds-switch');
+            let state = 0;
+            if (switchEl) {
+                if (switchEl.classList.contains('eds-switch--open')) state |= 1;
+                if (switchEl.classList.contains('eds-switch--disabled')) state |= 2;
+            }
+            cols.switches.push(state);
+        }
+    }
+    return cols;
+}
+""" % 規格行選擇器
+
+
+def 逐卡展開欄位(欄位):
+    """逐張商品卡片展開欄位陣列
+
+    Args:
+        欄位 (dict): 欄位抽取函數回傳的欄位陣列
+
+    Yields:
+        tuple: (卡片索引, 商品字典)；沒有規格的卡片商品字典為 None。
+               商品與規格的 key 對應頁面上的 data-product-key / data-spec-key
+    """
+    if not 欄位:
+        return
+
+    商品名稱列 = 欄位.get("names", [])
+    規格名稱列 = 欄位.get("specNames", [])
+    邊界 = list(欄位.get("offsets", [])) + [len(規格名稱列)]
+    卡片索引列 = 欄位.get("cardIndices") or list(range(len(商品名稱列)))
+    庫存列 = 欄位.get("stocks", [])
+    價格列 = 欄位.get("prices", [])
+    來源列 = 欄位.get("priceSources", [])
+    開關列 = 欄位.get("switches", [])
+
+    for i, 商品名稱 in enumerate(商品名稱列):
+        specs = []
+        for j in range(邊界[i], 邊界[i + 1]):
+            原始價格 = 價格列[j] or ''
+            price = '0'
+            priceType = '未知'
+            if 來源列[j] == 1 and 原始價格:
+                price = 原始價格
+                priceType = 'NT$特價輸入框'
+            elif 來源列[j] == 2:
+                ntMatch = re.search(r'NT\$\s*([\d,]+)', 原始價格)
+                if ntMatch:
+                    price = ntMatch.group(1).replace(',', '')
+                    priceType = '單一價格文本'
+
+            specs.append({
+                "name": 規格名稱列[j],
+                "stock": 庫存列[j],
+                "price": price,
+                "priceType": priceType,
+                "priceDisplay": f"NT${price}" if priceType != '未知' else '未知價格',
+                "originalPrice": '',
+                "discountRate": '',
+                "status": '開啟' if 開關列[j] & 1 else '關閉',
+                "disabled": bool(開關列[j] & 2),
+                "key": f"{卡片索引列[i]}-{j - 邊界[i]}"
+            })
+
+        # 與原始腳本一致：沒有規格的商品不列入結果
+        商品 = {"name": 商品名稱, "specs": specs, "key": str(卡片索引列[i])} if specs else None
+        yield 卡片索引列[i], 商品
+
+
+def 整理搜尋結果(products):
+    """將商品列表包裝成 搜尋商品 的回傳格式"""
+    return {
+        "product_count": len(products),
+        "spec_count": sum(len(product.get('specs', [])) for product in products),
+        "products": products
+    }
+
+
+def 展開欄位結果(欄位):
+    """將欄位陣列展開為與 搜尋商品 相同的商品/規格字典結構
+
+    Args:
+        欄位 (dict): 欄位抽取函數回傳的欄位陣列
+
+    Returns:
+        dict: {"product_count": int, "spec_count": int, "products": list}
+    """
+    return 整理搜尋結果([product for _, product in 逐卡展開欄位(欄位) if product])
+
+
 class 商品搜尋:
     """處理商品搜尋相關功能的類"""
     
@@ -28,13 +186,26 @@ class 商品搜尋:
             driver: Selenium WebDriver實例
         """
         self.driver = driver
+        # 增量搜尋使用的頁內快取 (與開關控制、價格調整共用)，第一次呼叫 增量搜尋商品 時取得
+        self.頁面快取 = None
+        # 最近一次欄位模式抽取建立的名稱索引，換頁時清除
+        self.名稱索引 = None
     
-    def 搜尋商品(self):
+    def 搜尋商品(self, 欄位模式=False, 增量=False):
         """搜尋頁面上的商品和規格
 
+        Args:
+            欄位模式 (bool): 為True時改用單次往返的欄位抽取腳本
+            增量 (bool): 為True時改用頁內快取，批次中重複搜尋只重新抽取有變動的卡片
+
         Returns:
             dict: 包含商品列表的字典，格式為 {"product_count": int, "spec_count": int, "products": list}
         """
+        if 增量:
+            return self.增量搜尋商品()
+        if 欄位模式:
+            return self.欄位搜尋商品()
+        
         logger.info("開始尋找頁面上的商品...")
         
         # 檢查當前URL
@@ -58,7 +229,7 @@ class 商品搜尋:
         // 初始化結果陣列
         const products = [];
         
-        for (const card of productCards) {
+        for (const [cardIndex, card] of productCards.entries()) {
             try {
                 // 獲取商品名稱
                 const nameElem = card.querySelector('div.ellipsis-content.single');
@@ -66,6 +237,7 @@ class 商品搜尋:
                 
                 const productName = nameElem.textContent.trim();
                 console.log('找到商品:', productName);
+                card.setAttribute('data-product-key', String(cardIndex));
                 
                 // 獲取該商品的所有規格
                 const specElements = card.querySelectorAll('div.discount-view-item-model-component, div.discount-edit-item-model-component');
@@ -311,7 +483,9 @@ class 商品搜尋:
                         // 檢查是否禁用
                         const disabled = switchElem && switchElem.classList.contains('eds-switch--disabled');
                         
-                        // 添加規格信息
+                        // 標記規格行並添加規格信息
+                        const specKey = cardIndex + '-' + specs.length;
+                        specElem.setAttribute('data-spec-key', specKey);
                         specs.push({
                             name: specName,
                             stock: stock,
@@ -321,7 +495,8 @@ class 商品搜尋:
                             originalPrice: originalPrice,
                             discountRate: discountRate,
                             status: status,
-                            disabled: disabled
+                            disabled: disabled,
+                            key: specKey
                         });
                     } catch (specError) {
                         console.error('處理規格時出錯:', specError);
@@ -332,7 +507,8 @@ class 商品搜尋:
                 if (specs.length > 0) {
                     products.push({
                         name: productName,
-                        specs: specs
+                        specs: specs,
+                        key: String(cardIndex)
                     });
                 }
             } catch (cardError) {
@@ -373,6 +549,8 @@ class 商品搜尋:
             # 建立一個空商品列表
             products = []
             
+        取得定位索引(self.driver).更新(products)
+        
         # 統計並返回結果字典 (而非直接返回商品列表)
         total_specs = sum(len(product.get('specs', [])) for product in products)
         logger.info(f"找到 {len(products)} 個商品和 {total_specs} 個規格")
@@ -383,9 +561,225 @@ class 商品搜尋:
             "products": products
         }
     
-    def 搜尋特定前綴商品(self, prefix="Fee"):
+    def 欄位搜尋商品(self):
+        """以欄位模式搜尋頁面上的商品和規格
+
+        只讀取名稱、庫存、價格輸入框與開關class，在一次 execute_script 中
+        以欄位陣列回傳，再於Python端展開成與 搜尋商品 相同的結構。
+
+        Returns:
+            dict: {"product_count": int, "spec_count": int, "products": list}
+        """
+        logger.info("開始以欄位模式尋找頁面上的商品...")
+        
+        try:
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 商品卡片選擇器))
+            )
+        except TimeoutException:
+            logger.warning("等待商品元素超時，嘗試繼續執行...")
+        
+        try:
+            欄位 = self.driver.execute_script(
+                欄位抽取函數JS + "return 抽取欄位(document.querySelectorAll(arguments[0]), 0);",
+                商品卡片選擇器
+            )
+        except Exception as e:
+            logger.error(f"欄位模式抽取商品時發生錯誤: {str(e)}")
+            欄位 = None
+        
+        結果 = 展開欄位結果(欄位)
+        取得定位索引(self.driver).更新(結果["products"])
+        self.名稱索引 = 商品名稱索引(結果["products"])
+        logger.info(f"找到 {結果['product_count']} 個商品和 {結果['spec_count']} 個規格")
+        return 結果
+    
+    def 逐批搜尋商品(self, 每批數量=20):
+        """依商品卡片索引範圍分批抽取，每批抽取完成就立即產出
+        
+        大型活動不必等整頁結果一次傳回，呼叫端可以先處理前面的商品。
+        
+        Args:
+            每批數量 (int): 每次抽取的商品卡片數
+            
+        Yields:
+            list: 該批的商品列表 (格式與 搜尋商品 的 products 相同)
+        """
+        try:
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 商品卡片選擇器))
+            )
+        except TimeoutException:
+            logger.warning("等待商品元素超時，嘗試繼續執行...")
+        
+        try:
+            卡片總數 = self.driver.execute_script(
+                "return document.querySelectorAll(arguments[0]).length;", 商品卡片選擇器)
+        except Exception as e:
+            logger.error(f"取得商品卡片數量時發生錯誤: {str(e)}")
+            return
+        
+        logger.info(f"頁面共有 {卡片總數} 張商品卡片，每批抽取 {每批數量} 張")
+        定位 = 取得定位索引(self.driver)
+        定位.清除()
+        
+        for 起點 in range(0, 卡片總數, 每批數量):
+            try:
+                欄位 = self.driver.execute_script(欄位抽取函數JS + """
+                    const cards = Array.prototype.slice.call(
+                        document.querySelectorAll(arguments[0]), arguments[1], arguments[2]);
+                    return 抽取欄位(cards, arguments[1]);
+                """, 商品卡片選擇器, 起點, 起點 + 每批數量)
+            except Exception as e:
+                logger.error(f"抽取第 {起點 + 1}-{起點 + 每批數量} 張商品卡片時發生錯誤: {str(e)}")
+                continue
+            
+            products = [product for _, product in 逐卡展開欄位(欄位) if product]
+            定位.更新(products, 完整=False)
+            logger.info(f"已抽取第 {起點 + 1}-{min(起點 + 每批數量, 卡片總數)} 張商品卡片，"
+                        f"{len(products)} 個商品")
+            yield products
+    
+    def 增量搜尋商品(self):
+        """以頁內快取搜尋頁面上的商品和規格
+
+        第一次呼叫時完整抽取並安裝 MutationObserver，之後只重新抽取
+        價格、開關或文字有變動的商品卡片；換頁或重新載入時自動完整同步。
+        快取為同一 driver 共用，啟用後開關控制與價格調整也會先增量同步再定位規格行。
+
+        Returns:
+            dict: {"product_count": int, "spec_count": int, "products": list}
+        """
+        from .頁面快取 import 取得頁面快取
+
+        if self.頁面快取 is None:
+            self.頁面快取 = 取得頁面快取(self.driver)
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 商品卡片選擇器))
+                )
+            except TimeoutException:
+                logger.warning("等待商品元素超時，嘗試繼續執行...")
+        
+        結果 = self.頁面快取.搜尋商品()
+        logger.info(f"找到 {結果['product_count']} 個商品和 {結果['spec_count']} 個規格")
+        return 結果
+    
+    def 比較搜尋效能(self):
+        """分別執行原始腳本與欄位模式腳本並比較耗時
+
+        Returns:
+            dict: 兩種模式的耗時(秒)、加速倍數及結果數量是否一致
+        """
+        開始 = time.perf_counter()
+        原始結果 = self.搜尋商品()
+        原始耗時 = time.perf_counter() - 開始
+        
+        開始 = time.perf_counter()
+        欄位結果 = self.欄位搜尋商品()
+        欄位耗時 = time.perf_counter() - 開始
+        
+        加速倍數 = 原始耗時 / 欄位耗時 if 欄位耗時 > 0 else 0
+        logger.info(f"原始腳本耗時 {原始耗時:.3f} 秒，欄位模式耗時 {欄位耗時:.3f} 秒，加速 {加速倍數:.1f} 倍")
+        
+        數量一致 = (原始結果["product_count"] == 欄位結果["product_count"] and
+                  原始結果["spec_count"] == 欄位結果["spec_count"])
+        if not 數量一致:
+            logger.warning(f"兩種模式結果數量不一致: 原始 {原始結果['product_count']}/{原始結果['spec_count']}，"
+                           f"欄位 {欄位結果['product_count']}/{欄位結果['spec_count']}")
+        
+        return {
+            "原始耗時": 原始耗時,
+            "欄位耗時": 欄位耗時,
+            "加速倍數": 加速倍數,
+            "數量一致": 數量一致
+        }
+    
+    def 取得名稱索引(self, 重新抽取=False):
+        """取得目前頁面的商品名稱索引，沒有時以欄位模式抽取一次
+        
+        Args:
+            重新抽取 (bool): 為True時忽略已建立的索引重新抽取
+            
+        Returns:
+            商品名稱索引: 名稱索引
+        """
+        if self.名稱索引 is None or 重新抽取:
+            self.欄位搜尋商品()
+        return self.名稱索引
+    
+    def 搜尋特定前綴商品(self, prefix="Fee", 重新抽取=False):
         """搜尋特定前綴的商品
         
+        同一頁面的多次查詢共用一次抽取建立的名稱索引；
+        頁面上沒有折扣活動商品卡片時改用逐卡搜尋腳本。
+        
+        Args:
+            prefix (str): 商品名稱前綴
+            重新抽取 (bool): 是否重新抽取頁面再查詢
+            
+        Returns:
+            dict: 包含符合前綴的商品信息
+        """
+        索引 = self.取得名稱索引(重新抽取)
+        if not 索引:
+            return self._逐卡搜尋前綴商品(prefix)
+        
+        結果 = 整理搜尋結果(索引.前綴查詢(prefix))
+        logger.info(f"找到 {結果['product_count']} 個符合前綴 '{prefix}' 的商品")
+        return 結果
+    
+    def 搜尋包含文字商品(self, 關鍵字, 重新抽取=False):
+        """搜尋名稱包含指定文字的商品
+        
+        Args:
+            關鍵字 (str): 要搜尋的文字
+            重新抽取 (bool): 是否重新抽取頁面再查詢
+            
+        Returns:
+            dict: {"product_count": int, "spec_count": int, "products": list}
+        """
+        索引 = self.取得名稱索引(重新抽取)
+        結果 = 整理搜尋結果(索引.子字串查詢(關鍵字) if 索引 else [])
+        logger.info(f"找到 {結果['product_count']} 個名稱包含 '{關鍵字}' 的商品")
+        return 結果
+    
+    def 頁內搜尋前綴商品(self, prefix):
+        """在頁面內先過濾名稱，只把符合前綴的商品卡片傳回Python
+        
+        適合只查詢一次、且符合的商品遠少於全部商品的情況。
+        
+        Args:
+            prefix (str): 商品名稱前綴
+            
+        Returns:
+            dict: {"product_count": int, "spec_count": int, "products": list}
+        """
+        try:
+            欄位 = self.driver.execute_script(欄位抽取函數JS + """
+                const prefix = arguments[1];
+                const matched = [], indices = [];
+                document.querySelectorAll(arguments[0]).forEach((card, i) => {
+                    const nameEl = card.querySelector('div.ellipsis-content.single');
+                    if (nameEl && nameEl.textContent.trim().startsWith(prefix)) {
+                        matched.push(card);
+                        indices.push(i);
+                    }
+                });
+                return 抽取欄位(matched, 0, indices);
+            """, 商品卡片選擇器, prefix)
+        except Exception as e:
+            logger.error(f"頁內搜尋特定前綴商品時發生錯誤: {str(e)}")
+            欄位 = None
+        
+        結果 = 展開欄位結果(欄位)
+        取得定位索引(self.driver).更新(結果["products"], 完整=False)
+        logger.info(f"找到 {結果['product_count']} 個符合前綴 '{prefix}' 的商品")
+        return 結果
+    
+    def _逐卡搜尋前綴商品(self, prefix):
+        """以逐卡腳本搜尋特定前綴的商品 (用於非折扣活動卡片的頁面結構)
+        
         Args:
             prefix (str): 商品名稱前綴
             
@@ -657,8 +1051,8 @@ class 商品搜尋:
                         logger.info(f"找到「編輯活動」按鈕: {button.text}")
                         
                         # 滾動到按鈕可見
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                        time.sleep(0.5)
+                        self.driver.execute_script(捲動到元素JS(), button)
+                        等待(0.5)
                         
                         # 不再高亮顯示按鈕
                         logger.info("嘗試點擊「編輯活動」按鈕...")
@@ -675,7 +1069,7 @@ class 商品搜尋:
                             logger.warning(f"點擊按鈕時出錯: {str(click_err)}")
                         
                         logger.info("✓ 已嘗試點擊「編輯活動」按鈕")
-                        time.sleep(5)  # 延長等待時間，確保頁面加載
+                        等待元素出現(self.driver, 編輯模式選擇器, 超時時間=5)  # 等待編輯模式元素出現
                         return True
             
             # 方法2: 使用XPath查找包含「編輯」文字的按鈕
@@ -708,8 +1102,8 @@ class 商品搜尋:
                         logger.info(f"找到編輯按鈕: {button.text}")
                         
                         # 滾動到按鈕可見
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                        time.sleep(0.5)
+                        self.driver.execute_script(捲動到元素JS(), button)
+                        等待(0.5)
                         
                         # 點擊按鈕
                         try:
@@ -720,12 +1114,12 @@ class 商品搜尋:
                         logger.info("✓ 成功點擊編輯按鈕")
                         
                         # 等待頁面加載
-                        time.sleep(3)
+                        等待元素出現(self.driver, 編輯模式選擇器, 超時時間=3)  # 等待編輯模式元素出現
                         return True
             
             # 方法4: 直接使用JavaScript在頁面上定位和點擊「編輯活動」按鈕
             logger.info("嘗試使用JavaScript主動搜尋和點擊「編輯活動」按鈕...")
-            js_result = self.driver.execute_script("""
+            js_result = self.driver.execute_script(執行設定JS() + """
                 // 查找所有可能的按鈕
                 const textOptions = ['編輯活動', '編輯', '編輯折扣', 'Edit', '編集'];
                 const allElements = document.querySelectorAll('button, a, [role="button"], .btn, .button, [class*="edit"], [class*="btn"]');
@@ -742,7 +1136,7 @@ class 商品搜尋:
                             
                             try {
                                 // 嘗試各種方式激活按鈕
-                                elem.scrollIntoView({block: 'center', behavior: 'smooth'});
+                                elem.scrollIntoView({block: 'center', behavior: 執行設定.scrollBehavior});
                                 
                                 // 記錄按鈕信息，幫助診斷
                                 console.log({
@@ -776,7 +1170,7 @@ class 商品搜尋:
                                     if (elem.href) {
                                         window.location.href = elem.href;
                                     }
-                                }, 300);
+                                }, 300 * 執行設定.delayScale);
                                 
                                 return true;
                             } catch (e) {
@@ -795,7 +1189,7 @@ class 商品搜尋:
                         // 嘗試點擊
                         try {
                             btn.scrollIntoView({block: 'center'});
-                            setTimeout(() => btn.click(), 200);
+                            setTimeout(() => btn.click(), 200 * 執行設定.delayScale);
                             return true;
                         } catch (e) {
                             console.error('點擊具有特定類名的按鈕時出錯:', e);
@@ -809,7 +1203,7 @@ class 商品搜尋:
             
             if js_result:
                 logger.info("✓ JavaScript成功找到並點擊了編輯按鈕")
-                time.sleep(5)  # 等待較長時間
+                等待元素出現(self.driver, 編輯模式選擇器, 超時時間=5)  # 等待編輯模式元素出現
                 return True
             
             # 方法5: 可能是頁面有遮擋層或需要先點擊其他元素
@@ -837,8 +1231,8 @@ class 商品搜尋:
             """)
             
             if overlay_result:
-                logger.info("處理了可能的遮擋層，現在嘗試再次點擊編輯按鈕")
-                return self.點擊編輯按鈕()  # 遞迴調用，重新嘗試
+                # 由 進入編輯模式 的重試策略再次嘗試，不在這裡遞迴
+                logger.info("處理了可能的遮擋層，稍後重試點擊編輯按鈕")
             
             logger.warning("✗ 未找到編輯按鈕，所有嘗試方法均失敗")
             return False
@@ -857,11 +1251,12 @@ class 商品搜尋:
             
             # 尚未進入編輯模式，嘗試點擊編輯按鈕
             logger.info("嘗試進入編輯模式...")
-            success = self.點擊編輯按鈕()
+            success = 重試策略(最大次數=2, 彈窗恢復=彈窗處理(self.driver).處理彈窗).執行(
+                self.點擊編輯按鈕, "點擊編輯按鈕")
             
             if success:
                 # 等待頁面加載
-                time.sleep(3)
+                等待元素出現(self.driver, 編輯模式選擇器, 超時時間=3)  # 等待編輯模式元素出現
                 
                 # 再次檢查是否成功進入編輯模式
                 if self.檢查是否編輯模式():
@@ -903,7 +1298,7 @@ class 商品搜尋:
             
             if js_result:
                 logger.info("✓ JavaScript嘗試進入編輯模式")
-                time.sleep(3)
+                等待元素出現(self.driver, 編輯模式選擇器, 超時時間=3)  # 等待編輯模式元素出現
                 
                 if self.檢查是否編輯模式():
                     logger.info("✓ 成功進入編輯模式")
@@ -916,6 +1311,93 @@ class 商品搜尋:
             logger.error(f"進入編輯模式時發生錯誤: {str(e)}")
             return False
     
+    def _記錄首商品(self):
+        """記錄目前第一個商品卡片與名稱，供換頁後判斷新頁面是否已渲染"""
+        try:
+            return self.driver.execute_script("""
+                const card = document.querySelector(arguments[0]);
+                const nameEl = card ? card.querySelector('div.ellipsis-content.single') : null;
+                return [card, nameEl ? nameEl.textContent.trim() : ''];
+            """, 商品卡片選擇器)
+        except Exception as e:
+            logger.warning(f"記錄第一個商品時發生錯誤: {str(e)}")
+            return None
+    
+    def _等待商品替換(self, 舊首商品, 超時時間=5):
+        """等待舊商品被替換 (卡片移除或第一個商品名稱改變)，再等待資料請求結束"""
+        if 舊首商品 and 舊首商品[0] is not None:
+            已換頁 = 等待頁面條件(self.driver, """
+                if (!參數[0].isConnected) return true;
+                const card = document.querySelector(參數[2]);
+                const nameEl = card ? card.querySelector('div.ellipsis-content.single') : null;
+                return !!nameEl && nameEl.textContent.trim() !== 參數[1];
+            """, 舊首商品[0], 舊首商品[1], 商品卡片選擇器, 超時時間=超時時間)
+            if not 已換頁:
+                logger.warning("等待新頁面商品替換超時")
+        等待網路閒置(self.driver, 500, 超時時間=超時時間)
+    
+    def 前往指定頁(self, 頁碼):
+        """透過分頁器直接跳到指定頁
+        
+        優先點擊分頁器上的頁碼按鈕，其次使用跳頁輸入框，
+        兩者都不存在時才逐頁點擊下一頁。
+        
+        Args:
+            頁碼 (int): 目標頁碼 (從1開始)
+            
+        Returns:
+            bool: 是否成功到達指定頁
+        """
+        if 頁碼 <= 1:
+            return True
+        
+        logger.info(f"嘗試直接前往第 {頁碼} 頁...")
+        舊首商品 = self._記錄首商品()
+        
+        try:
+            方式 = self.driver.execute_script("""
+                const target = String(arguments[0]);
+                for (const page of document.querySelectorAll('.eds-pager__page')) {
+                    if (page.textContent.trim() === target && page.offsetParent !== null) {
+                        page.scrollIntoView({block: 'center'});
+                        page.click();
+                        return '頁碼按鈕';
+                    }
+                }
+                
+                const jumper = document.querySelector('.eds-pager__jumper input, .eds-pager__jumper-input input');
+                if (jumper) {
+                    const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+                    jumper.focus();
+                    setter.call(jumper, target);
+                    jumper.dispatchEvent(new Event('input', { bubbles: true }));
+                    jumper.dispatchEvent(new Event('change', { bubbles: true }));
+                    for (const type of ['keydown', 'keypress', 'keyup']) {
+                        jumper.dispatchEvent(new KeyboardEvent(type, {
+                            key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true
+                        }));
+                    }
+                    jumper.blur();
+                    return '跳頁輸入框';
+                }
+                return null;
+            """, 頁碼)
+        except Exception as e:
+            logger.error(f"前往第 {頁碼} 頁時發生錯誤: {str(e)}")
+            方式 = None
+        
+        if 方式:
+            logger.info(f"已使用{方式}前往第 {頁碼} 頁")
+            self.名稱索引 = None
+            self._等待商品替換(舊首商品)
+            return True
+        
+        logger.info("分頁器沒有可直接跳轉的元素，改為逐頁前往")
+        for _ in range(頁碼 - 1):
+            if not self.前往下一頁():
+                return False
+        return True
+    
     def 前往下一頁(self):
         """點擊下一頁按鈕，進入下一頁商品列表"""
         logger.info("嘗試前往下一頁...")
@@ -945,8 +1427,11 @@ class 商品搜尋:
             if next_button:
                 logger.info("找到下一頁按鈕")
                 
-                # 確保按鈕在視野內，滾動行為更像人類操作
-                self.driver.execute_script("""
+                # 記錄目前第一個商品，用來判斷新頁面是否已渲染
+                舊首商品 = self._記錄首商品()
+                
+                # 確保按鈕在視野內，滾動行為更像人類操作 (fast 設定檔立即捲動)
+                self.driver.execute_script(執行設定JS() + """
                     // 緩慢滾動到按鈕位置
                     let button = arguments[0];
                     let scrollTop = window.pageYOffset || document.documentElement.scrollTop;
@@ -955,12 +1440,15 @@ class 商品搜尋:
                     // 使用平滑滾動效果
                     window.scrollTo({
                         top: targetPosition,
-                        behavior: 'smooth'
+                        behavior: 執行設定.scrollBehavior
                     });
                 """, next_button)
                 
-                # 等待滾動完成
-                time.sleep(1.5)
+                # 等待平滑滾動把按鈕帶進視野
+                等待頁面條件(self.driver, """
+                    const rect = 參數[0].getBoundingClientRect();
+                    return rect.top >= 0 && rect.bottom <= window.innerHeight;
+                """, next_button, 超時時間=1.5)
                 
                 # 模擬滑鼠移動到按鈕上
                 self.driver.execute_script("""
@@ -975,7 +1463,7 @@ class 商品搜尋:
                 """, next_button)
                 
                 # 等待滑鼠事件生效
-                time.sleep(0.5)
+                等待(0.5, 最短=0.1)
                 
                 # 使用原生的WebDriver點擊
                 try:
@@ -1008,8 +1496,9 @@ class 商品搜尋:
                     """, next_button)
                     logger.info("已使用JavaScript模擬點擊下一頁按鈕")
                 
-                # 等待頁面加載，時間更長以確保加載完成
-                time.sleep(5)
+                # 等待舊商品被替換，再等待資料請求結束
+                self.名稱索引 = None
+                self._等待商品替換(舊首商品)
                 
                 # 確認是否成功翻頁
                 current_url = self.driver.current_url
@@ -1038,11 +1527,12 @@ class 商品搜尋:
             logger.error(f"前往下一頁時發生錯誤: {str(e)}")
             return False
     
-    def 批量處理多頁商品(self, 頁數):
+    def 批量處理多頁商品(self, 頁數, 並行數=1):
         """批量處理多頁商品的規格
         
         Args:
             頁數 (int): 要處理的頁數
+            並行數 (int): 大於1時以多個分頁並行處理 (見 並行處理 模組)
             
         Returns:
             tuple: (是否成功, 已處理頁數, 處理結果摘要, 調整記錄列表)
@@ -1050,6 +1540,10 @@ class 商品搜尋:
         # 導入依賴模組
         from .批量處理 import 批量處理
         
+        if 並行數 > 1:
+            from .並行處理 import 並行多頁處理
+            return 並行多頁處理.從現有driver建立(self.driver, 並行數).批量處理多頁商品(頁數)
+        
         已處理頁數 = 0
         總處理規格數 = 0
         總開關成功數 = 0
@@ -1189,8 +1683,8 @@ class 商品搜尋:
                         logger.warning(f"⚠ 無法前往第 {當前頁 + 1} 頁，提前結束")
                         break
                     
-                    # 在新頁面等待加載
-                    time.sleep(5)
+                    # 前往下一頁 已等待新商品渲染，這裡只需等待剩餘的資料請求結束
+                    等待網路閒置(self.driver, 500, 超時時間=5)
                     
                     # 確保在編輯模式(頁面跳轉可能會退出編輯模式)
                     if not self.檢查是否編輯模式():
@@ -3,16 +3,177 @@
 
 包含與商品規格分析相關的功能：
 - 格式化商品資訊
-- 分析規格類型
-- 查找同類規格價格
+- 分析規格類型 (關鍵詞合併為單一正規表示式，結果依規格名稱快取)
+- 查找同類規格價格 (每個商品只正規化一次規格，之後每個規格常數時間查詢)
 """
 
 import logging
 import re
+from functools import lru_cache
 
 # 設置日誌
 logger = logging.getLogger(__name__)
 
+# 規格類型關鍵詞 (依優先順序: 尺寸 > 顏色 > 款式)
+尺寸關鍵詞 = ["XS", "S", "M", "L", "XL", "XXL", "XXXL", "F", "一般", "均碼",
+            "小號", "中號", "大號", "加大", "標準", "特大", "細碼", "大碼",
+            "碼", "寸", "號", "size", "SIZE", "Size"]
+
+顏色關鍵詞 = ["色", "白", "黑", "紅", "黃", "藍", "綠", "紫", "灰", "棕", "粉",
+            "橙", "橘", "米", "銀", "金", "咖啡", "膚", "卡其", "杏", "醬",
+            "color", "COLOR", "Color", "咖啡色", "紅色", "黃色", "綠色"]
+
+款式關鍵詞 = ["款", "版", "型", "樣", "圖", "花", "圖案", "印花", "刺繡", "字母",
+            "圓領", "V領", "短袖", "長袖", "無袖", "高領", "連帽", "背心", "裙",
+            "褲", "套裝", "外套", "襯衫", "T恤", "上衣", "吊帶", "洋裝", "禮服"]
+
+
+def _關鍵詞模式(關鍵詞列表):
+    return "|".join(re.escape(詞) for 詞 in dict.fromkeys(關鍵詞列表))
+
+
+# 所有類型合併成一個正規表示式：每個分支都從開頭以前瞻檢查整個名稱，
+# 分支順序即優先順序，包含數字 (例如 "120cm") 時視為尺寸
+規格類型模式 = re.compile(
+    r"^(?:(?=.*?(?:%s))(?P<尺寸>)|(?=.*?(?:%s))(?P<顏色>)|(?=.*?(?:%s))(?P<款式>)|(?=.*?\d)(?P<數字尺寸>))"
+    % (_關鍵詞模式(尺寸關鍵詞), _關鍵詞模式(顏色關鍵詞), _關鍵詞模式(款式關鍵詞)),
+    re.DOTALL)
+
+
+@lru_cache(maxsize=4096)
+def 分類規格名稱(名稱):
+    """依已去除空白的規格名稱判斷類型 (結果依名稱快取)
+
+    Args:
+        名稱 (str): 已 strip 的規格名稱
+
+    Returns:
+        str: 尺寸/顏色/款式/通用，空名稱為 None
+    """
+    if not 名稱:
+        return None
+    比對 = 規格類型模式.match(名稱)
+    if not 比對:
+        # 預設返回一個通用類型
+        return "通用"
+    return "尺寸" if 比對.lastgroup == "數字尺寸" else 比對.lastgroup
+
+
+默認價格 = 499
+
+
+def 解析規格價格(spec):
+    """把規格的價格欄位轉為整數折扣價 (折扣率值依原價換算)，無法解析時為 0"""
+    價格 = spec.get('price', '0')
+    try:
+        if spec.get('priceType', '') == '折扣率值' and float(價格) < 10:
+            原價 = spec.get('originalPrice', '')
+            # 如果無法計算，記錄為0
+            return round(float(原價) * float(價格) / 10) if 原價 else 0
+        # 提取數字部分
+        return int(''.join(filter(str.isdigit, str(價格))))
+    except (ValueError, TypeError):
+        return 0
+
+
+class 商品價格解析器:
+    """一次正規化商品的所有規格，之後每個規格的建議價格都是常數時間查詢
+    
+    與逐一掃描的規則相同：
+    1. 同類規格 (排除目標規格自身) 中第一個開啟且有價格的規格
+    2. 其他有效規格價格都相同時使用統一價格
+    3. 第一個有效規格的價格
+    4. 目標規格本身有價格時保持原價
+    5. 默認價格
+    """
+    
+    def __init__(self, 商品):
+        """正規化商品規格
+        
+        Args:
+            商品 (dict): 商品信息 (含 specs)
+        """
+        self.當前價格 = {}        # 規格名稱 -> 第一個同名規格的價格
+        self.類型 = {}            # 規格名稱 -> 規格類型
+        self.有效規格 = []        # 開啟且價格大於0的 (名稱, 類型, 價格)，保持頁面順序
+        self.同類有效規格 = {}    # 類型 -> 該類型的有效規格 (最多保留兩個不同名稱)
+        self.價格計數 = {}        # 有效規格價格 -> 出現次數
+        self.名稱價格計數 = {}    # 規格名稱 -> {價格: 次數}
+        
+        for spec in 商品.get('specs', []):
+            名稱 = spec.get('name', '')
+            價格 = 解析規格價格(spec)
+            self.當前價格.setdefault(名稱, 價格)
+            if 名稱 not in self.類型:
+                self.類型[名稱] = 分類規格名稱(名稱.strip())
+            if 價格 > 0 and spec.get('status', '') == '開啟':
+                項目 = (名稱, self.類型[名稱], 價格)
+                self.有效規格.append(項目)
+                候選 = self.同類有效規格.setdefault(項目[1], [])
+                if len(候選) < 2 and all(n != 名稱 for n, _, _ in 候選):
+                    候選.append(項目)
+                self.價格計數[價格] = self.價格計數.get(價格, 0) + 1
+                名稱計數 = self.名稱價格計數.setdefault(名稱, {})
+                名稱計數[價格] = 名稱計數.get(價格, 0) + 1
+        
+        # 第一個與第二個不同名稱的有效規格 (排除目標後仍能常數時間取得第一個)
+        self.前兩個有效規格 = []
+        for 項目 in self.有效規格:
+            if all(n != 項目[0] for n, _, _ in self.前兩個有效規格):
+                self.前兩個有效規格.append(項目)
+                if len(self.前兩個有效規格) == 2:
+                    break
+    
+    @staticmethod
+    def _排除後第一個(候選, 目標規格名稱):
+        for 項目 in 候選:
+            if 項目[0] != 目標規格名稱:
+                return 項目
+        return None
+    
+    def _統一價格(self, 目標規格名稱):
+        """排除目標規格後，其餘有效規格的價格是否都相同 (相同時返回該價格)"""
+        目標計數 = self.名稱價格計數.get(目標規格名稱, {})
+        # 目標沒有的價格一定保留下來，超過一個時不可能統一
+        if len(self.價格計數) - len(目標計數) > 1:
+            return None
+        剩餘價格 = [價格 for 價格, 次數 in self.價格計數.items() if 次數 > 目標計數.get(價格, 0)]
+        return 剩餘價格[0] if len(剩餘價格) == 1 else None
+    
+    def 建議(self, 目標規格名稱):
+        """查詢規格的建議價格
+        
+        Args:
+            目標規格名稱 (str): 目標規格名稱
+            
+        Returns:
+            tuple: (建議價格, 參考規格名稱, 是否需要調整)
+        """
+        當前價格 = self.當前價格.get(目標規格名稱)
+        目標類型 = self.類型.get(目標規格名稱) or 分類規格名稱(目標規格名稱.strip())
+        
+        最匹配 = self._排除後第一個(self.同類有效規格.get(目標類型, []), 目標規格名稱)
+        if 最匹配:
+            建議價格, 參考規格名稱 = 最匹配[2], 最匹配[0]
+        else:
+            統一價格 = self._統一價格(目標規格名稱)
+            第一個有效 = self._排除後第一個(self.前兩個有效規格, 目標規格名稱)
+            if 統一價格 is not None:
+                建議價格, 參考規格名稱 = 統一價格, "所有規格統一價格"
+            elif 第一個有效:
+                建議價格, 參考規格名稱 = 第一個有效[2], 第一個有效[0]
+            elif 當前價格 and 當前價格 > 0:
+                logger.info(f"'{目標規格名稱}' 沒有參考規格，保持原價: {當前價格}")
+                return 當前價格, "保持原價", False
+            else:
+                建議價格, 參考規格名稱 = 默認價格, "默認價格"
+        
+        需要調整 = 當前價格 != 建議價格
+        logger.info(f"'{目標規格名稱}' 參考 '{參考規格名稱}' 建議價格: {建議價格}"
+                    + (f"，需要調整 (當前 {當前價格})" if 需要調整 else "，價格已經一致"))
+        return 建議價格, 參考規格名稱, 需要調整
+
+
 class 規格分析:
     """處理商品規格分析相關功能的類"""
     
@@ -23,6 +184,7 @@ class 規格分析:
             driver: Selenium WebDriver實例
         """
         self.driver = driver
+        self._解析器快取 = None  # (商品, 規格列表, 商品價格解析器)
     
     def 格式化商品資訊(self, products):
         """格式化商品和規格信息，用於顯示在UI上
@@ -117,47 +279,39 @@ class 規格分析:
             str: 規格類型（顏色、尺寸、款式等）
         """
         # 去除可能的空格和特殊字符
-        spec_name = spec_name.strip()
-        if not spec_name:
-            return None
-            
-        # 尺寸相關關鍵詞
-        尺寸關鍵詞 = ["XS", "S", "M", "L", "XL", "XXL", "XXXL", "F", "一般", "均碼",
-                    "小號", "中號", "大號", "加大", "標準", "特大", "細碼", "大碼",
-                    "碼", "寸", "號", "size", "SIZE", "Size"]
+        return 分類規格名稱(spec_name.strip())
+    
+    def 批量分析規格類型(self, 規格列表):
+        """一次分析整個商品的規格類型
         
-        # 顏色相關關鍵詞
-        顏色關鍵詞 = ["色", "白", "黑", "紅", "黃", "藍", "綠", "紫", "灰", "棕", "粉", 
-                    "橙", "橘", "米", "銀", "金", "咖啡", "膚", "卡其", "杏", "醬",
-                    "color", "COLOR", "Color", "咖啡色", "紅色", "黃色", "綠色"]
+        Args:
+            規格列表 (list): 規格字典 (含 name) 或規格名稱
+            
+        Returns:
+            dict: {規格名稱: 規格類型}
+        """
+        類型表 = {}
+        for 規格 in 規格列表:
+            名稱 = 規格.get('name', '') if isinstance(規格, dict) else 規格
+            if 名稱 not in 類型表:
+                類型表[名稱] = 分類規格名稱(名稱.strip())
+        return 類型表
+    
+    def 建立價格解析器(self, 商品):
+        """為商品建立價格解析器 (同一個商品要查詢多個規格時使用)
         
-        # 款式相關關鍵詞
-        款式關鍵詞 = ["款", "版", "型", "樣", "圖", "花", "圖案", "印花", "刺繡", "字母",
-                    "圓領", "V領", "短袖", "長袖", "無袖", "高領", "連帽", "背心", "裙", 
-                    "褲", "套裝", "外套", "襯衫", "T恤", "上衣", "吊帶", "洋裝", "禮服"]
-                    
-        # 檢查是否包含尺寸關鍵詞
-        for keyword in 尺寸關鍵詞:
-            if keyword in spec_name:
-                return "尺寸"
-                
-        # 檢查是否包含顏色關鍵詞
-        for keyword in 顏色關鍵詞:
-            if keyword in spec_name:
-                return "顏色"
-                
-        # 檢查是否包含款式關鍵詞
-        for keyword in 款式關鍵詞:
-            if keyword in spec_name:
-                return "款式"
+        解析器會保留給之後的 查找同類規格價格 使用，直到查詢另一個商品；
+        商品資料在查詢期間不應被原地修改。
         
-        # 如果無法確定類型，嘗試根據規格名稱中的數字或字母特徵判斷
-        # 如果包含數字和單位，可能是尺寸
-        if re.search(r'\d+(\.\d+)?(cm|mm|吋|寸|英寸)?', spec_name):
-            return "尺寸"
+        Args:
+            商品 (dict): 商品信息
             
-        # 預設返回一個通用類型
-        return "通用"
+        Returns:
+            商品價格解析器: 已正規化的解析器
+        """
+        if self._解析器快取 is None or self._解析器快取[0] is not 商品 or self._解析器快取[1] is not 商品.get('specs'):
+            self._解析器快取 = (商品, 商品.get('specs'), 商品價格解析器(商品))
+        return self._解析器快取[2]
     
     def 查找同類規格價格(self, 商品, 目標規格名稱):
         """智能查找相同商品下類似規格的價格
@@ -174,175 +328,8 @@ class 規格分析:
         Returns:
             tuple: (建議價格, 參考規格名稱, 是否需要調整)
         """
-        目標規格類型 = self.分析規格類型(目標規格名稱)
-        logger.info(f"目標規格 '{目標規格名稱}' 的類型識別為: '{目標規格類型}'")
-        
-        所有規格 = 商品.get('specs', [])
-        同類規格列表 = []
-        所有有效規格 = []  # 所有開啟且有價格的規格
-        
-        # 當前規格現有價格
-        當前價格 = None
-        當前規格對象 = None
-        for spec in 所有規格:
-            if spec.get('name', '') == 目標規格名稱:
-                當前規格對象 = spec
-                當前價格 = spec.get('price', '0')
-                當前價格類型 = spec.get('priceType', '')
-                
-                # 如果價格是折扣率，嘗試使用計算價格
-                if 當前價格類型 == '折扣率值' and float(當前價格) < 10:
-                    原價 = spec.get('originalPrice', '')
-                    if 原價:
-                        # 計算實際折扣價格
-                        當前價格 = round(float(原價) * float(當前價格) / 10)
-                    else:
-                        # 如果無法計算，記錄為0
-                        當前價格 = 0
-                else:
-                    # 提取數字部分
-                    try:
-                        當前價格 = int(''.join(filter(str.isdigit, str(當前價格))))
-                    except:
-                        當前價格 = 0
-                break
-        
-        # 收集所有有效規格並查找同類規格
-        for spec in 所有規格:
-            規格名稱 = spec.get('name', '')
-            if 規格名稱 != 目標規格名稱:  # 排除目標規格自身
-                規格類型 = self.分析規格類型(規格名稱)
-                規格價格 = spec.get('price', '0')
-                規格價格類型 = spec.get('priceType', '')
-                規格狀態 = spec.get('status', '') == '開啟'
-                
-                # 處理折扣率類型的價格
-                if 規格價格類型 == '折扣率值' and float(規格價格) < 10:
-                    原價 = spec.get('originalPrice', '')
-                    if 原價:
-                        # 計算實際折扣價格
-                        規格價格 = round(float(原價) * float(規格價格) / 10)
-                    else:
-                        # 如果無法計算，記錄為0
-                        規格價格 = 0
-                else:
-                    # 提取價格數字部分
-                    try:
-                        規格價格 = int(''.join(filter(str.isdigit, str(規格價格))))
-                    except:
-                        規格價格 = 0
-                
-                # 只考慮價格大於0且狀態為開啟的規格
-                if 規格價格 > 0 and 規格狀態:
-                    logger.info(f"有效規格: '{規格名稱}' (類型: '{規格類型}') 價格: {規格價格}")
-                    
-                    # 添加到所有有效規格
-                    所有有效規格.append({
-                        "名稱": 規格名稱,
-                        "類型": 規格類型,
-                        "價格": 規格價格
-                    })
-                    
-                    # 檢查是否為同類規格
-                    if 規格類型 == 目標規格類型:
-                        logger.info(f"找到同類規格: '{規格名稱}' 價格: {規格價格}")
-                        同類規格列表.append({
-                            "名稱": 規格名稱,
-                            "類型": 規格類型,
-                            "價格": 規格價格,
-                            "相似度": 100  # 完全相同的類型
-                        })
-                    elif 規格類型 in 目標規格類型 or 目標規格類型 in 規格類型:
-                        # 計算包含關係的相似度
-                        相似度 = min(len(規格類型), len(目標規格類型)) / max(len(規格類型), len(目標規格類型)) * 100
-                        logger.info(f"找到部分相似規格: '{規格名稱}' 相似度: {相似度:.1f}% 價格: {規格價格}")
-                        同類規格列表.append({
-                            "名稱": 規格名稱,
-                            "類型": 規格類型,
-                            "價格": 規格價格,
-                            "相似度": 相似度
-                        })
-        
-        # 按相似度排序同類規格
-        同類規格列表.sort(key=lambda x: x["相似度"], reverse=True)
-        
-        # 檢查所有有效規格的價格是否都相同
-        價格統一 = False
-        統一價格 = 0
-        if 所有有效規格:
-            價格列表 = [規格["價格"] for 規格 in 所有有效規格]
-            if len(set(價格列表)) == 1:  # 如果所有價格都相同
-                價格統一 = True
-                統一價格 = 價格列表[0]
-                logger.info(f"所有規格價格都是 {統一價格}")
-        
-        # 決定建議價格
-        建議價格 = 0
-        參考規格名稱 = ""
-        需要調整 = False
-        
-        # 首先查找最匹配的同類規格
-        if 同類規格列表:
-            最匹配規格 = 同類規格列表[0]
-            建議價格 = 最匹配規格["價格"]
-            參考規格名稱 = 最匹配規格["名稱"]
-            logger.info(f"基於最匹配規格 '{參考規格名稱}' 建議價格: {建議價格}")
-            
-            # 檢查是否需要調整
-            if 當前價格 != 建議價格:
-                需要調整 = True
-                logger.info(f"需要調整價格: 當前 {當前價格} -> 建議 {建議價格}")
-            else:
-                logger.info(f"價格已經一致，不需要調整")
-                
-        # 如果沒有同類規格但價格統一，使用統一價格
-        elif 價格統一:
-            建議價格 = 統一價格
-            參考規格名稱 = "所有規格統一價格"
-            logger.info(f"使用所有規格統一價格: {建議價格}")
-            
-            # 檢查是否需要調整
-            if 當前價格 != 建議價格:
-                需要調整 = True
-                logger.info(f"需要調整價格: 當前 {當前價格} -> 建議 {建議價格}")
-            else:
-                logger.info(f"價格已經一致，不需要調整")
-                
-        # 如果有其他有效規格，使用第一個有效規格的價格
-        elif 所有有效規格:
-            建議價格 = 所有有效規格[0]["價格"]
-            參考規格名稱 = 所有有效規格[0]["名稱"]
-            logger.info(f"使用第一個有效規格 '{參考規格名稱}' 的價格: {建議價格}")
-            
-            # 檢查是否需要調整
-            if 當前價格 != 建議價格:
-                需要調整 = True
-                logger.info(f"需要調整價格: 當前 {當前價格} -> 建議 {建議價格}")
-            else:
-                logger.info(f"價格已經一致，不需要調整")
-        
-        # 如果仍然沒有建議價格，但當前規格有價格，保持原價
-        elif 當前價格 and 當前價格 > 0:
-            建議價格 = 當前價格
-            參考規格名稱 = "保持原價"
-            logger.info(f"沒有參考規格，保持原價: {建議價格}")
-            需要調整 = False
-        
-        # 最終情況：使用默認價格
-        else:
-            建議價格 = 499  # 使用一個默認價格
-            參考規格名稱 = "默認價格"
-            logger.info(f"沒有參考規格，使用默認價格: {建議價格}")
-            
-            # 檢查是否需要調整
-            if 當前價格 != 建議價格:
-                需要調整 = True
-                logger.info(f"需要調整價格: 當前 {當前價格} -> 建議 {建議價格}")
-            else:
-                logger.info(f"價格已經一致，不需要調整")
-        
-        return 建議價格, 參考規格名稱, 需要調整 
-
+        return self.建立價格解析器(商品).建議(目標規格名稱)
+    
     def _計算建議操作(self, spec):
         """根據規格信息計算建議操作
         
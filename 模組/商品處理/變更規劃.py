@@ -0,0 +1,68 @@
+"""
+變更規劃模組
+
+比較頁面抽取的規格狀態與期望狀態 (開關開啟、價格為 規格分析.查找同類規格價格 的建議價格)，
+只產生真正需要的操作：
+- 開啟開關: 規格目前關閉且開關未被禁用
+- 設定價格: 目前價格與建議價格不同
+已開啟且價格一致的規格不產生任何操作，執行前即可得知各類操作的數量。
+"""
+
+import logging
+
+from .批量處理 import 格式化價格
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+
+def 規劃變更(商品資料列表, 規格分析器):
+    """產生最小變更集
+
+    Args:
+        商品資料列表 (list): 搜尋商品 回傳的商品列表
+        規格分析器 (規格分析): 用來計算每個規格的建議價格
+
+    Returns:
+        tuple: (動作列表, 統計)
+            動作列表: [{"product", "spec", "open": bool, "price": str 或 None, "reference": str}]，
+                      可直接交給 批量處理.執行變更計畫 / 執行頁內動作
+            統計: {"規格數", "開啟開關", "設定價格", "無需變更", "無法開啟"}
+    """
+    動作列表 = []
+    統計 = {"規格數": 0, "開啟開關": 0, "設定價格": 0, "無需變更": 0, "無法開啟": 0}
+
+    for product_idx, 商品 in enumerate(商品資料列表):
+        商品名稱 = 商品.get("name", f"未命名商品_{product_idx}")
+        解析器 = 規格分析器.建立價格解析器(商品)
+        for spec_idx, 規格 in enumerate(商品.get("specs", [])):
+            規格名稱 = 規格.get("name", f"未命名規格_{spec_idx}")
+            統計["規格數"] += 1
+
+            已開啟 = 規格.get("status", "") == "開啟"
+            if not 已開啟 and 規格.get("disabled"):
+                # 開關被禁用時無法開啟，也不填價格
+                統計["無法開啟"] += 1
+                continue
+
+            建議價格, 參考規格名稱, 需要調整 = 解析器.建議(規格名稱)
+            需要開啟 = not 已開啟
+            需要設價 = bool(需要調整) and 建議價格 > 0
+
+            if not 需要開啟 and not 需要設價:
+                統計["無需變更"] += 1
+                continue
+
+            統計["開啟開關"] += 需要開啟
+            統計["設定價格"] += 需要設價
+            動作列表.append({
+                "product": 商品名稱,
+                "spec": 規格名稱,
+                "open": 需要開啟,
+                "price": 格式化價格(建議價格) if 需要設價 else None,
+                "reference": 參考規格名稱
+            })
+
+    logger.info(f"變更規劃: 共 {統計['規格數']} 個規格，需開啟開關 {統計['開啟開關']} 個，"
+                f"需設定價格 {統計['設定價格']} 個，無需變更 {統計['無需變更']} 個，無法開啟 {統計['無法開啟']} 個")
+    return 動作列表, 統計
@@ -13,6 +13,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from .定位索引 import 依鍵查找規格行JS
+from .頁面快取 import 取得頁面快取
+from ..瀏覽器處理 import 等待class狀態
+from ..執行設定 import 執行設定JS
+
 # 設置日誌
 logger = logging.getLogger(__name__)
 
@@ -33,13 +38,14 @@ class 開關控制:
             logger.info(f"嘗試切換商品 '{商品名稱}' 規格 '{規格名稱}' 的開關...")
             
             # 使用JavaScript查找並操作開關，同時加強視覺效果
-            result = self.driver.execute_script("""
-                function findAndToggleSwitch(productName, specName) {
+            規格鍵 = 取得頁面快取(self.driver).規格鍵(商品名稱, 規格名稱)
+            result = self.driver.execute_script(執行設定JS() + 依鍵查找規格行JS + """
+                function findAndToggleSwitch(productName, specName, specKey) {
                     console.log('嘗試尋找開關，商品: ' + productName + ', 規格: ' + specName);
                     
                     // 高亮顯示操作中的商品和規格，方便用戶定位
                     function highlightElement(element, color, duration) {
-                        if (!element) return;
+                        if (!element || !執行設定.highlight) return;
                         
                         // 保存原始樣式
                         const originalBackground = element.style.backgroundColor;
@@ -64,9 +70,11 @@ class 開關控制:
                     }
                     
                     // 首先在編輯模式下尋找
-                    // 1. 尋找商品容器
-                    let productContainer = null;
-                    const productContainers = document.querySelectorAll('div.discount-item-component, div.discount-edit-item');
+                    // 1. 尋找商品容器 (有定位標記時直接取得規格行)
+                    const keyedRow = 依鍵查找規格行(productName, specName, specKey);
+                    let productContainer = keyedRow ? keyedRow.closest('[data-product-key]') : null;
+                    const productContainers = productContainer ? [] :
+                        document.querySelectorAll('div.discount-item-component, div.discount-edit-item');
                     
                     for (const container of productContainers) {
                         const nameEl = container.querySelector('div.ellipsis-content.single');
@@ -82,7 +90,8 @@ class 開關控制:
                     // 2. 如果找到商品容器，查找規格和對應的開關
                     if (productContainer) {
                         // 尋找規格元素
-                        const specElements = productContainer.querySelectorAll('div.discount-view-item-model-component, div.discount-edit-item-model-component');
+                        const specElements = keyedRow ? [keyedRow] :
+                            productContainer.querySelectorAll('div.discount-view-item-model-component, div.discount-edit-item-model-component');
                         
                         for (const specElement of specElements) {
                             const specNameEl = specElement.querySelector('div.ellipsis-content.single');
@@ -116,7 +125,7 @@ class 開關控制:
                                     console.log('找到需要點擊的開關元素，準備點擊');
                                     
                                     // 滾動到開關位置
-                                    switchEl.scrollIntoView({block: 'center', behavior: 'smooth'});
+                                    switchEl.scrollIntoView({block: 'center', behavior: 執行設定.scrollBehavior});
                                     
                                     // 高亮開關並添加動畫效果
                                     highlightElement(switchEl, 'rgba(255, 215, 0, 0.5)', 3000);
@@ -136,9 +145,9 @@ class 開關控制:
                                             console.error('點擊開關失敗: ' + e);
                                             highlightElement(switchEl, 'rgba(220, 20, 60, 0.3)', 2000);
                                         }
-                                    }, 500);
+                                    }, 500 * 執行設定.delayScale);
                                     
-                                    return { success: true, message: "已點擊開關" };
+                                    return { success: true, message: "已點擊開關", element: switchEl };
                                 }
                             }
                         }
@@ -225,7 +234,7 @@ class 開關控制:
                                 console.log('找到需要點擊的開關元素（通過規格名），準備點擊');
                                 
                                 // 滾動到開關位置
-                                foundSwitch.scrollIntoView({block: 'center', behavior: 'smooth'});
+                                foundSwitch.scrollIntoView({block: 'center', behavior: 執行設定.scrollBehavior});
                                 
                                 // 高亮開關並添加動畫效果
                                 highlightElement(foundSwitch, 'rgba(255, 215, 0, 0.5)', 3000);
@@ -245,9 +254,9 @@ class 開關控制:
                                         console.error('點擊開關失敗: ' + e);
                                         highlightElement(foundSwitch, 'rgba(220, 20, 60, 0.3)', 2000);
                                     }
-                                }, 500);
+                                }, 500 * 執行設定.delayScale);
                                 
-                                return { success: true, message: "已點擊開關" };
+                                return { success: true, message: "已點擊開關", element: foundSwitch };
                             }
                         }
                     }
@@ -255,11 +264,13 @@ class 開關控制:
                     return { success: false, message: "找不到對應的開關" };
                 }
                 
-                return findAndToggleSwitch(arguments[0], arguments[1]);
-            """, 商品名稱, 規格名稱)
+                return findAndToggleSwitch(arguments[0], arguments[1], arguments[2]);
+            """, 商品名稱, 規格名稱, 規格鍵)
             
-            # 等待JavaScript操作完成 (增加等待時間以便用戶看清視覺效果)
-            time.sleep(1.5)
+            # 開關在高亮後延遲點擊，等待開關實際切換為開啟狀態
+            if result and result.get("element") is not None:
+                if not 等待class狀態(self.driver, result["element"], 'eds-switch--open', True, 超時時間=3):
+                    logger.warning("等待開關切換為開啟狀態超時")
             
             if result and result.get("success", False):
                 logger.info(f"✓ {result.get('message', '開關操作成功')}")
@@ -336,18 +347,28 @@ class 開關控制:
         logger.info(f"嘗試開啟商品 '{商品名稱}' 的規格 '{規格名稱}'")
         
         # 使用增強的開關控制功能
+        # 切換商品規格開關 會等待開關狀態更新後才返回
         success = self.切換商品規格開關(商品名稱, 規格名稱)
         
-        # 等待一段時間讓UI更新
-        time.sleep(1.5)
-        
         # 嘗試驗證是否成功開啟 - 再次查詢該規格狀態
         try:
             # 使用JavaScript查找並獲取狀態
-            開關狀態 = self.driver.execute_script("""
-                function getSpecStatus(productName, specName) {
+            規格鍵 = 取得頁面快取(self.driver).規格鍵(商品名稱, 規格名稱)
+            開關狀態 = self.driver.execute_script(依鍵查找規格行JS + """
+                function getSpecStatus(productName, specName, specKey) {
                     console.log('檢查規格狀態，商品: ' + productName + ', 規格: ' + specName);
                     
+                    // 有定位標記時直接讀取開關狀態
+                    const keyedRow = 依鍵查找規格行(productName, specName, specKey);
+                    const keyedSwitch = keyedRow ? keyedRow.querySelector('div.eds-switch') : null;
+                    if (keyedSwitch) {
+                        return {
+                            found: true,
+                            isOpen: keyedSwitch.classList.contains('eds-switch--open'),
+                            isDisabled: keyedSwitch.classList.contains('eds-switch--disabled')
+                        };
+                    }
+                    
                     // 查找商品容器
                     const productContainers = document.querySelectorAll('div.discount-item-component, div.discount-edit-item');
                     for (const container of productContainers) {
@@ -401,8 +422,8 @@ class 開關控制:
                     return { found: false };
                 }
                 
-                return getSpecStatus(arguments[0], arguments[1]);
-            """, 商品名稱, 規格名稱)
+                return getSpecStatus(arguments[0], arguments[1], arguments[2]);
+            """, 商品名稱, 規格名稱, 規格鍵)
             
             if 開關狀態 and 開關狀態.get("found", False):
                 is_open = 開關狀態.get("isOpen", False)
@@ -417,9 +438,7 @@ class 開關控制:
                 else:
                     logger.warning(f"⚠ 規格 '{規格名稱}' 尚未開啟，嘗試重新開啟")
                     # 再次嘗試開啟
-                    second_attempt = self.切換商品規格開關(商品名稱, 規格名稱)
-                    time.sleep(1.5)  # 等待UI更新
-                    return second_attempt
+                    return self.切換商品規格開關(商品名稱, 規格名稱)
             else:
                 logger.warning(f"⚠ 無法確認規格 '{規格名稱}' 的狀態")
                 return success  # 返回之前的結果
@@ -0,0 +1,578 @@
+"""
+離線解析模組
+
+以純Python解析已儲存的賣家中心折扣活動頁面 (例如 html.txt、HTML2.txt)，
+不需要啟動Chrome即可重播商品/規格抽取邏輯：
+- 搜尋商品: 重播 商品搜尋.搜尋商品 預設腳本的多層價格判斷 (含原價、折扣率與價格類型)
+- 欄位搜尋商品: 重播 商品搜尋.欄位搜尋商品 的欄位抽取
+- extract_all_products: 以 ShopeePageAnalyzer.extract_all_products 的選擇器與格式抽取
+
+已儲存的頁面沒有版面資訊，offsetParent 的可見性檢查以 display: none 近似；
+輸入框的值取自 value 屬性 (傾印當下的值)。
+"""
+
+import re
+import math
+import logging
+from html.parser import HTMLParser
+
+from .搜尋 import 商品卡片選擇器, 規格行選擇器, 展開欄位結果, 整理搜尋結果
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# 沒有結束標籤的HTML元素
+_空元素 = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+          "link", "meta", "param", "source", "track", "wbr"}
+
+
+class 節點:
+    """輕量DOM節點，只保留抽取邏輯需要的資訊"""
+
+    __slots__ = ("tag", "attrs", "classes", "children", "parent", "texts")
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.classes = set((self.attrs.get("class") or "").split())
+        self.children = []
+        self.parent = parent
+        # 依序保存文字與子節點，以便重建 textContent
+        self.texts = []
+
+    def 文字內容(self):
+        """等同 DOM 的 textContent"""
+        片段 = []
+        self._收集文字(片段, 只取可見=False)
+        return "".join(片段)
+
+    def 可見文字(self):
+        """近似 DOM 的 innerText：略過 display: none 的子樹並合併空白"""
+        片段 = []
+        self._收集文字(片段, 只取可見=True)
+        return " ".join("".join(片段).split())
+
+    def _收集文字(self, 片段, 只取可見):
+        if 只取可見 and self._自身隱藏():
+            return
+        for 項目 in self.texts:
+            if isinstance(項目, str):
+                片段.append(項目)
+            else:
+                項目._收集文字(片段, 只取可見)
+
+    def _自身隱藏(self):
+        return "display: none" in (self.attrs.get("style") or "")
+
+    def 是否顯示(self):
+        """近似 DOM 的 offsetParent !== null：自身與祖先都沒有 display: none"""
+        當前 = self
+        while 當前 is not None:
+            if 當前._自身隱藏():
+                return False
+            當前 = 當前.parent
+        return True
+
+    def 後代(self):
+        """依文件順序產生所有後代節點 (等同 querySelectorAll('*'))"""
+        堆疊 = list(reversed(self.children))
+        while 堆疊:
+            當前 = 堆疊.pop()
+            yield 當前
+            堆疊.extend(reversed(當前.children))
+
+    def 前一個元素(self):
+        """等同 DOM 的 previousElementSibling"""
+        if self.parent is None:
+            return None
+        位置 = self.parent.children.index(self)
+        return self.parent.children[位置 - 1] if 位置 > 0 else None
+
+    def 符合(self, 選擇器):
+        """檢查節點是否符合以逗號分隔的簡單選擇器 (tag.class[attr])"""
+        return any(_符合單一選擇器(self, 單一) for 單一 in _拆分選擇器(選擇器))
+
+    def 查找全部(self, 選擇器):
+        """等同 querySelectorAll，依文件順序回傳所有符合的後代節點"""
+        選擇器列表 = _拆分選擇器(選擇器)
+        return [當前 for 當前 in self.後代()
+                if any(_符合單一選擇器(當前, 單一) for 單一 in 選擇器列表)]
+
+    def 查找(self, 選擇器):
+        """等同 querySelector，回傳第一個符合的後代節點"""
+        選擇器列表 = _拆分選擇器(選擇器)
+        for 當前 in self.後代():
+            if any(_符合單一選擇器(當前, 單一) for 單一 in 選擇器列表):
+                return 當前
+        return None
+
+    def 元素路徑(self):
+        """產生與 page_analyzer 的 getElementPath 相同格式的CSS路徑"""
+        路徑 = ""
+        當前 = self
+        while 當前 is not None and 當前.tag not in ("body", "#document"):
+            選擇器 = 當前.tag
+            if 當前.attrs.get("id"):
+                選擇器 += "#" + 當前.attrs["id"]
+                return 選擇器 + (" > " + 路徑 if 路徑 else "")
+            if 當前.attrs.get("class"):
+                選擇器 += "." + ".".join(c for c in 當前.attrs["class"].split() if c)
+            if 當前.parent is not None:
+                選擇器 += f":nth-child({當前.parent.children.index(當前) + 1})"
+            路徑 = 選擇器 + (" > " + 路徑 if 路徑 else "")
+            當前 = 當前.parent
+        return 路徑
+
+
+_選擇器快取 = {}
+
+
+def _拆分選擇器(選擇器):
+    """將 'div.a.b, .c, [data-x], [role="switch"]' 拆成 (tag, classes, attrs) 元組列表並快取"""
+    if 選擇器 not in _選擇器快取:
+        解析結果 = []
+        for 部分 in 選擇器.split(","):
+            部分 = 部分.strip()
+            屬性 = re.findall(r'\[([\w-]+)(?:="([^"]*)")?\]', 部分)
+            部分 = re.sub(r"\[[^\]]*\]", "", 部分)
+            片段 = 部分.split(".")
+            解析結果.append((片段[0] or None, set(c for c in 片段[1:] if c), 屬性))
+        _選擇器快取[選擇器] = 解析結果
+    return _選擇器快取[選擇器]
+
+
+def _符合單一選擇器(節點物件, 單一):
+    tag, classes, 屬性 = 單一
+    if tag and 節點物件.tag != tag:
+        return False
+    if classes and not classes <= 節點物件.classes:
+        return False
+    return all(名稱 in 節點物件.attrs and (not 值 or 節點物件.attrs[名稱] == 值)
+               for 名稱, 值 in 屬性)
+
+
+class _樹建構器(HTMLParser):
+    """以 html.parser 建立輕量DOM樹"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.根節點 = 節點("#document")
+        self.當前 = self.根節點
+
+    def handle_starttag(self, tag, attrs):
+        新節點 = 節點(tag, attrs, self.當前)
+        self.當前.children.append(新節點)
+        self.當前.texts.append(新節點)
+        if tag not in _空元素:
+            self.當前 = 新節點
+
+    def handle_startendtag(self, tag, attrs):
+        新節點 = 節點(tag, attrs, self.當前)
+        self.當前.children.append(新節點)
+        self.當前.texts.append(新節點)
+
+    def handle_endtag(self, tag):
+        # 容忍不成對的結束標籤：往上找到相同標籤才關閉
+        節點物件 = self.當前
+        while 節點物件 is not None and 節點物件.tag != tag:
+            節點物件 = 節點物件.parent
+        if 節點物件 is not None and 節點物件.parent is not None:
+            self.當前 = 節點物件.parent
+
+    def handle_data(self, data):
+        self.當前.texts.append(data)
+
+
+def 解析HTML(html):
+    """解析HTML字串並回傳根節點"""
+    建構器 = _樹建構器()
+    建構器.feed(html)
+    建構器.close()
+    return 建構器.根節點
+
+
+# 與頁內腳本相同的正規表示式 (JS 的 \d 只比對ASCII數字)
+_NT價格 = re.compile(r"NT\$\s*([0-9]+)")
+_NT價格全部 = re.compile(r"NT\$\s*[0-9]+")
+_折扣率 = re.compile(r"([0-9.]+)\s*折")
+_浮點數開頭 = re.compile(r"\s*([+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)")
+
+# ShopeePageAnalyzer 依序嘗試的商品容器選擇器 ('.product-list > div' 另外處理) 與規格選擇器
+分析器商品選擇器 = ["div.discount-edit-item", ".product-item", "[data-product-id]"]
+分析器規格選擇器 = ".discount-edit-item-model-component, .spec-item, .variant-item"
+
+
+def _parseFloat(文字):
+    """等同 JS 的 parseFloat，無法解析 (NaN) 時回傳 None"""
+    比對 = _浮點數開頭.match(文字 or "")
+    return float(比對.group(1)) if 比對 else None
+
+
+def _JS長度(文字):
+    """JS 字串長度 (以 UTF-16 編碼單位計算)"""
+    return len(文字.encode("utf-16-le")) // 2
+
+
+def _是價格輸入框(節點物件):
+    """等同 input.eds-input__input[data-v-7fcfdf7e], input[class*="discount"], input[class*="price"]"""
+    if 節點物件.tag != "input":
+        return False
+    類別 = 節點物件.attrs.get("class") or ""
+    return (("eds-input__input" in 節點物件.classes and "data-v-7fcfdf7e" in 節點物件.attrs)
+            or "discount" in 類別 or "price" in 類別)
+
+
+def 判斷規格價格(specElem):
+    """重播預設搜尋腳本對單一規格行的多層價格判斷
+
+    依序嘗試: 折扣/特價/優惠標記文本、NT$前綴輸入框、第一/第二輸入框位置判斷、
+    單一輸入框、單一/多價格文本、折扣率×原價、通用NT$文本
+
+    Args:
+        specElem (節點): 規格行節點
+
+    Returns:
+        dict: price/priceType/priceDisplay/originalPrice/discountRate
+    """
+    price = "0"
+    priceType = "未知"
+    discountRate = ""
+    originalPrice = ""
+    found = False
+
+    # 1. 含有NT$的可見元素 (文件順序)
+    allVisibleText = []
+    for el in specElem.後代():
+        文字 = el.文字內容()
+        if 文字 and "NT$" in 文字 and el.是否顯示():
+            allVisibleText.append((el, 文字.strip()))
+
+    for el, text in allVisibleText:
+        if ("折扣" in text or "特價" in text or "優惠" in text or
+                ("NT$" in text and "discount" in (el.attrs.get("class") or ""))):
+            ntMatch = _NT價格.search(text)
+            if ntMatch:
+                price, priceType, found = ntMatch.group(1), "折扣價標記", True
+                break
+
+    # 2. 蝦皮的價格輸入框
+    if not found:
+        priceInputs = [el for el in specElem.後代() if _是價格輸入框(el)]
+
+        ntPrefixedInputs = []
+        for input_el in priceInputs:
+            parentElement = input_el.parent
+            if parentElement is not None:
+                prefixElement = parentElement.查找("span, div, label")
+                if prefixElement is not None and prefixElement.文字內容().strip() == "NT$":
+                    ntPrefixedInputs.append(input_el)
+            prevSibling = input_el.前一個元素()
+            if prevSibling is not None and "NT$" in prevSibling.文字內容():
+                ntPrefixedInputs.append(input_el)
+
+        if ntPrefixedInputs:
+            value = ntPrefixedInputs[0].attrs.get("value") or ""
+            if value and _parseFloat(value) is not None:
+                price, priceType, found = value, "NT$特價輸入框", True
+        elif len(priceInputs) >= 2:
+            # 通常第一個輸入框是特價 (大於10)，第二個是折扣率 (小於10)
+            firstValue = priceInputs[0].attrs.get("value") or ""
+            secondValue = priceInputs[1].attrs.get("value") or ""
+            first = _parseFloat(firstValue) if firstValue else None
+            if first is not None:
+                second = _parseFloat(secondValue) if secondValue else None
+                second = second if second is not None else 0
+                if first > 10 and second < 10:
+                    price, priceType, found = firstValue, "第一輸入框特價", True
+                elif first < 10 and second > 10:
+                    price, priceType, found = secondValue, "第二輸入框特價", True
+                elif first > 10:
+                    price, priceType, found = firstValue, "預設特價輸入框", True
+        elif len(priceInputs) == 1:
+            value = priceInputs[0].attrs.get("value") or ""
+            數值 = _parseFloat(value) if value else None
+            if 數值 is not None and 數值 > 10:
+                price, priceType, found = value, "單一特價輸入框", True
+
+    # 3. 單一價格文本優先 (較短的文本排前面；與頁內腳本一樣原地排序，影響後續步驟的順序)
+    if not found:
+        allVisibleText.sort(key=lambda 項目: _JS長度(項目[1]))
+        for el, text in allVisibleText:
+            ntMatch = _NT價格.search(text)
+            if ntMatch:
+                allPrices = _NT價格全部.findall(text)
+                if len(allPrices) == 1:
+                    price, priceType = ntMatch.group(1), "單一價格文本"
+                else:
+                    # 多個價格時最後一個通常是折扣價
+                    price, priceType = re.search(r"[0-9]+", allPrices[-1]).group(0), "多價格文本"
+                found = True
+                break
+
+    # 4. 折扣率 × 原價
+    if not found:
+        for el, text in allVisibleText:
+            rateMatch = _折扣率.search(text)
+            if not rateMatch:
+                continue
+            discountRate = rateMatch.group(1)
+            for priceEl, priceText in allVisibleText:
+                if "原價" in priceText or "定價" in priceText:
+                    origMatch = _NT價格.search(priceText)
+                    if origMatch:
+                        originalPrice = origMatch.group(1)
+                        折扣 = _parseFloat(discountRate)
+                        # Math.round 為四捨五入 (非銀行家捨入)
+                        price = (str(math.floor(float(originalPrice) * 折扣 / 10 + 0.5))
+                                 if 折扣 is not None else "NaN")
+                        priceType, found = "折扣率計算價", True
+                        break
+            if found:
+                break
+
+    # 5. 任何包含NT$的文本
+    if not found:
+        for el, text in allVisibleText:
+            ntMatch = _NT價格.search(text)
+            if ntMatch:
+                price, priceType, found = ntMatch.group(1), "通用價格文本", True
+                break
+
+    if found:
+        priceDisplay = f"NT${price}" + (f" ({discountRate}折)" if discountRate else "")
+    else:
+        priceDisplay = "未知價格"
+
+    return {
+        "price": price,
+        "priceType": priceType,
+        "priceDisplay": priceDisplay,
+        "originalPrice": originalPrice,
+        "discountRate": discountRate,
+    }
+
+
+class 離線頁面解析器:
+    """在已儲存的折扣活動頁面上重播商品/規格抽取邏輯"""
+
+    def __init__(self, html):
+        """初始化離線頁面解析器
+
+        Args:
+            html (str): 完整或部分的頁面HTML
+        """
+        self.根節點 = 解析HTML(html)
+
+    @classmethod
+    def 從檔案載入(cls, 檔案路徑, 編碼="utf-8"):
+        """從HTML傾印檔建立解析器
+
+        Args:
+            檔案路徑 (str): HTML檔案路徑，例如 html.txt
+            編碼 (str): 檔案編碼
+
+        Returns:
+            離線頁面解析器: 解析器實例
+        """
+        with open(檔案路徑, encoding=編碼) as f:
+            return cls(f.read())
+
+    def 抽取欄位(self):
+        """與頁內欄位抽取函數相同的欄位陣列
+
+        Returns:
+            dict: names/offsets/cardIndices/specNames/stocks/prices/priceSources/switches
+        """
+        cols = {"names": [], "offsets": [], "cardIndices": [], "specNames": [],
+                "stocks": [], "prices": [], "priceSources": [], "switches": []}
+
+        for i, card in enumerate(self.根節點.查找全部(商品卡片選擇器)):
+            nameEl = card.查找("div.ellipsis-content.single")
+            if nameEl is None:
+                continue
+            cols["names"].append(nameEl.文字內容().strip())
+            cols["offsets"].append(len(cols["specNames"]))
+            cols["cardIndices"].append(i)
+
+            for row in card.查找全部(規格行選擇器):
+                specNameEl = row.查找("div.ellipsis-content.single")
+                if specNameEl is None:
+                    continue
+                cols["specNames"].append(specNameEl.文字內容().strip())
+
+                stockEl = row.查找("div.item-content.item-stock")
+                cols["stocks"].append(stockEl.文字內容().strip() if stockEl is not None else "0")
+
+                price, source = "", 0
+                for prefix in row.查找全部(".eds-input__prefix"):
+                    if "NT$" in prefix.文字內容():
+                        input_el = prefix.parent.查找("input.eds-input__input")
+                        if input_el is not None:
+                            price, source = input_el.attrs.get("value") or "", 1
+                            break
+                if not source:
+                    input_el = row.查找("input.eds-input__input")
+                    if input_el is not None:
+                        price, source = input_el.attrs.get("value") or "", 1
+                    else:
+                        priceEl = row.查找("div.item-discounted-price")
+                        if priceEl is not None:
+                            price, source = priceEl.文字內容().strip(), 2
+                cols["prices"].append(price)
+                cols["priceSources"].append(source)
+
+                state = 0
+                switchEl = row.查找("div.eds-switch")
+                if switchEl is not None:
+                    if "eds-switch--open" in switchEl.classes:
+                        state |= 1
+                    if "eds-switch--disabled" in switchEl.classes:
+                        state |= 2
+                cols["switches"].append(state)
+
+        return cols
+
+    def 搜尋商品(self):
+        """以預設搜尋腳本的邏輯搜尋已儲存頁面上的商品和規格
+
+        Returns:
+            dict: {"product_count": int, "spec_count": int, "products": list}
+        """
+        products = []
+        for cardIndex, card in enumerate(self.根節點.查找全部(商品卡片選擇器)):
+            nameElem = card.查找("div.ellipsis-content.single")
+            if nameElem is None:
+                continue
+
+            specs = []
+            for specElem in card.查找全部(規格行選擇器):
+                specNameElem = specElem.查找("div.ellipsis-content.single")
+                if specNameElem is None:
+                    continue
+
+                stockElem = specElem.查找("div.item-content.item-stock")
+                switchElem = specElem.查找("div.eds-switch")
+                spec = {"name": specNameElem.文字內容().strip(),
+                        "stock": stockElem.文字內容().strip() if stockElem is not None else "0"}
+                spec.update(判斷規格價格(specElem))
+                spec.update({
+                    "status": "開啟" if switchElem is not None and "eds-switch--open" in switchElem.classes else "關閉",
+                    # 與頁內腳本一致：沒有開關時為 null
+                    "disabled": "eds-switch--disabled" in switchElem.classes if switchElem is not None else None,
+                    "key": f"{cardIndex}-{len(specs)}"
+                })
+                specs.append(spec)
+
+            if specs:
+                products.append({"name": nameElem.文字內容().strip(), "specs": specs, "key": str(cardIndex)})
+
+        結果 = 整理搜尋結果(products)
+        logger.info(f"離線解析找到 {結果['product_count']} 個商品和 {結果['spec_count']} 個規格")
+        return 結果
+
+    def 欄位搜尋商品(self):
+        """以欄位模式搜尋已儲存頁面上的商品和規格
+
+        Returns:
+            dict: {"product_count": int, "spec_count": int, "products": list}
+        """
+        return 展開欄位結果(self.抽取欄位())
+
+    def _分析器商品元素(self):
+        """依 ShopeePageAnalyzer 的順序找出商品容器"""
+        for 選擇器 in 分析器商品選擇器:
+            元素 = self.根節點.查找全部(選擇器)
+            if 元素:
+                return 元素
+        元素 = [子節點 for 列表 in self.根節點.查找全部(".product-list")
+              for 子節點 in 列表.children if 子節點.tag == "div"]
+        if 元素:
+            return 元素
+        # 找不到時，所有文字包含庫存、價格或規格的div都視為候選
+        return [div for div in self.根節點.查找全部("div")
+                if any(關鍵字 in div.可見文字() for 關鍵字 in ("庫存", "價格", "規格"))]
+
+    @staticmethod
+    def _第一個包含文字(節點物件, 選擇器, 文字):
+        """等同 querySelector('選擇器, *:contains("文字")')"""
+        for 當前 in 節點物件.後代():
+            if 當前.符合(選擇器) or 文字 in 當前.文字內容():
+                return 當前
+        return None
+
+    @staticmethod
+    def _開關資訊(switchEl):
+        return {
+            "hasSwitch": True,
+            "isOpen": ("eds-switch--open" in switchEl.classes or
+                       switchEl.attrs.get("aria-checked") == "true"),
+            "isDisabled": ("eds-switch--disabled" in switchEl.classes or
+                           switchEl.attrs.get("disabled") == "true"),
+            "switchPath": switchEl.元素路徑(),
+        }
+
+    def extract_all_products(self):
+        """以 ShopeePageAnalyzer.extract_all_products 的格式回傳商品
+
+        Returns:
+            list: 每個商品包含 index/text/name/specs
+        """
+        products = []
+        for i, el in enumerate(self._分析器商品元素()):
+            product = {"index": i, "text": el.可見文字(), "specs": []}
+
+            nameEl = el.查找(".ellipsis-content.single, h3, .product-name")
+            if nameEl is not None:
+                product["name"] = nameEl.可見文字()
+            else:
+                text = product["text"].split("\n")[0]
+                product["name"] = text.strip() if text else f"商品 #{i+1}"
+
+            specElements = el.查找全部(分析器規格選擇器)
+            for j, spec in enumerate(specElements):
+                specInfo = {"index": j}
+
+                specNameEl = spec.查找(".ellipsis-content.single, .spec-name, .variant-name")
+                specInfo["name"] = specNameEl.可見文字() if specNameEl is not None else f"規格 #{j+1}"
+
+                stockEl = spec.查找(".item-stock, .stock, [data-stock]")
+                if stockEl is not None:
+                    specInfo["stock"] = stockEl.可見文字()
+                    stockMatch = re.search(r"[0-9]+", specInfo["stock"])
+                    if stockMatch:
+                        specInfo["stockNumber"] = int(stockMatch.group(0))
+
+                priceEl = spec.查找(".item-price, .price, [data-price]")
+                if priceEl is not None:
+                    specInfo["price"] = priceEl.可見文字()
+
+                switchEl = spec.查找('.eds-switch, .switch, [role="switch"]')
+                if switchEl is not None:
+                    specInfo.update(self._開關資訊(switchEl))
+
+                product["specs"].append(specInfo)
+
+            if not specElements:
+                # 找不到規格元素時直接從商品元素提取 (:contains 依 jQuery 語意比對文字)
+                specInfo = {"index": 0, "name": "默認規格"}
+
+                stockEl = self._第一個包含文字(el, "[data-stock], .stock", "庫存")
+                if stockEl is not None:
+                    specInfo["stock"] = stockEl.可見文字()
+                    stockMatch = re.search(r"[0-9]+", specInfo["stock"])
+                    if stockMatch:
+                        specInfo["stockNumber"] = int(stockMatch.group(0))
+
+                priceEl = self._第一個包含文字(el, "[data-price], .price", "$")
+                if priceEl is not None:
+                    specInfo["price"] = priceEl.可見文字()
+
+                switchEl = el.查找('.eds-switch, .switch, [role="switch"]')
+                if switchEl is not None:
+                    specInfo.update(self._開關資訊(switchEl))
+
+                product["specs"].append(specInfo)
+
+            products.append(product)
+
+        return products
@@ -0,0 +1,250 @@
+"""
+頁面快取模組
+
+在頁面內以 MutationObserver 維護商品卡片快取：
+- 首次呼叫時安裝觀察器並完整抽取一次
+- 每張卡片記錄最後變動時的版本，同步時只重新抽取版本大於上次同步版本的卡片
+  (價格輸入、開關切換、文字改變)；頁內不清除任何標記，多個讀取者各自保存版本互不影響
+- 卡片新增/移除 (換頁、重新渲染) 或頁面重新載入時自動完整重新同步
+- 取得頁面快取(driver) 讓搜尋、開關控制、價格調整與紀錄輸出共用同一份快取
+"""
+
+import logging
+import weakref
+
+from .搜尋 import 商品卡片選擇器, 欄位抽取函數JS, 逐卡展開欄位, 整理搜尋結果
+from .定位索引 import 取得定位索引
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# 安裝頁內快取：記錄卡片順序，觀察DOM變動並更新卡片版本
+安裝快取JS = """
+function 安裝商品快取(selector) {
+    const 舊快取 = window.__商品快取;
+    if (舊快取 && 舊快取.selector === selector) return 舊快取;
+    if (舊快取 && 舊快取.observer) 舊快取.observer.disconnect();
+
+    const cache = {
+        id: Date.now().toString(36) + Math.random().toString(36).slice(2),
+        selector: selector,
+        version: 0,
+        structureVersion: 0,
+        structural: true,
+        cards: [],
+        indexOf: new WeakMap(),
+        cardVersions: [],
+        observer: null
+    };
+
+    cache.reindex = function() {
+        cache.cards = Array.from(document.querySelectorAll(selector));
+        cache.indexOf = new WeakMap();
+        cache.cards.forEach((card, i) => cache.indexOf.set(card, i));
+        cache.version++;
+        cache.structureVersion = cache.version;
+        cache.cardVersions = cache.cards.map(() => cache.version);
+        cache.structural = false;
+    };
+
+    // 將變動節點對應到所屬卡片；找不到已知卡片代表結構改變
+    cache.mark = function(node) {
+        const el = node && (node.nodeType === 1 ? node : node.parentElement);
+        const card = el && el.closest ? el.closest(selector) : null;
+        if (!card) return false;
+        const index = cache.indexOf.get(card);
+        cache.version++;
+        if (index === undefined) {
+            cache.structural = true;
+        } else {
+            cache.cardVersions[index] = cache.version;
+        }
+        return true;
+    };
+
+    const 含卡片 = (nodes) => Array.from(nodes).some(n =>
+        n.nodeType === 1 && (n.matches(selector) || n.querySelector(selector)));
+
+    cache.處理變動 = function(mutations) {
+        for (const m of mutations) {
+            if (m.type === 'childList' && (含卡片(m.addedNodes) || 含卡片(m.removedNodes))) {
+                cache.structural = true;
+                cache.version++;
+                continue;
+            }
+            // 抽取時寫入的定位標記不算內容變動
+            if (m.type === 'attributes' && (m.attributeName === 'data-product-key' ||
+                                            m.attributeName === 'data-spec-key')) continue;
+            cache.mark(m.target);
+        }
+    };
+
+    cache.observer = new MutationObserver(cache.處理變動);
+    cache.observer.observe(document.body, {
+        childList: true, attributes: true, characterData: true, subtree: true
+    });
+
+    // input.value 的變更不會觸發 MutationObserver，需另外監聽
+    const onInput = (e) => cache.mark(e.target);
+    document.addEventListener('input', onInput, true);
+    document.addEventListener('change', onInput, true);
+
+    window.__商品快取 = cache;
+    return cache;
+}
+"""
+
+# 取得版本 N 之後的變更：結構在 N 之後改變或快取ID不同時回傳全部卡片，
+# 否則只回傳卡片版本大於 N 的卡片
+取得變更JS = 欄位抽取函數JS + 安裝快取JS + """
+const cache = 安裝商品快取(arguments[0]);
+const 上次ID = arguments[1];
+const 上次版本 = arguments[2] || 0;
+// 觀察器回呼尚未送達的變動先行處理，避免漏掉剛發生的修改
+cache.處理變動(cache.observer.takeRecords());
+if (cache.structural) cache.reindex();
+const full = cache.id !== 上次ID || 上次版本 < cache.structureVersion;
+let cards, indices;
+if (full) {
+    cards = cache.cards;
+    indices = null;
+} else {
+    indices = [];
+    cache.cardVersions.forEach((v, i) => { if (v > 上次版本) indices.push(i); });
+    cards = indices.map(i => cache.cards[i]);
+}
+return {
+    id: cache.id,
+    version: cache.version,
+    full: full,
+    total: cache.cards.length,
+    indices: indices || [],
+    cols: 抽取欄位(cards, 0, indices)
+};
+"""
+
+
+class 頁面商品快取:
+    """以頁內 MutationObserver 增量維護商品/規格資料"""
+
+    def __init__(self, driver):
+        """初始化頁面商品快取
+
+        Args:
+            driver: Selenium WebDriver實例
+        """
+        self.driver = driver
+        self.快取ID = None
+        self.版本 = 0
+        # 卡片索引 -> 商品字典 (沒有規格的卡片為 None)
+        self.商品表 = {}
+
+    def 重置(self):
+        """清除Python端的快取，下次同步時會完整重新抽取"""
+        self.快取ID = None
+        self.版本 = 0
+        self.商品表 = {}
+
+    @property
+    def 已啟用(self):
+        """是否已與頁面同步過 (頁內觀察器已安裝)"""
+        return self.快取ID is not None
+
+    def 取得變更(self):
+        """與頁面同步並回傳上次同步版本之後有變動的商品
+
+        Returns:
+            dict: {"full": bool, "changed": list} changed 為 (卡片索引, 商品字典) 列表；
+                  失敗時回傳 None
+        """
+        try:
+            變更 = self.driver.execute_script(取得變更JS, 商品卡片選擇器, self.快取ID, self.版本)
+        except Exception as e:
+            logger.error(f"同步頁面商品快取時發生錯誤: {str(e)}")
+            return None
+
+        已變更 = list(逐卡展開欄位(變更["cols"]))
+        if 變更["full"]:
+            if self.快取ID and self.快取ID != 變更["id"]:
+                logger.info("頁面已重新載入，重新建立商品快取")
+            self.商品表 = dict(已變更)
+        else:
+            # 卡片沒有名稱元素時不會出現在欄位結果中，先清空再填入
+            for 卡片索引 in 變更["indices"]:
+                self.商品表[卡片索引] = None
+            for 卡片索引, 商品 in 已變更:
+                self.商品表[卡片索引] = 商品
+
+        取得定位索引(self.driver).更新([商品 for _, 商品 in 已變更], 完整=變更["full"])
+        self.快取ID = 變更["id"]
+        self.版本 = 變更["version"]
+        logger.debug(f"商品快取同步: {'完整' if 變更['full'] else '增量'}，"
+                     f"變動 {len(已變更)} / {變更['total']} 張卡片")
+        return {"full": 變更["full"], "changed": 已變更}
+
+    def 搜尋商品(self):
+        """回傳目前頁面上所有商品，只重新抽取有變動的卡片
+
+        Returns:
+            dict: {"product_count": int, "spec_count": int, "products": list}
+        """
+        if self.取得變更() is None:
+            return 整理搜尋結果([])
+
+        products = [self.商品表[i] for i in sorted(self.商品表) if self.商品表[i]]
+        return 整理搜尋結果(products)
+
+    def 規格鍵(self, 商品名稱, 規格名稱):
+        """先同步變更再取得規格行的標記鍵
+
+        尚未啟用時不與頁面往返，直接使用現有的定位索引。
+
+        Returns:
+            str: 規格鍵，找不到時為 None
+        """
+        if self.已啟用:
+            self.取得變更()
+        return 取得定位索引(self.driver).規格鍵(商品名稱, 規格名稱)
+
+    def 查找規格(self, 商品名稱, 規格名稱):
+        """從快取取得規格目前的資料 (價格、開關狀態)
+
+        Returns:
+            dict: 規格字典；快取未啟用或找不到時為 None
+        """
+        if not self.已啟用:
+            return None
+        規格鍵 = self.規格鍵(商品名稱, 規格名稱)
+        if not 規格鍵:
+            return None
+        卡片索引, 規格序號 = (int(部分) for 部分 in 規格鍵.split("-"))
+        商品 = self.商品表.get(卡片索引)
+        if not 商品 or 商品.get("name") != 商品名稱 or 規格序號 >= len(商品["specs"]):
+            return None
+        規格 = 商品["specs"][規格序號]
+        return 規格 if 規格.get("name") == 規格名稱 else None
+
+
+# 每個 driver 共用一份快取，driver 被回收時自動清除
+_快取表 = weakref.WeakKeyDictionary()
+
+
+def 取得頁面快取(driver):
+    """取得 driver 共用的頁面商品快取，不存在時建立
+
+    Args:
+        driver: Selenium WebDriver實例
+
+    Returns:
+        頁面商品快取: 該 driver 的快取
+    """
+    try:
+        快取 = _快取表.get(driver)
+        if 快取 is None:
+            快取 = 頁面商品快取(driver)
+            _快取表[driver] = 快取
+        return 快取
+    except TypeError:
+        # 無法建立弱參照的 driver (例如測試替身) 不共用快取
+        return 頁面商品快取(driver)
+
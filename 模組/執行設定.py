@@ -0,0 +1,89 @@
+"""
+執行設定模組
+
+程式啟動時選擇一次執行設定檔，所有頁面腳本與Python端的等待都依此設定：
+- fast: 不做高亮與動畫，捲動立即完成，高亮/捲動後的穩定等待縮短
+- demo: 保留高亮、平滑捲動與原本的等待時間，方便展示與除錯
+
+設定檔依序取自 設定執行設定() 的呼叫 (cli.py --profile、主程式的「快速模式」選項)、
+環境變數 SHOPEE_RUN_PROFILE，預設為 demo；fast 需明確選擇。
+"""
+
+import os
+import json
+import time
+import logging
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+環境變數 = "SHOPEE_RUN_PROFILE"
+預設設定檔 = "demo"
+
+設定檔 = {
+    "fast": {"name": "fast", "highlight": False, "scrollBehavior": "auto", "delayScale": 0.2},
+    "demo": {"name": "demo", "highlight": True, "scrollBehavior": "smooth", "delayScale": 1.0},
+}
+
+_目前設定 = None
+
+
+def 設定執行設定(名稱):
+    """選擇執行設定檔
+
+    Args:
+        名稱 (str): "fast" 或 "demo"
+
+    Returns:
+        dict: 選擇的設定檔
+    """
+    global _目前設定
+    if 名稱 not in 設定檔:
+        logger.warning(f"未知的執行設定檔 '{名稱}'，改用 {預設設定檔}")
+        名稱 = 預設設定檔
+    _目前設定 = 設定檔[名稱]
+    logger.info(f"執行設定檔: {名稱}")
+    return _目前設定
+
+
+def 取得執行設定():
+    """取得目前的執行設定檔 (第一次呼叫時讀取環境變數)"""
+    if _目前設定 is None:
+        設定執行設定(os.environ.get(環境變數, 預設設定檔))
+    return _目前設定
+
+
+def 是否高亮():
+    """是否顯示操作中元素的高亮效果"""
+    return 取得執行設定()["highlight"]
+
+
+def 縮放延遲(秒數, 最短=0.0):
+    """依設定檔縮短穩定等待時間
+
+    Args:
+        秒數 (float): demo 設定檔下的等待秒數
+        最短 (float): 縮短後的最短秒數
+
+    Returns:
+        float: 實際等待秒數
+    """
+    return max(最短, 秒數 * 取得執行設定()["delayScale"])
+
+
+def 等待(秒數, 最短=0.0):
+    """依設定檔等待 (用於高亮、捲動之後的穩定等待，不用於頁面載入)"""
+    time.sleep(縮放延遲(秒數, 最短))
+
+
+def 執行設定JS():
+    """頁面腳本的前置宣告，腳本內以 執行設定.highlight / scrollBehavior / delayScale 讀取
+
+    同時寫入 window.__runProfile，讓頁面上其他腳本也能取得相同設定。
+    """
+    return f"const 執行設定 = window.__runProfile = {json.dumps(取得執行設定())};\n"
+
+
+def 捲動到元素JS():
+    """把 arguments[0] 捲動到畫面中央的腳本 (fast 設定檔立即完成)"""
+    return f"arguments[0].scrollIntoView({{block: 'center', behavior: '{取得執行設定()['scrollBehavior']}'}});"
@@ -14,10 +14,23 @@ from selenium.webdriver.common.keys import Keys
 import time
 import logging
 
+from .瀏覽器處理 import 等待頁面條件
+from .執行設定 import 執行設定JS, 捲動到元素JS, 是否高亮, 等待
+
 # 設置日誌
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("彈窗處理")
 
+# 彈窗容器的選擇器
+彈窗選擇器列表 = [
+    '.eds-modal__content', 
+    '.shopee-modal__container', 
+    '[role="dialog"]', 
+    '.eds-modal__box',
+    '.eds-modal__content--normal',  # 新增特定彈窗的選擇器
+    'div[data-v-d2d4c1c8].eds-modal__content'  # 新增特定彈窗的選擇器
+]
+
 class 彈窗處理:
     """專門處理各種彈窗的類"""
     
@@ -28,16 +41,7 @@ class 彈窗處理:
     def 檢查彈窗存在(self):
         """檢查頁面上是否存在彈窗"""
         try:
-            modal_selectors = [
-                '.eds-modal__content', 
-                '.shopee-modal__container', 
-                '[role="dialog"]', 
-                '.eds-modal__box',
-                '.eds-modal__content--normal',  # 新增特定彈窗的選擇器
-                'div[data-v-d2d4c1c8].eds-modal__content'  # 新增特定彈窗的選擇器
-            ]
-            
-            for selector in modal_selectors:
+            for selector in 彈窗選擇器列表:
                 elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements and len(elements) > 0 and elements[0].is_displayed():
                     logger.info(f"找到彈窗: {selector}")
@@ -48,6 +52,16 @@ class 彈窗處理:
             logger.error(f"檢查彈窗時發生錯誤: {str(e)}")
             return None
     
+    def 等待彈窗關閉(self, 超時時間=1):
+        """等待頁面上所有可見彈窗關閉，彈窗一關閉立即返回
+        
+        Returns:
+            bool: 是否在超時前關閉
+        """
+        return bool(等待頁面條件(self.driver, """
+            return !Array.from(document.querySelectorAll(參數[0])).some(el => el.offsetParent !== null);
+        """, ", ".join(彈窗選擇器列表), 超時時間=超時時間))
+    
     def 檢查注意彈窗(self):
         """檢查頁面上是否存在「注意」彈窗"""
         try:
@@ -121,7 +135,8 @@ class 彈窗處理:
                             logger.info(f"找到特定結構確認按鈕: {button_text}")
                             
                             # 高亮顯示按鈕
-                            self.driver.execute_script("arguments[0].style.border='3px solid purple';", button)
+                            if 是否高亮():
+                                self.driver.execute_script("arguments[0].style.border='3px solid purple';", button)
                             
                             # 嘗試不同點擊方法
                             click_methods = [
@@ -134,7 +149,7 @@ class 彈窗處理:
                                 try:
                                     click_method()
                                     logger.info(f"✓ 成功點擊特定結構確認按鈕: {button_text}")
-                                    time.sleep(1)
+                                    self.等待彈窗關閉(超時時間=1)
                                     
                                     # 檢查彈窗是否關閉
                                     if not self.檢查彈窗存在():
@@ -147,12 +162,12 @@ class 彈窗處理:
             # 嘗試通過JavaScript精確定位並點擊特定結構的確認按鈕
             try:
                 logger.info("嘗試通過JavaScript精確定位特定結構確認按鈕...")
-                js_result = self.driver.execute_script("""
+                js_result = self.driver.execute_script(執行設定JS() + """
                     // 嘗試找到特定結構的確認按鈕
                     const specificButton = document.querySelector('button[data-v-2e4150da][data-v-d2d4c1c8].eds-button.eds-button--primary');
                     if (specificButton && specificButton.offsetParent !== null) {
                         console.log('找到特定結構確認按鈕:', specificButton.innerText);
-                        specificButton.style.border = '5px solid gold';  // 標記找到的按鈕
+                        if (執行設定.highlight) specificButton.style.border = '5px solid gold';  // 標記找到的按鈕
                         specificButton.click();
                         return true;
                     }
@@ -161,7 +176,7 @@ class 彈窗處理:
                 
                 if js_result:
                     logger.info("✓ JavaScript成功找到並點擊特定結構確認按鈕")
-                    time.sleep(1)
+                    self.等待彈窗關閉(超時時間=1)
                     
                     # 檢查彈窗是否關閉
                     if not self.檢查彈窗存在():
@@ -180,16 +195,17 @@ class 彈窗處理:
                         logger.info(f"找到確認按鈕: {button_text}")
                         
                         # 高亮顯示按鈕
-                        self.driver.execute_script("arguments[0].style.border='3px solid red';", button)
+                        if 是否高亮():
+                            self.driver.execute_script("arguments[0].style.border='3px solid red';", button)
                         
                         # 滾動到按鈕並點擊
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                        time.sleep(0.5)
+                        self.driver.execute_script(捲動到元素JS(), button)
+                        等待(0.5)
                         
                         # 嘗試點擊
                         button.click()
                         logger.info(f"✓ 成功點擊確認按鈕: {button_text}")
-                        time.sleep(1)
+                        self.等待彈窗關閉(超時時間=1)
                         
                         # 檢查彈窗是否關閉
                         if not self.檢查彈窗存在():
@@ -205,7 +221,8 @@ class 彈窗處理:
                         logger.info(f"找到確認按鈕: {button.text}")
                         
                         # 高亮顯示按鈕
-                        self.driver.execute_script("arguments[0].style.border='3px solid blue';", button)
+                        if 是否高亮():
+                            self.driver.execute_script("arguments[0].style.border='3px solid blue';", button)
                         
                         # 嘗試不同點擊方法
                         methods = [
@@ -218,7 +235,7 @@ class 彈窗處理:
                             try:
                                 logger.info(f"嘗試{method_name}...")
                                 click_method()
-                                time.sleep(1)
+                                self.等待彈窗關閉(超時時間=1)
                                 
                                 # 檢查彈窗是否關閉
                                 if not self.檢查彈窗存在():
@@ -230,14 +247,14 @@ class 彈窗處理:
                     logger.error(f"處理確認按鈕失敗: {str(e)}")
             
             # 方法3: 使用JavaScript精確查找並點擊按鈕
-            js_result = self.driver.execute_script("""
+            js_result = self.driver.execute_script(執行設定JS() + """
                 function clickConfirmButton() {
                     // 尋找帶有'確認'文字的按鈕
                     const buttons = Array.from(document.querySelectorAll('button'));
                     for (const btn of buttons) {
                         if (btn.innerText.includes('確認') && btn.offsetParent !== null) {
                             console.log('找到確認按鈕:', btn.innerText);
-                            btn.style.border = '3px solid green';
+                            if (執行設定.highlight) btn.style.border = '3px solid green';
                             btn.click();
                             return true;
                         }
@@ -248,7 +265,7 @@ class 彈窗處理:
                     for (const btn of primaryButtons) {
                         if (btn.offsetParent !== null) {
                             console.log('找到主要按鈕:', btn.innerText);
-                            btn.style.border = '3px solid yellow';
+                            if (執行設定.highlight) btn.style.border = '3px solid yellow';
                             btn.click();
                             return true;
                         }
@@ -258,7 +275,7 @@ class 彈窗處理:
                     const specificButton = document.querySelector('button[data-v-2e4150da][data-v-d2d4c1c8].eds-button.eds-button--primary');
                     if (specificButton && specificButton.offsetParent !== null) {
                         console.log('找到特定類名按鈕:', specificButton.innerText);
-                        specificButton.style.border = '3px solid purple';
+                        if (執行設定.highlight) specificButton.style.border = '3px solid purple';
                         specificButton.click();
                         return true;
                     }
@@ -271,7 +288,7 @@ class 彈窗處理:
             
             if js_result:
                 logger.info("✓ JavaScript成功找到並點擊確認按鈕")
-                time.sleep(1)
+                self.等待彈窗關閉(超時時間=1)
                 
                 # 檢查彈窗是否關閉
                 if not self.檢查彈窗存在():
@@ -315,13 +332,13 @@ class 彈窗處理:
             
             # 方法1: 使用JavaScript直接定位並點擊按鈕
             logger.info("方法1: 使用JavaScript直接點擊...")
-            js_result = self.driver.execute_script("""
+            js_result = self.driver.execute_script(執行設定JS() + """
                 try {
                     // 直接獲取確認按鈕
                     const confirmButton = document.querySelector('.eds-modal__footer-buttons .eds-button--primary');
                     if (confirmButton) {
                         // 高亮顯示按鈕
-                        confirmButton.style.border = '3px solid red';
+                        if (執行設定.highlight) confirmButton.style.border = '3px solid red';
                         
                         // 記錄按鈕資訊
                         console.log('確認按鈕文字:', confirmButton.innerText);
@@ -340,7 +357,7 @@ class 彈窗處理:
             
             if js_result:
                 logger.info("✓ JavaScript方法成功點擊按鈕")
-                time.sleep(1)
+                self.等待彈窗關閉(超時時間=1)
                 
                 # 檢查彈窗是否消失
                 if not self.檢查彈窗存在():
@@ -356,7 +373,8 @@ class 彈窗處理:
                     logger.info(f"找到按鈕: {button.text}")
                     
                     # 標記按鈕
-                    self.driver.execute_script("arguments[0].style.border='3px solid blue';", button)
+                    if 是否高亮():
+                        self.driver.execute_script("arguments[0].style.border='3px solid blue';", button)
                     
                     # 嘗試點擊方法
                     point_click_methods = [
@@ -368,7 +386,7 @@ class 彈窗處理:
                     for click_method, method_name in point_click_methods:
                         logger.info(f"嘗試{method_name}...")
                         if click_method(button):
-                            time.sleep(1)
+                            self.等待彈窗關閉(超時時間=1)
                             if not self.檢查彈窗存在():
                                 logger.info(f"✓ {method_name}成功")
                                 return True
@@ -387,11 +405,12 @@ class 彈窗處理:
                             logger.info(f"找到特定類名按鈕: {button.text}")
                             
                             # 標記按鈕
-                            self.driver.execute_script("arguments[0].style.border='3px solid purple';", button)
+                            if 是否高亮():
+                                self.driver.execute_script("arguments[0].style.border='3px solid purple';", button)
                             
                             # 嘗試點擊
                             button.click()
-                            time.sleep(1)
+                            self.等待彈窗關閉(超時時間=1)
                             
                             # 檢查彈窗是否關閉
                             if not self.檢查彈窗存在():
@@ -403,7 +422,7 @@ class 彈窗處理:
             # 方法4: 嘗試發送Escape鍵關閉彈窗
             logger.info("方法4: 使用Escape鍵...")
             ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
-            time.sleep(1)
+            self.等待彈窗關閉(超時時間=1)
             
             if not self.檢查彈窗存在():
                 logger.info("✓ Escape鍵成功關閉彈窗")
@@ -447,14 +466,14 @@ class 彈窗處理:
                             
                             # 嘗試點擊
                             if self.模擬真實點擊(button):
-                                time.sleep(1)
+                                self.等待彈窗關閉(超時時間=1)
                                 if not self.檢查彈窗存在():
                                     logger.info("✓ 成功點擊確認按鈕")
                                     return True
                             
                             # 嘗試JavaScript點擊
                             if self.JS點擊(button):
-                                time.sleep(1)
+                                self.等待彈窗關閉(超時時間=1)
                                 if not self.檢查彈窗存在():
                                     logger.info("✓ 成功使用JavaScript點擊確認按鈕")
                                     return True
@@ -473,14 +492,14 @@ class 彈窗處理:
                             
                             # 嘗試點擊
                             if self.模擬真實點擊(button):
-                                time.sleep(1)
+                                self.等待彈窗關閉(超時時間=1)
                                 if not self.檢查彈窗存在():
                                     logger.info("✓ 成功點擊主要按鈕")
                                     return True
                             
                             # 嘗試JavaScript點擊
                             if self.JS點擊(button):
-                                time.sleep(1)
+                                self.等待彈窗關閉(超時時間=1)
                                 if not self.檢查彈窗存在():
                                     logger.info("✓ 成功使用JavaScript點擊主要按鈕")
                                     return True
@@ -491,7 +510,7 @@ class 彈窗處理:
             if not buttons_found:
                 logger.info("未找到按鈕，嘗試使用鍵盤操作...")
                 if self.鍵盤點擊():
-                    time.sleep(1)
+                    self.等待彈窗關閉(超時時間=1)
                     if not self.檢查彈窗存在():
                         logger.info("✓ 成功使用鍵盤操作關閉彈窗")
                         return True
@@ -507,7 +526,7 @@ class 彈窗處理:
                             
                             # 嘗試點擊
                             if self.模擬真實點擊(button):
-                                time.sleep(1)
+                                self.等待彈窗關閉(超時時間=1)
                                 if not self.檢查彈窗存在():
                                     logger.info("✓ 成功點擊按鈕")
                                     return True
@@ -557,7 +576,7 @@ class 彈窗處理:
                 
                 if js_result:
                     logger.info("✓ JavaScript成功找到並點擊了按鈕")
-                    time.sleep(1)
+                    self.等待彈窗關閉(超時時間=1)
                     if not self.檢查彈窗存在():
                         return True
             except Exception as e:
@@ -566,7 +585,7 @@ class 彈窗處理:
             # 方法6: 用Escape嘗試關閉彈窗
             logger.info("嘗試使用Escape鍵關閉彈窗...")
             ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
-            time.sleep(1)
+            self.等待彈窗關閉(超時時間=1)
             
             if not self.檢查彈窗存在():
                 logger.info("✓ 成功使用Escape鍵關閉彈窗")
@@ -622,15 +641,16 @@ class 彈窗處理:
                 if button.is_displayed() and button.is_enabled():
                     try:
                         logger.info(f"找到確認按鈕: {button.text}")
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                        time.sleep(0.5)
+                        self.driver.execute_script(捲動到元素JS(), button)
+                        等待(0.5)
                         
                         # 高亮顯示按鈕
-                        self.driver.execute_script("arguments[0].style.border='3px solid purple';", button)
+                        if 是否高亮():
+                            self.driver.execute_script("arguments[0].style.border='3px solid purple';", button)
                         
                         button.click()
                         logger.info("已點擊確認按鈕")
-                        time.sleep(1)
+                        self.等待彈窗關閉(超時時間=1)
                         
                         # 檢查彈窗是否已關閉
                         if not self.檢查彈窗存在():
@@ -643,7 +663,7 @@ class 彈窗處理:
                         try:
                             self.driver.execute_script("arguments[0].click();", button)
                             logger.info("已使用JavaScript點擊確認按鈕")
-                            time.sleep(1)
+                            self.等待彈窗關閉(超時時間=1)
                             
                             if not self.檢查彈窗存在():
                                 logger.info("彈窗已關閉")
@@ -659,15 +679,16 @@ class 彈窗處理:
                 if button.is_displayed() and button.is_enabled():
                     try:
                         logger.info(f"找到主要按鈕: {button.text}")
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                        time.sleep(0.5)
+                        self.driver.execute_script(捲動到元素JS(), button)
+                        等待(0.5)
                         
                         # 高亮顯示按鈕
-                        self.driver.execute_script("arguments[0].style.border='3px solid green';", button)
+                        if 是否高亮():
+                            self.driver.execute_script("arguments[0].style.border='3px solid green';", button)
                         
                         button.click()
                         logger.info("已點擊主要按鈕")
-                        time.sleep(1)
+                        self.等待彈窗關閉(超時時間=1)
                         
                         # 檢查彈窗是否已關閉
                         if not self.檢查彈窗存在():
@@ -680,7 +701,7 @@ class 彈窗處理:
                         try:
                             self.driver.execute_script("arguments[0].click();", button)
                             logger.info("已使用JavaScript點擊主要按鈕")
-                            time.sleep(1)
+                            self.等待彈窗關閉(超時時間=1)
                             
                             if not self.檢查彈窗存在():
                                 logger.info("彈窗已關閉")
@@ -691,12 +712,12 @@ class 彈窗處理:
             # 6. 嘗試使用JavaScript特殊處理編輯確認按鈕
             logger.info("嘗試使用JavaScript特殊處理彈窗按鈕")
             try:
-                button_clicked = self.driver.execute_script("""
+                button_clicked = self.driver.execute_script(執行設定JS() + """
                     // 針對特定結構的確認按鈕
                     const specificButton = document.querySelector('button[data-v-2e4150da][data-v-d2d4c1c8].eds-button.eds-button--primary');
                     if (specificButton && specificButton.offsetParent !== null) {
                         console.log('找到特定結構確認按鈕:', specificButton.innerText);
-                        specificButton.style.border = '5px solid gold';
+                        if (執行設定.highlight) specificButton.style.border = '5px solid gold';
                         specificButton.click();
                         return true;
                     }
@@ -709,7 +730,7 @@ class 彈窗處理:
                         for (const btn of buttons) {
                             if (btn.innerText.includes(text) && btn.offsetParent !== null) {
                                 console.log(`找到確認按鈕: ${btn.innerText}`);
-                                btn.style.border = '3px solid orange';
+                                if (執行設定.highlight) btn.style.border = '3px solid orange';
                                 btn.scrollIntoView({block: 'center'});
                                 
                                 try {
@@ -728,7 +749,7 @@ class 彈窗處理:
                     for (const btn of primaryButtons) {
                         if (btn.offsetParent !== null) {
                             console.log(`找到主要按鈕: ${btn.innerText}`);
-                            btn.style.border = '3px solid blue';
+                            if (執行設定.highlight) btn.style.border = '3px solid blue';
                             btn.scrollIntoView({block: 'center'});
                             
                             try {
@@ -746,7 +767,7 @@ class 彈窗處理:
                 
                 if button_clicked:
                     logger.info("JavaScript成功找到並點擊了彈窗按鈕")
-                    time.sleep(1)
+                    self.等待彈窗關閉(超時時間=1)
                     
                     if not self.檢查彈窗存在():
                         logger.info("彈窗已關閉")
@@ -759,7 +780,7 @@ class 彈窗處理:
                 logger.info("嘗試按ESC鍵關閉彈窗")
                 actions = ActionChains(self.driver)
                 actions.send_keys(Keys.ESCAPE).perform()
-                time.sleep(1)
+                self.等待彈窗關閉(超時時間=1)
                 
                 if not self.檢查彈窗存在():
                     logger.info("使用ESC鍵成功關閉彈窗")
@@ -780,11 +801,12 @@ class 彈窗處理:
         """模擬真實的人類點擊行為"""
         try:
             # 滾動到元素可見
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", 元素)
-            time.sleep(0.5)  # 等待滾動完成
+            self.driver.execute_script(捲動到元素JS(), 元素)
+            等待(0.5)  # 等待滾動完成
             
             # 高亮顯示元素
-            self.driver.execute_script("arguments[0].style.border='3px solid red';", 元素)
+            if 是否高亮():
+                self.driver.execute_script("arguments[0].style.border='3px solid red';", 元素)
             
             # 使用ActionChains模擬真實的滑鼠行為
             actions = ActionChains(self.driver)
@@ -885,12 +907,13 @@ class 彈窗處理:
                     logger.info(f"找到特定結構確認按鈕: {confirm_button.text}")
                     
                     # 高亮顯示按鈕
-                    self.driver.execute_script("arguments[0].style.border='5px solid orange';", confirm_button)
+                    if 是否高亮():
+                        self.driver.execute_script("arguments[0].style.border='5px solid orange';", confirm_button)
                     
                     # 嘗試點擊
                     confirm_button.click()
                     logger.info("✓ 成功點擊特定結構確認按鈕")
-                    time.sleep(1)
+                    self.等待彈窗關閉(超時時間=1)
                     
                     # 檢查彈窗是否關閉
                     if not self.檢查彈窗存在():
@@ -900,14 +923,14 @@ class 彈窗處理:
             
             # 方法2: 使用JavaScript精確定位並點擊
             try:
-                js_result = self.driver.execute_script("""
+                js_result = self.driver.execute_script(執行設定JS() + """
                     // 嘗試找到特定結構的確認按鈕
                     const specificModal = document.querySelector('div[data-v-d2d4c1c8].eds-modal__content');
                     if (specificModal) {
                         const confirmButton = specificModal.querySelector('button[data-v-2e4150da].eds-button--primary');
                         if (confirmButton) {
                             console.log('通過JavaScript找到特定結構確認按鈕:', confirmButton.innerText);
-                            confirmButton.style.border = '5px solid lime';  // 標記找到的按鈕
+                            if (執行設定.highlight) confirmButton.style.border = '5px solid lime';  // 標記找到的按鈕
                             confirmButton.click();
                             return true;
                         }
@@ -917,7 +940,7 @@ class 彈窗處理:
                 
                 if js_result:
                     logger.info("✓ JavaScript成功找到並點擊特定結構確認按鈕")
-                    time.sleep(1)
+                    self.等待彈窗關閉(超時時間=1)
                     
                     # 檢查彈窗是否關閉
                     if not self.檢查彈窗存在():
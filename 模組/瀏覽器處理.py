@@ -5,6 +5,7 @@
 - 啟動Chrome瀏覽器
 - 連接到已開啟的瀏覽器
 - 等待元素加載
+- 等待頁面條件 (元素出現/消失、屬性或class變化、網路閒置、DOM穩定)
 - 頁面操作輔助功能
 """
 
@@ -23,6 +24,193 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("瀏覽器處理")
 
+# 頁內等待腳本：以 MutationObserver 在DOM變動時立即重新檢查條件，
+# 並以短間隔輪詢處理不會觸發DOM變動的狀態 (輸入框的值、捲動、網路請求)。
+# 條件函數中可使用 參數 陣列與 最後變動 (最後一次DOM變動的時間戳)。
+_等待腳本 = """
+const 參數 = Array.prototype.slice.call(arguments, 0, arguments.length - 1);
+const done = arguments[arguments.length - 1];
+const 超時毫秒 = 參數.shift();
+let 最後變動 = performance.now();
+function 條件() { /*條件*/ }
+
+let finished = false, observer = null, timer = null, timeout = null;
+function finish(value) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearInterval(timer);
+    clearTimeout(timeout);
+    done(value === undefined ? null : value);
+}
+function check() {
+    if (finished) return;
+    try {
+        const value = 條件();
+        if (value) finish(value);
+    } catch (e) {
+        // 條件中引用的元素可能已被移除，等下一次檢查
+    }
+}
+observer = new MutationObserver(() => { 最後變動 = performance.now(); check(); });
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+timer = setInterval(check, 100);
+timeout = setTimeout(() => finish(null), 超時毫秒);
+check();
+"""
+
+# 追蹤 fetch/XHR 進行中的請求數，只安裝一次
+_網路監控JS = """
+if (!window.__網路監控) {
+    const m = window.__網路監控 = { pending: 0, last: performance.now() };
+    const 開始 = () => { m.pending++; m.last = performance.now(); };
+    const 結束 = () => { m.pending = Math.max(0, m.pending - 1); m.last = performance.now(); };
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function() {
+            開始();
+            return originalFetch.apply(this, arguments).finally(結束);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        開始();
+        this.addEventListener('loadend', 結束, { once: true });
+        return originalSend.apply(this, arguments);
+    };
+}
+"""
+
+
+def 等待頁面條件(driver, 條件JS, *參數, 超時時間=10):
+    """在頁面內等待條件成立，條件一成立立即返回
+
+    Args:
+        driver: Selenium WebDriver實例
+        條件JS (str): JavaScript函數本體，回傳真值代表條件成立，可使用 參數[0]... 取得額外參數
+        *參數: 傳入頁面的參數 (可為WebElement)
+        超時時間 (float): 最長等待秒數
+
+    Returns:
+        條件回傳的值 (例如元素或True)；超時或發生錯誤時回傳 None
+    """
+    原始逾時 = None
+    try:
+        # 非同步腳本的逾時必須大於等待時間
+        原始逾時 = driver.timeouts.script
+        if 原始逾時 < 超時時間 + 5:
+            driver.set_script_timeout(超時時間 + 5)
+        else:
+            原始逾時 = None
+    except Exception:
+        原始逾時 = None
+    
+    try:
+        return driver.execute_async_script(_等待腳本.replace("/*條件*/", 條件JS), int(超時時間 * 1000), *參數)
+    except Exception as e:
+        logger.warning(f"等待頁面條件時發生錯誤: {str(e)}")
+        return None
+    finally:
+        if 原始逾時 is not None:
+            try:
+                driver.set_script_timeout(原始逾時)
+            except Exception:
+                pass
+
+
+def 等待元素出現(driver, 選擇器, 超時時間=10):
+    """等待符合CSS選擇器的元素出現，回傳元素；超時回傳 None
+
+    以短間隔輪詢而非頁內腳本，點擊後若發生整頁跳轉也能繼續等待。
+    """
+    try:
+        return WebDriverWait(driver, 超時時間, poll_frequency=0.1).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 選擇器))
+        )
+    except Exception:
+        return None
+
+
+def 等待元素消失(driver, 目標, 超時時間=10):
+    """等待元素從頁面移除
+
+    Args:
+        目標: CSS選擇器字串，或已取得的WebElement
+
+    Returns:
+        bool: 元素是否已消失
+    """
+    if isinstance(目標, str):
+        條件 = "return !document.querySelector(參數[0]);"
+    else:
+        條件 = "return !參數[0] || !參數[0].isConnected;"
+    return bool(等待頁面條件(driver, 條件, 目標, 超時時間=超時時間))
+
+
+def 等待屬性變化(driver, 元素, 屬性名稱, 原始值=None, 超時時間=10):
+    """等待元素的屬性值與原始值不同
+
+    Args:
+        元素: WebElement
+        屬性名稱 (str): 屬性名稱，例如 'value'、'aria-checked'
+        原始值: 比較的原始值；為 None 時以開始等待時的值為準
+
+    Returns:
+        str: 變化後的屬性值；超時回傳 None
+    """
+    if 原始值 is None:
+        原始值 = driver.execute_script(
+            "const el = arguments[0], name = arguments[1];"
+            "return name in el ? String(el[name]) : el.getAttribute(name);",
+            元素, 屬性名稱)
+    條件 = """
+        const el = 參數[0], name = 參數[1];
+        const value = name in el ? String(el[name]) : el.getAttribute(name);
+        return value !== 參數[2] ? { value: value } : null;
+    """
+    結果 = 等待頁面條件(driver, 條件, 元素, 屬性名稱, 原始值, 超時時間=超時時間)
+    return 結果.get("value") if 結果 else None
+
+
+def 等待class狀態(driver, 元素, class名稱, 存在=True, 超時時間=10):
+    """等待元素加上 (或移除) 指定的class
+
+    Returns:
+        bool: 是否在超時前達到指定狀態
+    """
+    條件 = "return 參數[0].classList.contains(參數[1]) === 參數[2];"
+    return bool(等待頁面條件(driver, 條件, 元素, class名稱, 存在, 超時時間=超時時間))
+
+
+def 等待網路閒置(driver, 閒置毫秒=500, 超時時間=10):
+    """等待沒有進行中的 fetch/XHR 請求，且持續閒置指定毫秒
+
+    第一次呼叫時才開始追蹤請求，之前已發出的請求以 Resource Timing 的完成時間估算。
+
+    Returns:
+        bool: 是否在超時前達到閒置
+    """
+    條件 = _網路監控JS + """
+        const m = window.__網路監控;
+        const entries = performance.getEntriesByType('resource');
+        const 最後資源 = entries.length ? entries[entries.length - 1].responseEnd : 0;
+        const 最後活動 = Math.max(m.last, 最後資源);
+        return m.pending === 0 && performance.now() - 最後活動 >= 參數[0];
+    """
+    return bool(等待頁面條件(driver, 條件, 閒置毫秒, 超時時間=超時時間))
+
+
+def 等待DOM穩定(driver, 穩定毫秒=300, 超時時間=5):
+    """等待DOM在指定毫秒內沒有任何變動 (動畫、驗證訊息、重新渲染結束)
+
+    Returns:
+        bool: 是否在超時前達到穩定
+    """
+    條件 = "return performance.now() - 最後變動 >= 參數[0];"
+    return bool(等待頁面條件(driver, 條件, 穩定毫秒, 超時時間=超時時間))
+
 class 瀏覽器控制:
     """瀏覽器控制類，提供瀏覽器操作的基本功能"""
     
@@ -182,6 +370,26 @@ class 瀏覽器控制:
             logger.error(f"等待元素 {選擇器} 變為可點擊超時: {str(e)}")
             return None
     
+    def 等待元素消失(self, 目標, 超時時間=10):
+        """等待元素 (CSS選擇器或WebElement) 從頁面移除"""
+        return 等待元素消失(self.driver, 目標, 超時時間)
+    
+    def 等待屬性變化(self, 元素, 屬性名稱, 原始值=None, 超時時間=10):
+        """等待元素的屬性值改變，回傳新值"""
+        return 等待屬性變化(self.driver, 元素, 屬性名稱, 原始值, 超時時間)
+    
+    def 等待class狀態(self, 元素, class名稱, 存在=True, 超時時間=10):
+        """等待元素加上或移除指定的class"""
+        return 等待class狀態(self.driver, 元素, class名稱, 存在, 超時時間)
+    
+    def 等待網路閒置(self, 閒置毫秒=500, 超時時間=10):
+        """等待頁面的 fetch/XHR 請求全部完成並持續閒置"""
+        return 等待網路閒置(self.driver, 閒置毫秒, 超時時間)
+    
+    def 等待DOM穩定(self, 穩定毫秒=300, 超時時間=5):
+        """等待DOM停止變動"""
+        return 等待DOM穩定(self.driver, 穩定毫秒, 超時時間)
+    
     def 獲取當前網址(self):
         """獲取當前瀏覽器網址"""
         if self.driver:
@@ -194,7 +402,8 @@ class 瀏覽器控制:
             if self.driver:
                 logger.info(f"正在導航到: {url}")
                 self.driver.get(url)
-                time.sleep(等待時間)  # 等待頁面加載
+                # 等待頁面的資料請求完成，最多等待 等待時間 秒
+                等待網路閒置(self.driver, 500, 等待時間)
                 return True
             else:
                 logger.error("瀏覽器未連接")
@@ -17,6 +17,8 @@ from datetime import datetime
 import pandas as pd
 from selenium.webdriver.common.by import By
 
+from .商品處理.頁面快取 import 取得頁面快取
+
 # 設置日誌
 logger = logging.getLogger("紀錄輸出")
 
@@ -97,6 +99,13 @@ class 紀錄管理器:
         返回:
             dict: 記錄信息
         """
+        # 批次中頁面快取已啟用時直接讀取快取，不必掃描頁面上所有名稱元素
+        規格 = 取得頁面快取(driver).查找規格(商品名稱, 規格名稱)
+        if 規格 is not None:
+            原價格 = 規格.get("price") if 規格.get("priceType") != "未知" else "無值"
+            logger.info(f"從頁面快取捕獲原價格: {原價格}")
+            return self.記錄價格調整(商品名稱, 規格名稱, 原價格, 新價格, 成功)
+        
         # 嘗試從頁面獲取原價格
         原價格 = "未知"
         try:
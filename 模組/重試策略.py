@@ -0,0 +1,214 @@
+"""
+重試策略模組
+
+頁面操作 (Selenium 與 Playwright 共用) 的重試元件：
+- 分類錯誤: 把例外分為 過期元素 / 找不到元素 / 彈窗遮擋 / 其他
+- 重試策略: 帶隨機抖動的指數退避；過期元素立即重試，彈窗遮擋先執行彈窗恢復再重試
+- 斷路器: 連續失敗達門檻時暫停批次並執行彈窗恢復，恢復後只給下一次嘗試一次機會，
+  不會讓之後每個項目都耗盡自己的重試次數；多次恢復仍失敗時停止批次
+"""
+
+import logging
+import random
+import time
+
+# 設置日誌
+logger = logging.getLogger(__name__)
+
+# 錯誤類型
+過期元素 = "過期元素"
+找不到元素 = "找不到元素"
+彈窗遮擋 = "彈窗遮擋"
+其他錯誤 = "其他"
+
+# 依例外類別名稱與訊息分類 (Selenium 與 Playwright 的例外都適用，不需要匯入任何一方)
+_分類規則 = [
+    (過期元素, ("StaleElementReference", "not attached to the dom", "detached", "stale element")),
+    (彈窗遮擋, ("ElementClickIntercepted", "click intercepted", "would receive the click",
+             "intercepts pointer events", "UnexpectedAlertPresent")),
+    (找不到元素, ("NoSuchElement", "TimeoutException", "TimeoutError", "ElementNotInteractable",
+              "waiting for selector", "找不到", "未找到")),
+]
+
+
+class 操作失敗(Exception):
+    """操作沒有成功，附帶錯誤類型讓重試策略決定如何重試"""
+
+    def __init__(self, 類型, 訊息=""):
+        super().__init__(訊息 or 類型)
+        self.類型 = 類型
+
+
+def 分類錯誤(錯誤):
+    """判斷例外屬於哪一種錯誤類型
+
+    Args:
+        錯誤 (Exception): 操作時發生的例外
+
+    Returns:
+        str: 過期元素 / 找不到元素 / 彈窗遮擋 / 其他錯誤
+    """
+    if isinstance(錯誤, 操作失敗):
+        return 錯誤.類型
+    文字 = f"{type(錯誤).__name__} {錯誤}".lower()
+    for 類型, 關鍵字列表 in _分類規則:
+        if any(關鍵字.lower() in 文字 for 關鍵字 in 關鍵字列表):
+            return 類型
+    return 其他錯誤
+
+
+class 斷路器:
+    """批次層級的連續失敗保護 (同一批次的所有項目共用一個實例)"""
+
+    def __init__(self, 失敗門檻=5, 恢復=None, 暫停秒數=1.0, 最多恢復次數=3, 睡眠=time.sleep):
+        """初始化斷路器
+
+        Args:
+            失敗門檻 (int): 連續失敗幾次後跳脫
+            恢復 (callable): 跳脫時執行的彈窗恢復，返回是否成功
+            暫停秒數 (float): 執行恢復前暫停的秒數
+            最多恢復次數 (int): 連續恢復後仍失敗幾次就停止批次
+            睡眠 (callable): 等待函數
+        """
+        self.失敗門檻 = 失敗門檻
+        self.恢復函數 = 恢復
+        self.暫停秒數 = 暫停秒數
+        self.最多恢復次數 = 最多恢復次數
+        self.睡眠 = 睡眠
+        self.連續失敗 = 0
+        self.連續恢復 = 0
+        self.跳脫次數 = 0
+        self.已停止 = False
+
+    @property
+    def 已跳脫(self):
+        return self.連續失敗 >= self.失敗門檻
+
+    def 記錄成功(self):
+        self.連續失敗 = 0
+        self.連續恢復 = 0
+
+    def 記錄失敗(self):
+        """記錄一次失敗，返回是否因此跳脫"""
+        self.連續失敗 += 1
+        return self.已跳脫
+
+    def 恢復(self):
+        """暫停批次並執行彈窗恢復
+
+        Returns:
+            bool: 是否可以繼續 (已停止時為 False)
+        """
+        if self.已停止:
+            return False
+        if self.連續恢復 >= self.最多恢復次數:
+            self.已停止 = True
+            logger.error(f"已連續恢復 {self.連續恢復} 次仍然失敗，停止批次")
+            return False
+
+        self.連續恢復 += 1
+        self.跳脫次數 += 1
+        logger.warning(f"連續失敗 {self.連續失敗} 次，暫停批次並執行彈窗恢復 (第 {self.連續恢復} 次)")
+        self.睡眠(self.暫停秒數)
+        if self.恢復函數:
+            try:
+                self.恢復函數()
+            except Exception as e:
+                logger.error(f"彈窗恢復時發生錯誤: {str(e)}")
+        # 半開狀態：下一次嘗試再失敗就立即再次跳脫
+        self.連續失敗 = self.失敗門檻 - 1
+        return True
+
+
+class 重試策略:
+    """帶抖動的指數退避重試"""
+
+    def __init__(self, 最大次數=3, 基礎延遲=0.5, 最大延遲=5.0, 抖動=0.5,
+                 彈窗恢復=None, 隨機=random.random, 睡眠=time.sleep):
+        """初始化重試策略
+
+        Args:
+            最大次數 (int): 每個項目最多嘗試幾次
+            基礎延遲 (float): 第一次重試前的延遲秒數，之後每次加倍
+            最大延遲 (float): 延遲上限秒數
+            抖動 (float): 0~1，延遲隨機減少的最大比例，避免每次重試都在同一時間點
+            彈窗恢復 (callable): 遇到彈窗遮擋時在重試前執行
+            隨機 (callable): 返回 0~1 的隨機數
+            睡眠 (callable): 等待函數
+        """
+        self.最大次數 = 最大次數
+        self.基礎延遲 = 基礎延遲
+        self.最大延遲 = 最大延遲
+        self.抖動 = 抖動
+        self.彈窗恢復 = 彈窗恢復
+        self.隨機 = 隨機
+        self.睡眠 = 睡眠
+
+    def 延遲(self, 第幾次, 類型=其他錯誤):
+        """第幾次失敗後、下一次嘗試前的等待秒數
+
+        過期元素只需要重新查找元素，不需要退避。
+        """
+        if 類型 == 過期元素:
+            return 0.0
+        上限 = min(self.最大延遲, self.基礎延遲 * (2 ** (第幾次 - 1)))
+        return 上限 * (1 - self.抖動 * self.隨機())
+
+    def 執行(self, 動作, 描述="", 斷路器=None):
+        """執行動作直到成功或用完重試次數
+
+        動作返回真值視為成功；返回假值或拋出例外視為失敗，
+        可拋出 操作失敗(類型) 指定錯誤類型。
+
+        Args:
+            動作 (callable): 無參數的操作，返回結果
+            描述 (str): 日誌中的操作描述
+            斷路器 (斷路器): 批次共用的斷路器，None 表示不使用
+
+        Returns:
+            動作成功時的結果；失敗時為最後一次的返回值 (例外時為 None)
+        """
+        if 斷路器 is not None and 斷路器.已跳脫 and not 斷路器.恢復():
+            return None
+
+        結果 = None
+        已恢復 = False
+        for 第幾次 in range(1, self.最大次數 + 1):
+            類型 = 其他錯誤
+            try:
+                結果 = 動作()
+            except Exception as e:
+                結果 = None
+                類型 = 分類錯誤(e)
+                logger.warning(f"{描述} 第 {第幾次}/{self.最大次數} 次失敗 ({類型}): {str(e)}")
+            else:
+                if 結果:
+                    if 斷路器 is not None:
+                        斷路器.記錄成功()
+                    return 結果
+                logger.warning(f"{描述} 第 {第幾次}/{self.最大次數} 次未成功")
+
+            if 第幾次 == self.最大次數:
+                break
+
+            if 斷路器 is not None and 斷路器.記錄失敗():
+                # 恢復後的那一次也失敗時，不再消耗這個項目剩下的重試次數
+                if 已恢復 or not 斷路器.恢復():
+                    break
+                已恢復 = True
+                continue
+
+            if 類型 == 彈窗遮擋 and self.彈窗恢復:
+                try:
+                    self.彈窗恢復()
+                except Exception as e:
+                    logger.error(f"彈窗恢復時發生錯誤: {str(e)}")
+
+            等待秒數 = self.延遲(第幾次, 類型)
+            if 等待秒數 > 0:
+                logger.info(f"等待 {等待秒數:.1f} 秒後重試...")
+                self.睡眠(等待秒數)
+
+        if 斷路器 is not None and 第幾次 == self.最大次數:
+            斷路器.記錄失敗()
+        return 結果